@@ -1,4 +1,24 @@
+"""
+Contador de teste para o PPL Player.
+
+Sem argumentos: modo interativo (comandos digitados, eventos impressos).
+Com --clients: gerador de carga com N contadores simultâneos, medindo a
+latência de cada tipo de mensagem até a resposta do player. A resposta só
+é enviada depois que a thread da GUI executou o comando, então o tempo
+medido inclui a fila até a GUI e a própria ação no player.
+
+    python FAKEcontador.py --clients 20 --rate 50 --duration 10
+    python FAKEcontador.py --clients 5 --mix ping=1,count=8,seek=1 --batch 20
+"""
+
+import argparse
 import asyncio
+import itertools
+import random
+import time
+
+import ipc_protocol as proto
+from ipc_transport import open_player_connection
 
 HOST = "localhost"
 CONTADOR_PORT = 3000  # Porta deste app
@@ -6,13 +26,20 @@ MEDIA_PORT = 1337  # Porta do app principal
 
 
 async def handle_client(reader, writer):
+    """Recebe a posição, o estado e os alertas enviados pelo player."""
     addr = writer.get_extra_info("peername")
     print(f"[SERVER] Conectado por {addr}")
     while True:
-        data = await reader.read(1024)
-        if not data:
+        try:
+            message = await proto.read_message(reader)
+        except asyncio.IncompleteReadError:
             break
-        print(f"[SERVER] Recebido: {data.decode()}")
+        if message.opcode == proto.OP_TELEMETRY:
+            sample = proto.Telemetry.unpack(message.payload)
+            state = "▶" if sample.playing else "⏸"
+            print(f"[SERVER] #{sample.seq} vídeo {sample.video_index} {state} {sample.time_ms} ms ({sample.rate:.2f}x)")
+        else:
+            print(f"[SERVER] {proto.OPCODE_NAMES.get(message.opcode, message.opcode)}: {describe_event(message)}")
     writer.close()
 
 
@@ -23,38 +50,327 @@ async def server():
         await server.serve_forever()
 
 
+COMMANDS = {
+    "ping": proto.OP_PING,
+    "play": proto.OP_PLAY,
+    "pause": proto.OP_PAUSE,
+    "seek": proto.OP_SEEK,
+    "speed": proto.OP_SET_SPEED,
+    "step": proto.OP_STEP_FRAME,
+    "open": proto.OP_OPEN_FILE,
+    "sub": proto.OP_SUBSCRIBE,
+    "alert": proto.OP_ALERT,
+    "stats": proto.OP_BRIDGE_STATS,
+}
+
+
+def parse_command(line):
+    """Converte "seek 1500", "speed 2", "step -1", "open C:/video.mp4" em (opcode, args)."""
+    name, _, rest = line.strip().partition(" ")
+    opcode = COMMANDS.get(name.lower())
+    if opcode is None:
+        return None
+    if opcode in (proto.OP_OPEN_FILE, proto.OP_ALERT):
+        return opcode, (rest.strip(),)
+    if opcode == proto.OP_SUBSCRIBE:
+        # "sub 10" = só posição; "sub 10 15" = taxa + máscara de tópicos
+        values = [int(v) for v in rest.split()] or [10]
+        return opcode, tuple(values)
+    if opcode == proto.OP_SET_SPEED:
+        return opcode, (float(rest),)
+    if opcode in (proto.OP_SEEK, proto.OP_STEP_FRAME):
+        return opcode, (int(rest or 1),)
+    return opcode, ()
+
+
+def describe_event(message):
+    """Texto legível de um evento recebido do hub do player."""
+    if message.opcode in (proto.OP_TELEMETRY, proto.OP_STATE):
+        return proto.Telemetry.unpack(message.payload)
+    if message.opcode == proto.OP_ALERT:
+        text, level = proto.decode_request_args(proto.OP_ALERT, message.payload)
+        return f"[nível {level}] {text}"
+    if message.opcode == proto.OP_COUNT_EVENTS:
+        video_index, events = proto.decode_request_args(proto.OP_COUNT_EVENTS, message.payload)
+        return f"{len(events)} contagens no vídeo {video_index}"
+    return message.payload
+
+
 async def client():
     try:
-        reader, writer = await asyncio.open_connection(HOST, MEDIA_PORT)
-        print(f"[CLIENT] Conectado ao peer em {HOST}:{MEDIA_PORT}")
+        # Usa o socket local/named pipe quando disponível, senão TCP
+        reader, writer, transport = await open_player_connection(HOST, MEDIA_PORT)
+        print(f"[CLIENT] Conectado ao peer em {HOST}:{MEDIA_PORT} ({transport})")
     except ConnectionRefusedError:
         print("[CLIENT] Não foi possível conectar, peer não disponível.")
         return
 
+    request_ids = itertools.count(1)
+
     async def send_messages():
+        print(f"[CLIENT] Comandos: {', '.join(COMMANDS)} (\"sair\" encerra)")
         while True:
             msg = await asyncio.get_event_loop().run_in_executor(None, input)
             if msg.strip().lower() == "sair":
                 writer.close()
                 await writer.wait_closed()
                 break
-            writer.write(msg.encode())
+            try:
+                command = parse_command(msg)
+            except ValueError:
+                command = None
+            if command is None:
+                print(f"[CLIENT] Comando inválido: {msg}")
+                continue
+            opcode, args = command
+            writer.write(proto.encode_request(opcode, next(request_ids), *args))
             await writer.drain()
 
     async def receive_messages():
         while True:
-            data = await reader.read(1024)
-            if not data:
+            try:
+                message = await proto.read_message(reader)
+            except asyncio.IncompleteReadError:
                 break
-            print(f"[CLIENT] Recebido: {data.decode()}")
+            name = proto.OPCODE_NAMES.get(message.opcode, message.opcode)
+            if message.kind == proto.KIND_EVENT:
+                print(f"[CLIENT] {name}: {describe_event(message)}")
+            elif message.status == proto.STATUS_OK and message.opcode == proto.OP_BRIDGE_STATS:
+                print(f"[CLIENT] #{message.request_id} {name}: {proto.BridgeStats.unpack(message.payload)}")
+            elif message.status == proto.STATUS_OK:
+                state = proto.PlayerState.unpack(message.payload) if message.payload else "ok"
+                print(f"[CLIENT] #{message.request_id} {name}: {state}")
+            else:
+                print(f"[CLIENT] #{message.request_id} {name} falhou: {message.payload.decode('utf-8', 'replace')}")
 
     await asyncio.gather(send_messages(), receive_messages())
 
 
+# Gerador de carga
+
+LOAD_MESSAGES = {
+    # nome: (opcode, função que gera os argumentos)
+    "ping": (proto.OP_PING, lambda args: ()),
+    "seek": (proto.OP_SEEK, lambda args: (random.randint(0, args.seek_range),)),
+    "step": (proto.OP_STEP_FRAME, lambda args: (random.choice((-1, 1)),)),
+    "speed": (proto.OP_SET_SPEED, lambda args: (random.choice((0.5, 1.0, 2.0)),)),
+    "count": (proto.OP_COUNT_EVENTS, lambda args: (random_count_events(args.batch), -1)),
+    "alert": (proto.OP_ALERT, lambda args: ("Teste de carga", proto.ALERT_INFO)),
+}
+
+
+def random_count_events(batch):
+    now_ms = time.time() * 1000 % 3_600_000
+    return [(now_ms + i * 40.0, random.randint(0, 9), random.randint(1, 12)) for i in range(batch)]
+
+
+def parse_mix(text):
+    """Converte "ping=5,count=4,seek=1" em ([nomes], [pesos])."""
+    names, weights = [], []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in LOAD_MESSAGES:
+            raise ValueError(f"tipo de mensagem desconhecido: {name} (use {', '.join(LOAD_MESSAGES)})")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+class LoadStats:
+    """Latências (segundos) por tipo de mensagem, somadas de todos os clientes."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.sent = 0
+        self.errors = 0
+        self.lost = 0
+        self.connected = 0
+        self.transports = {}
+
+    def record(self, name, seconds):
+        self.latencies.setdefault(name, []).append(seconds)
+
+
+async def load_client(number, args, mix, stats, start, deadline):
+    """Um contador: envia no ritmo de --rate e casa as respostas pelo request_id."""
+    try:
+        reader, writer, transport = await open_player_connection(HOST, args.port, prefer_local=not args.tcp)
+    except OSError as e:
+        print(f"[LOAD] Cliente {number}: sem conexão ({e})")
+        return
+    stats.connected += 1
+    stats.transports[transport] = stats.transports.get(transport, 0) + 1
+
+    pending = {}  # request_id -> (tipo, instante previsto do envio)
+    request_ids = itertools.count(1)
+    names, weights = mix
+
+    if args.subscribe:
+        writer.write(proto.encode_request(proto.OP_SUBSCRIBE, next(request_ids), args.subscribe, proto.TOPIC_ALL))
+
+    async def send():
+        interval = 1 / args.rate
+        # Início defasado entre clientes para não enviar todos no mesmo instante
+        scheduled = start + interval * number / max(1, args.clients)
+        while scheduled < deadline:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = random.choices(names, weights)[0]
+            opcode, make_args = LOAD_MESSAGES[name]
+            request_id = next(request_ids)
+            # Latência medida a partir do horário previsto: um player lento não
+            # "pausa" o relógio do teste (evita a omissão coordenada)
+            pending[request_id] = (name, scheduled)
+            writer.write(proto.encode_request(opcode, request_id, *make_args(args)))
+            stats.sent += 1
+            await writer.drain()
+            scheduled += interval
+
+    async def receive():
+        while True:
+            message = await proto.read_message(reader)
+            now = time.perf_counter()
+            if message.kind == proto.KIND_EVENT:
+                if message.opcode == proto.OP_TELEMETRY:
+                    sample = proto.Telemetry.unpack(message.payload)
+                    # Mesmo relógio (perf_counter) nos dois processos da máquina
+                    stats.record("telemetria (amostra→cliente)", now - sample.captured_us / 1e6)
+                continue
+            entry = pending.pop(message.request_id, None)
+            if entry is None:
+                continue
+            name, scheduled = entry
+            stats.record(name, now - scheduled)
+            if message.status != proto.STATUS_OK:
+                stats.errors += 1
+
+    receiver = asyncio.ensure_future(receive())
+    try:
+        await send()
+        # Aguarda as respostas que ainda estão a caminho
+        grace = time.perf_counter() + args.grace
+        while pending and time.perf_counter() < grace and not receiver.done():
+            await asyncio.sleep(0.01)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        stats.lost += len(pending)
+        receiver.cancel()
+        writer.close()
+
+
+HISTOGRAM_EDGES_US = [50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000]
+
+
+def print_histogram(samples_us):
+    counts = [0] * (len(HISTOGRAM_EDGES_US) + 1)
+    for value in samples_us:
+        bucket = 0
+        while bucket < len(HISTOGRAM_EDGES_US) and value >= HISTOGRAM_EDGES_US[bucket]:
+            bucket += 1
+        counts[bucket] += 1
+    peak = max(counts)
+    for bucket, count in enumerate(counts):
+        if not count:
+            continue
+        if bucket == len(HISTOGRAM_EDGES_US):
+            label = f">= {format_us(HISTOGRAM_EDGES_US[-1])}"
+        else:
+            label = f"<  {format_us(HISTOGRAM_EDGES_US[bucket])}"
+        bar = "█" * max(1, round(count / peak * 40))
+        print(f"      {label:>10} {count:>8}  {bar}")
+
+
+def format_us(value):
+    return f"{value / 1000:.3g} ms" if value >= 1000 else f"{value:.3g} µs"
+
+
+async def query_bridge_stats(args):
+    """Latência leitura→ação medida pelo próprio player (OP_BRIDGE_STATS)."""
+    try:
+        reader, writer, _ = await open_player_connection(HOST, args.port, prefer_local=not args.tcp)
+    except OSError:
+        return None
+    try:
+        writer.write(proto.encode_request(proto.OP_BRIDGE_STATS, 1))
+        message = await asyncio.wait_for(proto.read_message(reader), 2)
+        if message.status != proto.STATUS_OK:
+            return None  # player sem suporte a stats
+        return proto.BridgeStats.unpack(message.payload)
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        return None
+    finally:
+        writer.close()
+
+
+def print_report(stats, elapsed, bridge=None):
+    transports = ", ".join(f"{count} {name}" for name, count in stats.transports.items()) or "nenhum"
+    received = sum(len(v) for k, v in stats.latencies.items() if not k.startswith("telemetria"))
+    print(f"\n[LOAD] {stats.connected} clientes ({transports}) em {elapsed:.1f} s")
+    print(
+        f"[LOAD] {stats.sent} enviadas, {received} respostas ({received / elapsed:.0f}/s), "
+        f"{stats.errors} com erro, {stats.lost} sem resposta"
+    )
+    for name, samples in sorted(stats.latencies.items()):
+        samples = sorted(s * 1e6 for s in samples)
+
+        def percentile(p):
+            return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+        print(
+            f"\n  {name:<12} n={len(samples):<7} {len(samples) / elapsed:8.0f}/s   "
+            f"p50 {format_us(round(percentile(0.50)))}   p95 {format_us(round(percentile(0.95)))}   "
+            f"p99 {format_us(round(percentile(0.99)))}   máx {format_us(round(samples[-1]))}"
+        )
+        print_histogram(samples)
+
+    if bridge is not None:
+        print(
+            f"\n[LOAD] No player (leitura no socket → ação na GUI, {bridge.commands} comandos desde o início): "
+            f"p50 {bridge.p50_ms:.2f} ms, p99 {bridge.p99_ms:.2f} ms, máx {bridge.max_ms:.2f} ms, "
+            f"ação mais longa {bridge.max_action_ms:.2f} ms, {bridge.over_budget} acima do limite"
+        )
+
+
+async def load_test(args):
+    mix = parse_mix(args.mix)
+    stats = LoadStats()
+    start = time.perf_counter() + 0.2  # tempo para todos conectarem
+    deadline = start + args.duration
+    print(
+        f"[LOAD] {args.clients} clientes x {args.rate} msg/s por {args.duration} s "
+        f"em {HOST}:{args.port} (mistura: {args.mix})"
+    )
+    await asyncio.gather(*(load_client(n, args, mix, stats, start, deadline) for n in range(args.clients)))
+    elapsed = max(1e-9, min(time.perf_counter(), deadline) - start)
+    print_report(stats, elapsed, await query_bridge_stats(args))
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Contador de teste e gerador de carga do PPL Player")
+    parser.add_argument("--clients", type=int, default=0, help="contadores simultâneos (0 = modo interativo)")
+    parser.add_argument("--rate", type=float, default=20, help="mensagens por segundo por cliente")
+    parser.add_argument("--duration", type=float, default=10, help="duração do teste em segundos")
+    parser.add_argument("--mix", default="ping=5,count=4,seek=1", help="pesos por tipo: " + ",".join(LOAD_MESSAGES))
+    parser.add_argument("--batch", type=int, default=10, help="contagens por mensagem count")
+    parser.add_argument("--seek-range", type=int, default=60000, help="posição máxima (ms) dos seeks")
+    parser.add_argument("--subscribe", type=int, default=0, help="assina todos os tópicos nesta taxa (Hz)")
+    parser.add_argument("--grace", type=float, default=2, help="segundos aguardando respostas ao final")
+    parser.add_argument("--port", type=int, default=MEDIA_PORT)
+    parser.add_argument("--tcp", action="store_true", help="não usar o socket local/named pipe")
+    return parser.parse_args()
+
+
 async def main():
     # Inicia servidor e cliente juntos
     await asyncio.gather(server(), client())
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_arguments()
+    if args.clients > 0:
+        asyncio.run(load_test(args))
+    else:
+        asyncio.run(main())
@@ -7,30 +7,146 @@ import sys
 import zipfile
 import tempfile
 import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+UPDATER_NAME = "updater.exe"
+EXTRACT_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+
+
+class PhaseTimer:
+    """Mede a duração de cada etapa da atualização"""
+    
+    def __init__(self):
+        self.phases = []
+    
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+    
+    def report(self):
+        total = sum(duration for _, duration in self.phases)
+        print("[UPDATER] ⏱️ Tempo por etapa:")
+        for name, duration in self.phases:
+            print(f"[UPDATER]   {name:<28} {duration * 1000:9.0f} ms")
+        print(f"[UPDATER]   {'Total':<28} {total * 1000:9.0f} ms")
+
+
+def wait_for_pid(pid, timeout=30):
+    """Aguarda o processo com este PID terminar, sem polling de lista de processos
+    
+    Windows: WaitForSingleObject no handle do processo. Linux: pidfd
+    (fica legível quando o processo termina). Demais sistemas: os.kill(pid, 0).
+    
+    Returns:
+        bool: True se o processo terminou (ou já não existia)
+    """
+    print(f"[UPDATER] Aguardando processo PID {pid} fechar...")
+    started = time.perf_counter()
+    
+    if os.name == 'nt':
+        import ctypes
+        SYNCHRONIZE = 0x00100000
+        WAIT_OBJECT_0 = 0
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+        if not handle:
+            return True  # já encerrado
+        try:
+            finished = kernel32.WaitForSingleObject(handle, int(timeout * 1000)) == WAIT_OBJECT_0
+        finally:
+            kernel32.CloseHandle(handle)
+    elif hasattr(os, "pidfd_open"):
+        import select
+        try:
+            pidfd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pidfd = None  # kernel sem pidfd
+        if pidfd is not None:
+            try:
+                poller = select.poll()
+                poller.register(pidfd, select.POLLIN)
+                finished = bool(poller.poll(timeout * 1000))
+            finally:
+                os.close(pidfd)
+        else:
+            finished = _poll_pid(pid, timeout)
+    else:
+        finished = _poll_pid(pid, timeout)
+    
+    if finished:
+        print(f"[UPDATER] ✅ Processo {pid} encerrado em {(time.perf_counter() - started) * 1000:.0f} ms")
+    return finished
+
+
+def _poll_pid(pid, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass  # existe, mas pertence a outro usuário
+        time.sleep(0.05)
+    return False
+
+
+def wait_for_files_unlocked(target_dir, app_name, timeout=10):
+    """Aguarda o executável e as bibliotecas do app poderem ser abertos para escrita
+    
+    No Windows um arquivo em uso (imagem carregada, antivírus lendo) recusa
+    a abertura para escrita; abrir sem gravar nada não altera o arquivo.
+    Em outros sistemas não há bloqueio obrigatório e retorna na hora.
+    """
+    if os.name != 'nt':
+        return True
+    
+    paths = [os.path.join(target_dir, app_name)]
+    for root, _, files in os.walk(target_dir):
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith((".exe", ".dll", ".pyd")))
+    
+    deadline = time.perf_counter() + timeout
+    pending = [path for path in dict.fromkeys(paths) if os.path.exists(path)]
+    while pending:
+        still_locked = []
+        for path in pending:
+            try:
+                with open(path, "r+b"):
+                    pass
+            except PermissionError:
+                still_locked.append(path)
+            except OSError:
+                pass
+        pending = still_locked
+        if pending:
+            if time.perf_counter() > deadline:
+                print(f"[UPDATER] ⚠️ Arquivos ainda em uso: {', '.join(os.path.basename(p) for p in pending[:5])}")
+                return False
+            time.sleep(0.1)
+    return True
 
 
 def wait_for_process_to_close(process_name, timeout=30):
-    """Aguarda processo específico fechar co                     print(f"[UPDATER] ⚠️ Reinicie o aplicativo manualmente")
-                print(f"[UPDATER] Local: {args.target}")
-        
-        # Auto-exclusão
-        time.sleep(2)     print(f"[UPDATER] ⚠️ Reinicie o aplicativo manualmente")
-                print(f"[UPDATER] Local: {args.target}")
-        
-        # Auto-exclusão
-        time.sleep(2)
-        schedule_self_delete()ut"""
+    """Aguarda processo específico fechar (por nome; usado quando o app não informa o PID)"""
     print(f"[UPDATER] Aguardando processo '{process_name}' fechar...")
     
     start_time = time.time()
     
     while time.time() - start_time < timeout:
         try:
-            tasks = os.popen("tasklist").read().lower()
+            # Filtro pelo nome exato da imagem, não por trecho de qualquer linha
+            tasks = os.popen(f'tasklist /FI "IMAGENAME eq {process_name}" /NH').read().lower()
             # Verifica se o processo específico está na lista
             found = False
             for line in tasks.split('\n'):
-                if process_name.lower() in line:
+                if line.strip().startswith(process_name.lower()):
                     found = True
                     break
             
@@ -52,8 +168,12 @@ def wait_for_process_to_close(process_name, timeout=30):
 
 
 
-def copy_update_files(source_dir, target_dir, exclude_updater=True):
-    """Copia arquivos da pasta de atualização para pasta alvo"""
+def copy_update_files(source_dir, target_dir, exclude_updater=True, delta=False):
+    """Copia arquivos da pasta de atualização para pasta alvo
+    
+    Com delta=True o pacote traz só os arquivos alterados: as pastas são
+    mescladas na instalação em vez de substituídas.
+    """
     try:
         print(f"[UPDATER] 📦 Copiando arquivos...")
         print(f"[UPDATER]   De: {source_dir}")
@@ -81,6 +201,12 @@ def copy_update_files(source_dir, target_dir, exclude_updater=True):
                     print(f"[UPDATER]   ✓ {item}")
                     files_copied += 1
                 elif os.path.isdir(source_path):
+                    if delta:
+                        # Só os arquivos que mudaram; o restante da pasta continua
+                        shutil.copytree(source_path, target_path, dirs_exist_ok=True)
+                        print(f"[UPDATER]   ✓ {item}/ (mesclada)")
+                        files_copied += 1
+                        continue
                     # Copia pasta inteira
                     if os.path.exists(target_path):
                         shutil.rmtree(target_path)
@@ -98,6 +224,268 @@ def copy_update_files(source_dir, target_dir, exclude_updater=True):
         return False
 
 
+def staging_paths(target_dir):
+    """Pastas irmãs da instalação: nova versão em preparo e versão anterior"""
+    target_dir = os.path.normpath(target_dir)
+    return target_dir + ".staging", target_dir + ".old"
+
+
+def _link_or_copy(source_path, target_path):
+    try:
+        # Link físico: instantâneo e sem espaço extra; a extração grava
+        # arquivos novos no lugar do link, sem tocar a instalação atual
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copy2(source_path, target_path)
+
+
+def prepare_staging(target_dir, staging_dir, replace_dirs=(), workers=EXTRACT_WORKERS):
+    """Cria a pasta de preparo com os arquivos atuais que a atualização não substitui
+    
+    Pastas de primeiro nível em replace_dirs não são levadas (pacote completo
+    substitui a pasta inteira, como fazia a cópia direta).
+    """
+    if os.path.exists(staging_dir):
+        shutil.rmtree(staging_dir)
+    os.makedirs(staging_dir)
+    
+    jobs = []
+    for root, dirs, files in os.walk(target_dir):
+        rel_root = os.path.relpath(root, target_dir)
+        if rel_root == ".":
+            dirs[:] = [d for d in dirs if d not in replace_dirs]
+        for name in dirs:
+            os.makedirs(os.path.join(staging_dir, rel_root, name), exist_ok=True)
+        for name in files:
+            jobs.append((os.path.join(root, name), os.path.join(staging_dir, rel_root, name)))
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda job: _link_or_copy(*job), jobs))
+    return len(jobs)
+
+
+def _package_top_dirs(names):
+    return {name.split("/", 1)[0] for name in names if "/" in name}
+
+
+def _new_file_path(staging_dir, rel_path):
+    """Caminho dentro da pasta de preparo, livre para um arquivo novo
+    
+    Remove o link físico da versão atual, se houver: gravar através dele
+    alteraria o arquivo da instalação em uso.
+    """
+    target_path = os.path.normpath(os.path.join(staging_dir, rel_path))
+    if os.path.commonpath([target_path, os.path.normpath(staging_dir)]) != os.path.normpath(staging_dir):
+        raise zipfile.BadZipFile(f"caminho fora da instalação: {rel_path}")
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    if os.path.lexists(target_path):
+        os.remove(target_path)
+    return target_path
+
+
+def _extract_members(zip_path, infos, staging_dir):
+    # Um ZipFile por thread: leitura e descompressão (zlib libera o GIL) em paralelo
+    with zipfile.ZipFile(zip_path) as zip_ref:
+        for info in infos:
+            target_path = _new_file_path(staging_dir, info.filename)
+            # zipfile confere o CRC-32 ao terminar a leitura (BadZipFile se divergir)
+            with zip_ref.open(info) as member, open(target_path, "wb") as f:
+                shutil.copyfileobj(member, f, 1024 * 1024)
+            if os.path.getsize(target_path) != info.file_size:
+                raise zipfile.BadZipFile(f"tamanho incorreto: {info.filename}")
+            modified = time.mktime(info.date_time + (0, 0, -1))
+            os.utime(target_path, (modified, modified))
+    return [info.filename for info in infos]
+
+
+def extract_package(zip_path, staging_dir, workers=EXTRACT_WORKERS):
+    """Extrai e verifica o pacote em paralelo na pasta de preparo
+    
+    Retorna os caminhos relativos dos arquivos gravados.
+    """
+    with zipfile.ZipFile(zip_path) as zip_ref:
+        infos = [
+            info for info in zip_ref.infolist()
+            if not info.is_dir() and info.filename.lower() != UPDATER_NAME
+        ]
+    # Arquivos grandes primeiro, distribuídos entre as threads
+    infos.sort(key=lambda info: info.file_size, reverse=True)
+    groups = [infos[i::workers] for i in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return [name for names in executor.map(lambda group: _extract_members(zip_path, group, staging_dir), groups) for name in names]
+
+
+def copy_folder_to_staging(source_dir, staging_dir, workers=EXTRACT_WORKERS):
+    """Mesma etapa para pacotes já extraídos (--zip com pasta, versões antigas do app)"""
+    jobs = []
+    for root, _, files in os.walk(source_dir):
+        for name in files:
+            rel_path = os.path.relpath(os.path.join(root, name), source_dir)
+            if rel_path.lower() == UPDATER_NAME:
+                continue
+            jobs.append((os.path.join(root, name), rel_path))
+    
+    def copy(job):
+        source_path, rel_path = job
+        target_path = _new_file_path(staging_dir, rel_path)
+        shutil.copy2(source_path, target_path)
+        if os.path.getsize(target_path) != os.path.getsize(source_path):
+            raise OSError(f"cópia incompleta: {source_path}")
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(copy, jobs))
+    return [rel_path for _, rel_path in jobs]
+
+
+def copy_staged_files(staging_dir, target_dir, rel_paths):
+    """Copia por cima da instalação só os arquivos extraídos na pasta de preparo
+    
+    Os demais arquivos da pasta de preparo são links físicos para a própria
+    instalação e não precisam (nem podem) ser copiados sobre si mesmos.
+    Tudo ou nada: se algum arquivo da instalação está em uso, nada é tocado;
+    se uma cópia falha no meio, os arquivos já trocados voltam do backup.
+    """
+    targets = [os.path.join(target_dir, rel_path) for rel_path in rel_paths]
+    locked = []
+    for target_path in targets:
+        try:
+            if os.path.exists(target_path):
+                with open(target_path, "r+b"):
+                    pass
+        except OSError:
+            locked.append(os.path.relpath(target_path, target_dir))
+    if locked:
+        print(f"[UPDATER] ❌ Arquivos em uso, instalação mantida: {', '.join(locked[:5])}")
+        return False
+    
+    backup_dir = tempfile.mkdtemp(prefix="ppl-backup-")
+    replaced = []  # (destino, backup ou None se o arquivo é novo)
+    try:
+        for rel_path, target_path in zip(rel_paths, targets):
+            backup_path = None
+            if os.path.exists(target_path):
+                backup_path = os.path.join(backup_dir, rel_path)
+                os.makedirs(os.path.dirname(backup_path), exist_ok=True)
+                shutil.copy2(target_path, backup_path)
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            replaced.append((target_path, backup_path))
+            shutil.copy2(os.path.join(staging_dir, rel_path), target_path)
+        print(f"[UPDATER] ✅ {len(replaced)} arquivos copiados")
+        return True
+    except OSError as e:
+        print(f"[UPDATER] ❌ Erro ao copiar ({e}); restaurando {len(replaced)} arquivos...")
+        for target_path, backup_path in reversed(replaced):
+            try:
+                if backup_path is None:
+                    if os.path.exists(target_path):
+                        os.remove(target_path)
+                else:
+                    shutil.copy2(backup_path, target_path)
+            except OSError as restore_error:
+                print(f"[UPDATER]   ✗ Não foi possível restaurar {target_path}: {restore_error}")
+        return False
+    finally:
+        shutil.rmtree(backup_dir, ignore_errors=True)
+
+
+def install_in_place(source, target_dir, delta=False, timer=None):
+    """Sem pasta de preparo (pasta pai sem permissão de escrita): verifica e copia direto
+    
+    O ZIP é extraído e verificado numa pasta temporária antes de qualquer
+    arquivo da instalação ser tocado.
+    """
+    timer = timer or PhaseTimer()
+    if not os.path.isfile(source):
+        with timer.phase("Cópia direta"):
+            return copy_update_files(source, target_dir, delta=delta)
+    
+    temp_dir = tempfile.mkdtemp(prefix="ppl-update-")
+    try:
+        with timer.phase("Extração e verificação"):
+            written = extract_package(source, temp_dir)
+        print(f"[UPDATER]   ✓ {len(written)} arquivos novos verificados")
+        with timer.phase("Cópia direta"):
+            return copy_update_files(temp_dir, target_dir, delta=delta)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def swap_directories(staging_dir, target_dir, old_dir):
+    """Ativa a nova versão: a instalação vira .old e a pasta de preparo toma seu lugar
+    
+    São duas renomeações na mesma pasta (instantâneas); se a segunda falhar,
+    a primeira é desfeita e a instalação atual continua intacta.
+    """
+    if os.path.exists(old_dir):
+        shutil.rmtree(old_dir)
+    os.rename(target_dir, old_dir)
+    try:
+        os.rename(staging_dir, target_dir)
+    except OSError:
+        os.rename(old_dir, target_dir)
+        raise
+
+
+def install_update(source, target_dir, delta=False, timer=None):
+    """Prepara a nova versão ao lado da instalação e a ativa de uma vez
+    
+    source é o ZIP do pacote ou uma pasta com os arquivos extraídos.
+    """
+    timer = timer or PhaseTimer()
+    staging_dir, old_dir = staging_paths(target_dir)
+    is_zip = os.path.isfile(source)
+    
+    try:
+        if is_zip:
+            with zipfile.ZipFile(source) as zip_ref:
+                names = zip_ref.namelist()
+        else:
+            names = [
+                os.path.relpath(os.path.join(root, name), source).replace(os.sep, "/")
+                for root, _, files in os.walk(source) for name in files
+            ]
+        replace_dirs = set() if delta else _package_top_dirs(names)
+        
+        try:
+            with timer.phase("Preparo (links da versão atual)"):
+                kept = prepare_staging(target_dir, staging_dir, replace_dirs)
+        except OSError as e:
+            print(f"[UPDATER]   ⚠️ Pasta de preparo indisponível ({e}), copiando direto na instalação...")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return install_in_place(source, target_dir, delta, timer)
+        print(f"[UPDATER]   ✓ {kept} arquivos atuais preservados")
+        
+        with timer.phase("Extração e verificação"):
+            if is_zip:
+                written = extract_package(source, staging_dir)
+            else:
+                written = copy_folder_to_staging(source, staging_dir)
+        print(f"[UPDATER]   ✓ {len(written)} arquivos novos verificados")
+        
+        with timer.phase("Troca de pastas"):
+            try:
+                swap_directories(staging_dir, target_dir, old_dir)
+                print("[UPDATER]   ✓ Nova versão ativada")
+                swapped = True
+            except OSError as e:
+                # Sem permissão para renomear a pasta da instalação (ou arquivo
+                # ainda aberto): copia por cima só os arquivos novos, já verificados
+                print(f"[UPDATER]   ⚠️ Troca de pastas indisponível ({e}), copiando arquivos...")
+                swapped = False
+                if not copy_staged_files(staging_dir, target_dir, written):
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                    return False
+        
+        with timer.phase("Remoção da versão anterior"):
+            shutil.rmtree(old_dir if swapped else staging_dir, ignore_errors=True)
+        return True
+        
+    except (OSError, zipfile.BadZipFile) as e:
+        print(f"[UPDATER] ❌ Erro ao preparar atualização: {e}")
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        return False
+
+
 def update_version_file(target_dir, new_version):
     """Atualiza version_info.json na pasta perplan-media"""
     try:
@@ -211,32 +599,47 @@ if __name__ == "__main__":
     print("=" * 60)
     
     parser = argparse.ArgumentParser(description="Atualizador do PERPLAN Media Player")
-    parser.add_argument("--zip", required=True, help="Pasta com arquivos extraídos da atualização")
+    parser.add_argument("--zip", required=True, help="ZIP da atualização (ou pasta com os arquivos já extraídos)")
     parser.add_argument("--target", required=True, help="Pasta de instalação do app")
     parser.add_argument("--process", required=True, help="Nome do processo principal do app")
+    parser.add_argument("--pid", type=int, help="PID do app a aguardar (versões antigas só informam --process)")
     parser.add_argument("--version", help="Nova versão")
     parser.add_argument("--app-name", default="PPL Player.exe", help="Nome do executável principal")
+    parser.add_argument("--delta", action="store_true", help="Pacote parcial (só arquivos alterados)")
     args = parser.parse_args()
     
     print(f"\n[UPDATER] Configuração:")
     print(f"[UPDATER]   Origem: {args.zip}")
     print(f"[UPDATER]   Destino: {args.target}")
-    print(f"[UPDATER]   Processo: {args.process}")
+    print(f"[UPDATER]   Processo: {args.process} (PID {args.pid or 'N/A'})")
     print(f"[UPDATER]   App Name: {args.app_name}")
     print(f"[UPDATER]   Versão: {args.version or 'N/A'}")
     print()
     
+    # A pasta de trabalho herdada do app impediria renomear a instalação
+    os.chdir(os.path.dirname(os.path.abspath(args.zip)))
+    timer = PhaseTimer()
+    
     # Etapa 1: Aguardar processo fechar
     print("[UPDATER] Etapa 1/5: Aguardando aplicativo fechar...")
-    if not wait_for_process_to_close(args.process, timeout=60):
-        print("[UPDATER] ⚠️ Timeout - forçando continuação...")
+    with timer.phase("Aguardando o app fechar"):
+        if args.pid:
+            closed = wait_for_pid(args.pid, timeout=60)
+        else:
+            closed = wait_for_process_to_close(args.process, timeout=60)
+        if not closed:
+            print("[UPDATER] ⚠️ Timeout - forçando continuação...")
     
-    # Delay extra para garantir que arquivos foram liberados
-    time.sleep(2)
+    with timer.phase("Liberação dos arquivos"):
+        if args.pid:
+            wait_for_files_unlocked(args.target, args.app_name)
+        else:
+            # Sem PID não há como saber qual processo segurava os arquivos
+            time.sleep(2)
     
-    # Etapa 2: Copiar arquivos novos
-    print("[UPDATER] Etapa 2/5: Copiando arquivos novos...")
-    if copy_update_files(args.zip, args.target):
+    # Etapa 2: Preparar a nova versão ao lado da instalação e ativá-la
+    print("[UPDATER] Etapa 2/5: Instalando arquivos novos...")
+    if install_update(args.zip, args.target, delta=args.delta, timer=timer):
         print("[UPDATER] ✅ Atualização instalada com sucesso!")
         
         # Etapa 3: Atualizar versão
@@ -246,10 +649,12 @@ if __name__ == "__main__":
         
         # Etapa 4: Limpar arquivos temporários
         print("[UPDATER] Etapa 4/5: Limpando arquivos temporários...")
-        # Limpa a pasta pai (que contém tanto o ZIP quanto a pasta extraída)
-        temp_parent = os.path.dirname(args.zip)
-        if "perplan-media" in temp_parent.lower():
-            cleanup_temp_files(temp_parent)
+        # Só o pacote: a pasta de dados também guarda versão e sessão
+        with timer.phase("Limpeza"):
+            if "perplan-media" in os.path.abspath(args.zip).lower():
+                cleanup_temp_files(args.zip)
+        
+        timer.report()
         
         # Etapa 5: Reiniciar aplicativo
         print("[UPDATER] Etapa 5/5: Reiniciando aplicativo...")
@@ -280,6 +685,7 @@ if __name__ == "__main__":
         print("[UPDATER] ✅ Processo de atualização concluído!")
         
     else:
+        timer.report()
         print("[UPDATER] ❌ Falha na instalação da atualização")
         input("[UPDATER] Pressione Enter para fechar...")
     
@@ -1,15 +1,57 @@
-from flask import Flask, jsonify, send_file, request
+from flask import Flask, Request, jsonify, send_file, send_from_directory, request
 import os
 import zipfile
 import re
 import json
+import hashlib
+import tempfile
+import threading
+import time
+import uuid
+
+class _HashingFile:
+    """Arquivo temporário em UPDATE_FILES_DIR que calcula o SHA-256 enquanto é gravado"""
+    
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(suffix=".upload", dir=UPDATE_FILES_DIR)
+        self.file = os.fdopen(fd, "w+b")
+        self.digest = hashlib.sha256()
+        self.size = 0
+    
+    def write(self, data):
+        self.digest.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+    
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+class UploadRequest(Request):
+    # Arquivos de formulário vão direto para o disco (já com hash), sem cópia em memória
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return _HashingFile()
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 
 UPDATE_FILES_DIR = "updates"
 VERSION_FILE = "version.json"
+MANIFEST_DIR = os.path.join(UPDATE_FILES_DIR, "manifests")
+DELTA_DIR = os.path.join(UPDATE_FILES_DIR, "deltas")
+UPDATER_NAME = "updater.exe"
+KEEP_VERSIONS = 3  # versões anteriores mantidas (com manifestos) para deltas e rollback
+UPLOAD_CHUNK = 1024 * 1024
+API_PORT = 1234
+API_WORKERS = 2 * (os.cpu_count() or 1) + 1
+API_THREADS = 8  # threads por worker; cada download longo ocupa uma
+API_KEEPALIVE = 15  # segundos que uma conexão ociosa fica aberta
+API_GRACEFUL_TIMEOUT = 120  # segundos para downloads terminarem num reload/parada
+API_CONNECTION_LIMIT = 1000
+VERSION_CHECK_INTERVAL = 1.0  # segundos entre verificações de mudança do version.json
 
 os.makedirs(UPDATE_FILES_DIR, exist_ok=True)
+os.makedirs(MANIFEST_DIR, exist_ok=True)
+os.makedirs(DELTA_DIR, exist_ok=True)
 
 def load_version():
     if os.path.exists(VERSION_FILE):
@@ -21,11 +63,79 @@ def load_version():
     return {"version": 3, "changelog": "Melhorias de performance e correções de bugs"}
 
 def save_version(version_data):
-    with open(VERSION_FILE, 'w', encoding='utf-8') as f:
+    tmp_path = f"{VERSION_FILE}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(version_data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, VERSION_FILE)
+
+class VersionCache:
+    """version.json em memória; relido só quando o arquivo muda (data ou tamanho)"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = None
+        self.etag = None
+        self.signature = None
+        self.checked_at = 0.0
+    
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def _store(self, data, signature):
+        self.data = data
+        self.signature = signature
+        self.etag = hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+        self.checked_at = time.monotonic()
+    
+    def get(self):
+        # Um stat por segundo no máximo; as requisições só leem a memória
+        if self.data is not None and time.monotonic() - self.checked_at < VERSION_CHECK_INTERVAL:
+            return self.data
+        with self.lock:
+            signature = self._file_signature()
+            if self.data is None or signature != self.signature:
+                self._store(load_version(), signature)
+                print(f"Versão carregada: {self.data['version']}")
+            else:
+                self.checked_at = time.monotonic()
+        return self.data
+    
+    def set(self, data):
+        with self.lock:
+            save_version(data)
+            self._store(data, self._file_signature())
+
+version_cache = VersionCache(VERSION_FILE)
 
-version_data = load_version()
-CURRENT_VERSION = version_data["version"]
+# Tamanho, data e SHA-256 dos pacotes, recalculados só quando o arquivo muda
+_package_info = {}
+_package_lock = threading.Lock()
+
+def package_info(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    info = _package_info.get(path)
+    if info is None or info["key"] != key:
+        with _package_lock:
+            info = _package_info.get(path)
+            if info is None or info["key"] != key:
+                info = {"key": key, "size": stat.st_size, "mtime": stat.st_mtime, "sha256": file_sha256(path)}
+                _package_info[path] = info
+    return info
+
+def conditional_json(payload, etag):
+    """JSON com ETag; responde 304 quando o cliente já tem esta versão"""
+    response = jsonify(payload)
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 @app.route("/", methods=["GET"])
 def home():
@@ -33,52 +143,221 @@ def home():
     
     return jsonify({
         "message": "API de Atualizações PERPLAN Media Player",
-        "version": CURRENT_VERSION,
+        "version": version_cache.get()["version"],
         "endpoints": {
             "check_update": "/api/update",
             "get_version": "/api/version", 
-            "download": "/api/download"
+            "download": "/api/download",
+            "manifest": "/api/manifest",
+            "delta": "/api/delta"
         },
         "files_available": files_in_updates
     })
 
 @app.route("/api/update", methods=["GET"])
 def check_update():
-    version_data = load_version()
-    return jsonify({
+    version_data = version_cache.get()
+    payload = {
         "version": version_data["version"],
         "download_url": "http://localhost:1234/api/download",
         "changelog": version_data.get("changelog", "Atualização disponível")
-    })
+    }
+    info = package_info(package_path(version_data["version"]))
+    etag = version_cache.etag
+    if info:
+        payload["size"] = info["size"]
+        payload["sha256"] = info["sha256"]
+        # Mesma versão republicada com outro pacote: o checksum muda, o ETag também
+        etag = f"{etag}-{info['sha256'][:16]}"
+    return conditional_json(payload, etag)
 
 @app.route("/api/version", methods=["GET"])
 def get_version():
-    version_data = load_version()
-    return jsonify({"version": version_data["version"]})
+    version_data = version_cache.get()
+    return conditional_json({"version": version_data["version"]}, version_cache.etag)
 
 @app.route("/api/download", methods=["GET"])
 def download_update():
     try:
-        version_data = load_version()
+        version_data = version_cache.get()
         filename = f"update_v{version_data['version']}.zip"
-        file_path = os.path.join(UPDATE_FILES_DIR, filename)
+        file_path = package_path(version_data['version'])
         
-        if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True, download_name=filename, mimetype='application/zip')
-        else:
-            create_sample_update_file(file_path)
-            
-            if os.path.exists(file_path):
-                return send_file(file_path, as_attachment=True, download_name=filename, mimetype='application/zip')
-            else:
-                return jsonify({"error": "Arquivo de atualização não encontrado"}), 404
+        info = package_info(file_path)
+        if info is None:
+            return jsonify({"error": "Arquivo de atualização não encontrado"}), 404
+        
+        # conditional=True: Range/If-Range (retomada), If-None-Match e If-Modified-Since
+        response = send_file(
+            os.path.abspath(file_path),
+            as_attachment=True,
+            download_name=filename,
+            mimetype='application/zip',
+            conditional=True,
+            etag=info["sha256"][:32],
+            last_modified=info["mtime"],
+        )
+        response.headers["X-Content-SHA256"] = info["sha256"]
+        return response
                 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def package_path(version):
+    return os.path.join(UPDATE_FILES_DIR, f"update_v{version}.zip")
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def build_manifest(zip_path, version, package_sha256=None):
+    """Hash de conteúdo de cada arquivo do pacote, usado para montar deltas.
+
+    Ler cada membro até o fim também confere o CRC-32, então um ZIP
+    corrompido levanta BadZipFile aqui.
+    """
+    files = {}
+    with zipfile.ZipFile(zip_path) as zipf:
+        for info in zipf.infolist():
+            if info.is_dir():
+                continue
+            digest = hashlib.sha256()
+            with zipf.open(info) as member:
+                for block in iter(lambda: member.read(1024 * 1024), b""):
+                    digest.update(block)
+            files[info.filename] = {"sha256": digest.hexdigest(), "size": info.file_size}
+    return {
+        "version": version,
+        "package_size": os.path.getsize(zip_path),
+        "package_sha256": package_sha256 or file_sha256(zip_path),
+        "files": files,
+    }
+
+def manifest_path(version):
+    return os.path.join(MANIFEST_DIR, f"manifest_v{version}.json")
+
+def save_manifest(version, manifest):
+    path = manifest_path(version)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+    stat = os.stat(path)
+    _manifests[version] = ((stat.st_mtime_ns, stat.st_size), manifest)
+
+# Cache por assinatura do arquivo: com vários workers, um reenvio da mesma
+# versão feito por outro processo invalida a cópia em memória deste
+_manifests = {}
+
+def load_manifest(version):
+    """Manifesto da versão; gerado a partir do ZIP na primeira vez que é pedido"""
+    path = manifest_path(version)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        stat = None
+    if stat is not None:
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = _manifests.get(version)
+        if cached and cached[0] == signature:
+            return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        _manifests[version] = (signature, manifest)
+        return manifest
+    zip_path = package_path(version)
+    if not os.path.exists(zip_path):
+        return None
+    manifest = build_manifest(zip_path, version)
+    save_manifest(version, manifest)
+    return manifest
+
+def build_delta(zip_path, delta_path, files):
+    """Copia só os arquivos pedidos do pacote completo para um ZIP menor"""
+    tmp_path = f"{delta_path}.{uuid.uuid4().hex}.tmp"
+    with zipfile.ZipFile(zip_path) as source, zipfile.ZipFile(tmp_path, 'w') as delta:
+        for name in files:
+            info = source.getinfo(name)
+            with source.open(info) as member:
+                delta.writestr(info, member.read(), compress_type=info.compress_type)
+    sha256 = file_sha256(tmp_path)
+    # Publicação atômica: downloads simultâneos nunca veem o ZIP pela metade.
+    # O .sha256 marca o delta como pronto, então também entra por renomeação
+    # e só depois do ZIP: outro worker nunca lê um checksum vazio
+    os.replace(tmp_path, delta_path)
+    sha_tmp_path = f"{delta_path}.sha256.{uuid.uuid4().hex}.tmp"
+    with open(sha_tmp_path, 'w') as f:
+        f.write(sha256)
+    os.replace(sha_tmp_path, delta_path + ".sha256")
+
+@app.route("/api/manifest", methods=["GET"])
+def get_manifest():
+    version_data = version_cache.get()
+    manifest = load_manifest(version_data["version"])
+    if manifest is None:
+        return jsonify({"error": "Manifesto não disponível"}), 404
+    return conditional_json(manifest, manifest["package_sha256"][:32])
+
+@app.route("/api/delta", methods=["POST"])
+def create_delta():
+    """Recebe a lista de arquivos que o cliente precisa e devolve onde baixar o pacote parcial"""
+    try:
+        data = request.get_json(silent=True) or {}
+        version = version_cache.get()["version"]
+        if str(data.get("version")) != str(version):
+            return jsonify({"error": "Versão do manifesto desatualizada", "version": version}), 409
+
+        manifest = load_manifest(version)
+        if manifest is None:
+            return jsonify({"error": "Manifesto não disponível"}), 404
+
+        files = set(data.get("files", []))
+        unknown = [name for name in files if name not in manifest["files"]]
+        if unknown:
+            return jsonify({"error": f"Arquivos fora do manifesto: {unknown[:5]}"}), 400
+        # O pacote sempre leva o updater, que é quem instala os arquivos
+        if UPDATER_NAME in manifest["files"]:
+            files.add(UPDATER_NAME)
+        files = sorted(files)
+
+        # O hash do pacote entra na chave: uma versão republicada não reaproveita deltas antigos
+        key_source = "\n".join([manifest["package_sha256"]] + files)
+        key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:16]
+        delta_name = f"delta_v{version}_{key}.zip"
+        delta_path = os.path.join(DELTA_DIR, delta_name)
+        if not os.path.exists(delta_path + ".sha256"):
+            build_delta(package_path(version), delta_path, files)
+
+        with open(delta_path + ".sha256") as f:
+            sha256 = f.read().strip()
+        return jsonify({
+            "version": version,
+            "url": f"/api/delta/{delta_name}",
+            "size": os.path.getsize(delta_path),
+            "sha256": sha256,
+            "files": len(files),
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/delta/<name>", methods=["GET"])
+def download_delta(name):
+    sha_path = os.path.join(DELTA_DIR, os.path.basename(name) + ".sha256")
+    if not os.path.exists(sha_path):
+        return jsonify({"error": "Pacote parcial não encontrado"}), 404
+    with open(sha_path) as f:
+        sha256 = f.read().strip()
+    response = send_from_directory(os.path.abspath(DELTA_DIR), name, mimetype='application/zip', conditional=True, etag=sha256[:32])
+    response.headers["X-Content-SHA256"] = sha256
+    return response
+
 def create_sample_update_file(file_path):
     try:
-        version_data = load_version()
+        version_data = version_cache.get()
         with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
             zipf.writestr("README.txt", f"PERPLAN Media Player - Atualização v{version_data['version']}")
             zipf.writestr("changelog.txt", version_data.get("changelog", "Atualização disponível"))
@@ -86,53 +365,126 @@ def create_sample_update_file(file_path):
     except Exception as e:
         print(f"Erro ao criar arquivo: {e}")
 
+def version_key(version):
+    """Componentes numéricos da versão, para ordenar 3.10 depois de 3.9"""
+    parts = [int(part) for part in re.findall(r'\d+', str(version))]
+    while len(parts) > 1 and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+def validate_package(zip_path):
+    """Erro legível se o ZIP não pode ser publicado; None se está íntegro"""
+    try:
+        with zipfile.ZipFile(zip_path) as zipf:
+            names = zipf.namelist()
+    except zipfile.BadZipFile:
+        return "Arquivo não é um ZIP válido"
+    if not names:
+        return "ZIP vazio"
+    for name in names:
+        parts = name.replace('\\', '/').split('/')
+        if name.startswith(('/', '\\')) or '..' in parts or ':' in parts[0]:
+            return f"Caminho inválido no ZIP: {name}"
+    return None
+
+def delta_paths(version):
+    """Deltas já gerados para a versão (ZIP e .sha256)"""
+    return [os.path.join(DELTA_DIR, name) for name in os.listdir(DELTA_DIR) if name.startswith(f"delta_v{version}_")]
+
+def remove_files(paths):
+    """Remove os arquivos; devolve False se algum continuou em uso"""
+    removed = True
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # Windows: arquivo ainda aberto por um download; sai na próxima publicação
+            print(f"Não foi possível remover {path}: {e}")
+            removed = False
+            continue
+        _package_info.pop(path, None)
+    return removed
+
+def prune_versions(current):
+    """Remove pacotes, manifestos e deltas além das KEEP_VERSIONS anteriores à atual"""
+    versions = []
+    for name in os.listdir(UPDATE_FILES_DIR):
+        match = re.fullmatch(r'update_v(.+)\.zip', name)
+        if match:
+            versions.append(match.group(1))
+    older = sorted((v for v in versions if version_key(v) < version_key(current)), key=version_key, reverse=True)
+    for version in older[KEEP_VERSIONS:]:
+        remove_files([package_path(version), manifest_path(version)] + delta_paths(version))
+        _manifests.pop(version, None)
+        print(f"Removida versão antiga: {version}")
+
+def receive_upload():
+    """Arquivo enviado (multipart ou corpo cru) já gravado em disco com SHA-256"""
+    if 'file' in request.files:
+        file = request.files['file']
+        return file.filename, file.stream
+    # Corpo cru: POST /api/upload?filename=update_v4.1.zip, Content-Type: application/zip
+    upload = _HashingFile()
+    for block in iter(lambda: request.stream.read(UPLOAD_CHUNK), b""):
+        upload.write(block)
+    return request.args.get('filename', ''), upload
+
 @app.route("/api/upload", methods=["POST"])
 def upload_update():
+    upload = None
     try:
-        if 'file' not in request.files:
+        if 'file' not in request.files and not request.args.get('filename'):
             return jsonify({"error": "Nenhum arquivo enviado"}), 400
         
-        file = request.files['file']
-        changelog = request.form.get('changelog', 'Nova atualização disponível')
+        filename, upload = receive_upload()
+        upload.close()
+        changelog = request.form.get('changelog') or request.args.get('changelog') or 'Nova atualização disponível'
         
-        if file.filename == '':
+        if filename == '':
             return jsonify({"error": "Nome do arquivo vazio"}), 400
         
-        if not file.filename.endswith('.zip'):
+        if not filename.endswith('.zip'):
             return jsonify({"error": "Arquivo deve ser .zip"}), 400
         
-        match = re.search(r'v?(\d+(?:\.\d+)?)', file.filename)
+        # A versão fica como texto: float() transformaria 3.10 em 3.1
+        match = re.search(r'v?(\d+(?:\.\d+)*)', filename)
         if not match:
             return jsonify({"error": "Nome do arquivo deve conter versão (ex: update_v4.0.zip)"}), 400
         
-        new_version = match.group(1)
-        
-        for old_file in os.listdir(UPDATE_FILES_DIR):
-            if old_file.endswith('.zip'):
-                old_path = os.path.join(UPDATE_FILES_DIR, old_file)
-                os.remove(old_path)
-                print(f"Removido: {old_file}")
-        
-        new_filename = f"update_v{new_version}.zip"
-        file_path = os.path.join(UPDATE_FILES_DIR, new_filename)
-        file.save(file_path)
+        version_number = match.group(1)
         
+        error = validate_package(upload.path)
+        if error:
+            return jsonify({"error": error}), 400
+        sha256 = upload.digest.hexdigest()
         try:
-            version_number = float(new_version)
-        except:
-            version_number = int(float(new_version))
+            # Confere o CRC de cada membro e já gera o manifesto
+            manifest = build_manifest(upload.path, version_number, sha256)
+        except (zipfile.BadZipFile, EOFError) as e:
+            return jsonify({"error": f"ZIP corrompido: {e}"}), 400
+        
+        # Publicação: manifesto, depois o pacote por renomeação atômica e por
+        # último a versão; um download em andamento nunca vê um ZIP pela metade
+        file_path = package_path(version_number)
+        new_filename = os.path.basename(file_path)
+        save_manifest(version_number, manifest)
+        os.replace(upload.path, file_path)
+        # Versão republicada: os deltas montados do pacote anterior não servem mais
+        remove_files(delta_paths(version_number))
+        stat = os.stat(file_path)
+        _package_info[file_path] = {"key": (stat.st_mtime_ns, stat.st_size), "size": stat.st_size, "mtime": stat.st_mtime, "sha256": sha256}
         
         new_version_data = {
             "version": version_number,
             "changelog": changelog
         }
-        save_version(new_version_data)
-        
-        global CURRENT_VERSION
-        CURRENT_VERSION = version_number
+        version_cache.set(new_version_data)
+        prune_versions(version_number)
         
         print(f"Nova versão: {version_number}")
-        print(f"Arquivo salvo: {new_filename}")
+        print(f"Arquivo salvo: {new_filename} ({upload.size / 1e6:.1f} MB, SHA-256 {sha256[:12]}…)")
         print(f"Changelog: {changelog}")
         
         return jsonify({
@@ -140,15 +492,99 @@ def upload_update():
             "message": "Atualização enviada com sucesso",
             "version": version_number,
             "changelog": changelog,
-            "filename": new_filename
+            "filename": new_filename,
+            "size": upload.size,
+            "sha256": sha256
         }), 200
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    finally:
+        # Temporários que não foram publicados (erro ou campos de arquivo extras)
+        leftovers = [upload] + [f.stream for f in request.files.values()]
+        for item in leftovers:
+            if isinstance(item, _HashingFile):
+                item.close()
+                if os.path.exists(item.path):
+                    os.remove(item.path)
+
+def serve_production(host, port, workers, threads):
+    """
+    Servidor de produção.
+
+    Com gunicorn (Linux): processos pré-fork com threads, keep-alive e
+    downloads completos por sendfile (cópia zero do disco para o socket).
+    No Windows, sem gunicorn: waitress com um pool de threads.
+    Uma nova versão publicada não exige reinício: cada worker relê o
+    version.json e os manifestos quando os arquivos mudam, e downloads em
+    andamento seguem com o arquivo que já abriram. Para recarregar o
+    código sem derrubar conexões: kill -HUP <pid do processo principal>.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        BaseApplication = None
+    
+    if BaseApplication is not None:
+        class ProductionApp(BaseApplication):
+            def load_config(self):
+                options = {
+                    "bind": f"{host}:{port}",
+                    "workers": workers,
+                    "worker_class": "gthread",
+                    "threads": threads,
+                    "keepalive": API_KEEPALIVE,
+                    "sendfile": True,
+                    # Downloads longos têm esse prazo para terminar num reload/parada
+                    "graceful_timeout": API_GRACEFUL_TIMEOUT,
+                    "timeout": API_GRACEFUL_TIMEOUT,
+                }
+                for key, value in options.items():
+                    self.cfg.set(key, value)
+            
+            def load(self):
+                return app
+        
+        print(f"Produção (gunicorn): {workers} workers x {threads} threads")
+        ProductionApp().run()
+        return
+    
+    try:
+        from waitress import serve
+    except ImportError:
+        print("gunicorn/waitress não instalados; usando o servidor Flask com threads")
+        app.run(port=port, host=host, threaded=True)
+        return
+    
+    print(f"Produção (waitress): {workers * threads} threads")
+    serve(
+        app,
+        host=host,
+        port=port,
+        threads=workers * threads,
+        channel_timeout=API_KEEPALIVE,
+        connection_limit=API_CONNECTION_LIMIT,
+    )
 
 if __name__ == "__main__":
-    version_data = load_version()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="API de Atualizações PERPLAN Media Player")
+    parser.add_argument("--production", action="store_true", help="servidor de produção (gunicorn/waitress)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="processos (gunicorn)")
+    parser.add_argument("--threads", type=int, default=API_THREADS, help="threads por processo")
+    args = parser.parse_args()
+    
+    version_data = version_cache.get()
+    # Pacote de exemplo para desenvolvimento, criado na partida e não a cada download
+    if not os.path.exists(package_path(version_data['version'])):
+        create_sample_update_file(package_path(version_data['version']))
     print(f"API de Atualizações PERPLAN Media Player v{version_data['version']}")
     print(f"Changelog: {version_data.get('changelog', 'N/A')}")
-    print(f"Rodando em: http://localhost:1234")
-    app.run(port=1234, host="0.0.0.0")
\ No newline at end of file
+    print(f"Rodando em: http://localhost:{args.port}")
+    if args.production:
+        serve_production(args.host, args.port, args.workers, args.threads)
+    else:
+        app.run(port=args.port, host=args.host)
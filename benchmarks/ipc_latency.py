@@ -0,0 +1,181 @@
+"""
+Round-trip latency of the player IPC transports.
+
+Compares TCP on localhost, the local transport (Unix socket / named pipe)
+and the shared-memory ring. By default an echo process answers PING
+frames, so only the transport is measured; ``--player`` measures TCP and
+the local transport against a running PPL Player instead (including the
+hop to the GUI thread).
+
+Usage:
+    python benchmarks/ipc_latency.py [--count 5000] [--player]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ipc_protocol as proto  # noqa: E402
+from ipc_transport import local_address, start_local_server, open_local_connection  # noqa: E402
+from state_ring import StateRing  # noqa: E402
+
+BENCH_PORT = 13370
+RECORD_SIZE = 8
+
+# "spawn" em todas as plataformas: com fork o filho compartilharia o
+# resource tracker do pai e removeria o registro dos blocos de memória
+mp = multiprocessing.get_context("spawn")
+
+
+# Espera ativa cedendo o processador (essencial com poucos núcleos)
+yield_cpu = getattr(os, "sched_yield", None) or (lambda: time.sleep(0))
+
+
+# Processo de eco
+
+async def _echo_connection(reader, writer):
+    try:
+        while True:
+            message = await proto.read_message(reader)
+            writer.write(proto.encode_reply(message, proto.STATUS_OK))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _echo_sockets(ready):
+    server = await asyncio.start_server(_echo_connection, "127.0.0.1", BENCH_PORT)
+    local_server = await start_local_server(_echo_connection, local_address(BENCH_PORT))
+    ready.set()
+    async with server:
+        await server.serve_forever()
+    local_server.close()
+
+
+def echo_process(ready):
+    asyncio.run(_echo_sockets(ready))
+
+
+def ring_echo_process(parent_pid, ready, stop):
+    # Processo separado: a espera ativa não disputa o GIL com o eco dos sockets
+    # O filho usa o resource tracker do pai, que é quem remove os blocos
+    requests = StateRing.attach(f"bench-req-{parent_pid}", track=True)
+    replies = StateRing.attach(f"bench-rep-{parent_pid}", track=True)
+    ready.set()
+    last = 0
+    while not stop.is_set():
+        seq = requests.last_seq()
+        if seq != last:
+            last = seq
+            replies.write(requests.read_latest()[1])
+        else:
+            yield_cpu()
+
+
+# Medições
+
+async def _socket_round_trips(reader, writer, count):
+    samples = []
+    for request_id in range(count):
+        started = time.perf_counter()
+        writer.write(proto.encode_request(proto.OP_PING, request_id))
+        await proto.read_message(reader)
+        samples.append(time.perf_counter() - started)
+    writer.close()
+    return samples
+
+
+async def measure_tcp(port, count):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    return await _socket_round_trips(reader, writer, count)
+
+
+async def measure_local(port, count):
+    reader, writer = await open_local_connection(local_address(port))
+    return await _socket_round_trips(reader, writer, count)
+
+
+def measure_ring(count):
+    requests = StateRing.create(RECORD_SIZE, name=f"bench-req-{os.getpid()}")
+    replies = StateRing.create(RECORD_SIZE, name=f"bench-rep-{os.getpid()}")
+    ready = mp.Event()
+    stop = mp.Event()
+    echo = mp.Process(target=ring_echo_process, args=(os.getpid(), ready, stop), daemon=True)
+    echo.start()
+    try:
+        ready.wait(10)
+        samples = []
+        for i in range(1, count + 1):
+            started = time.perf_counter()
+            requests.write(i.to_bytes(RECORD_SIZE, "little"))
+            while replies.last_seq() < i:
+                yield_cpu()
+            samples.append(time.perf_counter() - started)
+        return samples
+    finally:
+        stop.set()
+        echo.join(5)
+        requests.close()
+        replies.close()
+
+
+def report(name, samples):
+    if not samples:
+        print(f"{name:<22} indisponível")
+        return
+    samples = sorted(s * 1e6 for s in samples)
+
+    def percentile(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+    print(
+        f"{name:<22} p50 {percentile(0.50):8.1f} µs   p95 {percentile(0.95):8.1f} µs   "
+        f"p99 {percentile(0.99):8.1f} µs   média {statistics.fmean(samples):8.1f} µs"
+    )
+
+
+def run(transport, func, *args):
+    try:
+        result = func(*args)
+        return asyncio.run(result) if asyncio.iscoroutine(result) else result
+    except (OSError, NotImplementedError) as e:
+        print(f"[BENCH] {transport}: {e}")
+        return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência de ida e volta dos transportes IPC")
+    parser.add_argument("--count", type=int, default=5000, help="mensagens por transporte")
+    parser.add_argument("--player", action="store_true", help="mede contra o player em execução (MEDIA_PORT)")
+    args = parser.parse_args()
+
+    if args.player:
+        from config import MEDIA_PORT
+        print(f"Player em MEDIA_PORT={MEDIA_PORT}, {args.count} PINGs por transporte\n")
+        report("TCP", run("TCP", measure_tcp, MEDIA_PORT, args.count))
+        report("Socket local/pipe", run("local", measure_local, MEDIA_PORT, args.count))
+        return
+
+    ready = mp.Event()
+    echo = mp.Process(target=echo_process, args=(ready,), daemon=True)
+    echo.start()
+    ready.wait(10)
+    try:
+        print(f"Processo de eco, {args.count} mensagens por transporte\n")
+        report("TCP", run("TCP", measure_tcp, BENCH_PORT, args.count))
+        report("Socket local/pipe", run("local", measure_local, BENCH_PORT, args.count))
+    finally:
+        echo.terminate()
+        echo.join()
+    report("Memória compartilhada", run("shm", measure_ring, args.count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+Load test for the update API (api/api.py).
+
+Simulates a fleet of workstations hitting the API at the same time after
+a release: each client keeps one HTTP connection and loops over a mix of
+requests (conditional version checks, /api/update, manifest, full
+downloads and resumed Range downloads). By default the API is started in
+a temporary directory with a generated package of ``--package-mb`` MB;
+``--url`` measures a server that is already running instead.
+
+Clients are spread over several processes so the load generator is not
+limited by one GIL. Results can be saved with ``--json`` and compared
+side by side with ``--compare``.
+
+Usage:
+    python benchmarks/update_api_load.py --clients 50 --duration 20
+    python benchmarks/update_api_load.py --mix version=20,download=1 --json dev.json
+    python benchmarks/update_api_load.py --compare dev.json prod.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+API_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api", "api.py")
+API_PORT = 1234
+CHUNK = 1024 * 1024
+RANGE_SIZE = 1024 * 1024  # bytes pedidos por uma retomada
+
+KINDS = ("version", "update", "manifest", "download", "range")
+DEFAULT_MIX = "version=20,update=2,manifest=1,download=1,range=1"
+
+mp = multiprocessing.get_context("spawn")
+
+
+# Servidor local
+
+def make_package(path, size_mb):
+    """ZIP incompressível de ~size_mb MB, em arquivos de 1 MB como um build real."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zipf:
+        zipf.writestr("updater.exe", os.urandom(64 * 1024))
+        for i in range(max(1, int(size_mb))):
+            zipf.writestr(f"_internal/lib_{i:04d}.pyd", os.urandom(CHUNK))
+
+
+def server_port(server_args, default=API_PORT):
+    """Porta passada a api.py em ``--port N`` / ``--port=N``, ou ``default``."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--port", type=int, default=default)
+    return parser.parse_known_args(server_args)[0].port
+
+
+def start_api(workdir, package_mb, server_args, port=API_PORT):
+    """Sobe api.py em ``workdir`` e publica um pacote pelo próprio /api/upload.
+
+    A porta vem de ``--port`` em ``server_args`` quando presente; senão
+    ``port`` é repassada a api.py.
+    """
+    import requests
+
+    port = server_port(server_args, port)
+    if port != server_port(server_args, None):
+        server_args = [*server_args, "--port", str(port)]
+    log = open(os.path.join(workdir, "api.log"), "wb")
+    process = subprocess.Popen(
+        [sys.executable, API_SCRIPT, *server_args],
+        cwd=workdir,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 15
+    while True:
+        try:
+            requests.get(f"{base}/api/version", timeout=1)
+            break
+        except requests.RequestException:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f"API não subiu; veja {log.name}")
+            time.sleep(0.1)
+
+    package = os.path.join(workdir, "bench_package.zip")
+    make_package(package, package_mb)
+    with open(package, "rb") as f:
+        response = requests.post(
+            f"{base}/api/upload",
+            params={"filename": "update_v99.0.zip", "changelog": "benchmark"},
+            data=f,
+            headers={"Content-Type": "application/zip"},
+            timeout=120,
+        )
+    response.raise_for_status()
+    os.remove(package)
+    return process, base
+
+
+def stop_api(process):
+    process.terminate()
+    try:
+        process.wait(10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# Clientes
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(","):
+        kind, _, weight = item.partition("=")
+        if kind not in KINDS:
+            raise argparse.ArgumentTypeError(f"tipo desconhecido: {kind} (use {', '.join(KINDS)})")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+class ClientStats:
+    """Amostras de um processo gerador: latências, bytes e erros por tipo."""
+
+    def __init__(self):
+        self.latency = {kind: [] for kind in KINDS}
+        self.first_byte = {kind: [] for kind in KINDS}
+        self.bytes = {kind: 0 for kind in KINDS}
+        self.errors = {kind: 0 for kind in KINDS}
+        self.not_modified = 0
+        self.lock = threading.Lock()
+
+    def add(self, kind, latency, first_byte, size):
+        with self.lock:
+            self.latency[kind].append(latency)
+            self.first_byte[kind].append(first_byte)
+            self.bytes[kind] += size
+
+    def error(self, kind):
+        with self.lock:
+            self.errors[kind] += 1
+
+    def as_dict(self):
+        return {
+            "latency": self.latency,
+            "first_byte": self.first_byte,
+            "bytes": self.bytes,
+            "errors": self.errors,
+            "not_modified": self.not_modified,
+        }
+
+
+def run_client(base, mix, deadline, stats, seed):
+    import requests
+
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    session = requests.Session()  # uma conexão keep-alive por estação
+    etag = None
+    package_size = None
+
+    while time.monotonic() < deadline:
+        kind = rng.choices(kinds, weights)[0]
+        headers = {}
+        url = f"{base}/api/{kind}"
+        if kind == "version" and etag:
+            headers["If-None-Match"] = etag
+        elif kind in ("download", "range"):
+            url = f"{base}/api/download"
+            if kind == "range":
+                if package_size is None:
+                    kind = "download"
+                else:
+                    start = rng.randrange(0, max(1, package_size - RANGE_SIZE))
+                    headers["Range"] = f"bytes={start}-{start + RANGE_SIZE - 1}"
+        started = time.perf_counter()
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=(5, 60)) as response:
+                first_byte = time.perf_counter() - started
+                size = 0
+                for chunk in response.iter_content(CHUNK):
+                    size += len(chunk)
+            latency = time.perf_counter() - started
+            if response.status_code >= 400:
+                stats.error(kind)
+                continue
+        except requests.RequestException:
+            stats.error(kind)
+            session = requests.Session()
+            continue
+        if kind == "version":
+            if response.status_code == 304:
+                with stats.lock:
+                    stats.not_modified += 1
+            etag = response.headers.get("ETag") or etag
+        elif kind == "download":
+            package_size = size
+        stats.add(kind, latency, first_byte, size)
+
+
+def generator_process(base, mix, clients, start_at, duration, seed, results):
+    stats = ClientStats()
+    # Todos começam juntos, como as estações após uma publicação
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=run_client, args=(base, mix, deadline, stats, seed * 1000 + i), daemon=True)
+        for i in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(stats.as_dict())
+
+
+def run_load(base, mix, clients, processes, duration):
+    results = mp.Queue()
+    processes = max(1, min(processes, clients))
+    start_at = time.time() + 1.0 + 0.2 * processes
+    workers = []
+    for p in range(processes):
+        count = clients // processes + (1 if p < clients % processes else 0)
+        worker = mp.Process(target=generator_process, args=(base, mix, count, start_at, duration, p, results))
+        worker.start()
+        workers.append(worker)
+
+    merged = ClientStats().as_dict()
+    for _ in workers:
+        part = results.get()
+        for kind in KINDS:
+            merged["latency"][kind] += part["latency"][kind]
+            merged["first_byte"][kind] += part["first_byte"][kind]
+            merged["bytes"][kind] += part["bytes"][kind]
+            merged["errors"][kind] += part["errors"][kind]
+        merged["not_modified"] += part["not_modified"]
+    for worker in workers:
+        worker.join()
+    return merged
+
+
+# Relatório
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else 0.0
+
+
+def summarize(merged, duration, label, config):
+    summary = {"label": label, "config": config, "kinds": {}}
+    total_requests = total_bytes = total_errors = 0
+    for kind in KINDS:
+        samples = sorted(merged["latency"][kind])
+        errors = merged["errors"][kind]
+        if not samples and not errors:
+            continue
+        first_byte = sorted(merged["first_byte"][kind])
+        summary["kinds"][kind] = {
+            "requests": len(samples),
+            "errors": errors,
+            "req_s": len(samples) / duration,
+            "mb_s": merged["bytes"][kind] / duration / 1e6,
+            "p50_ms": percentile(samples, 0.50) * 1e3,
+            "p90_ms": percentile(samples, 0.90) * 1e3,
+            "p99_ms": percentile(samples, 0.99) * 1e3,
+            "max_ms": (samples[-1] if samples else 0.0) * 1e3,
+            "mean_ms": (statistics.fmean(samples) if samples else 0.0) * 1e3,
+            "ttfb_p99_ms": percentile(first_byte, 0.99) * 1e3,
+        }
+        total_requests += len(samples)
+        total_bytes += merged["bytes"][kind]
+        total_errors += errors
+    summary["total"] = {
+        "requests": total_requests,
+        "errors": total_errors,
+        "req_s": total_requests / duration,
+        "mb_s": total_bytes / duration / 1e6,
+        "not_modified": merged["not_modified"],
+    }
+    return summary
+
+
+def print_summary(summary):
+    config = summary["config"]
+    print(f"\n{summary['label']}: {config['clients']} clientes em {config['processes']} processos, {config['duration']} s")
+    print(f"{'tipo':<10}{'req':>8}{'erros':>7}{'req/s':>9}{'MB/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'máx ms':>9}{'TTFB p99':>10}")
+    for kind, row in summary["kinds"].items():
+        print(
+            f"{kind:<10}{row['requests']:>8}{row['errors']:>7}{row['req_s']:>9.1f}{row['mb_s']:>9.1f}"
+            f"{row['p50_ms']:>9.1f}{row['p90_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}{row['ttfb_p99_ms']:>10.1f}"
+        )
+    total = summary["total"]
+    print(
+        f"{'total':<10}{total['requests']:>8}{total['errors']:>7}{total['req_s']:>9.1f}{total['mb_s']:>9.1f}"
+        f"   ({total['not_modified']} respostas 304)"
+    )
+
+
+def compare(paths):
+    """Tabela lado a lado de resultados salvos com --json."""
+    summaries = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            summaries.append(json.load(f))
+    width = max(12, *(len(s["label"]) + 2 for s in summaries))
+    print(f"{'':<22}" + "".join(f"{s['label']:>{width}}" for s in summaries))
+    rows = [("total", "req_s", "req/s"), ("total", "mb_s", "MB/s"), ("total", "errors", "erros")]
+    for kind in KINDS:
+        rows += [(kind, "p50_ms", "p50 ms"), (kind, "p99_ms", "p99 ms")]
+    for kind, key, name in rows:
+        values = [(s["total"] if kind == "total" else s["kinds"].get(kind, {})).get(key) for s in summaries]
+        if all(value is None for value in values):
+            continue
+        cells = "".join(
+            f"{'-' if value is None else format(value, 'd' if isinstance(value, int) else '.1f'):>{width}}"
+            for value in values
+        )
+        print(f"{kind + ' ' + name:<22}{cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API de atualizações")
+    parser.add_argument("--clients", type=int, default=50, help="estações simultâneas")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="processos geradores de carga")
+    parser.add_argument("--duration", type=float, default=15, help="segundos de carga")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"pesos por tipo (padrão {DEFAULT_MIX})")
+    parser.add_argument("--package-mb", type=float, default=20, help="tamanho do pacote gerado para o servidor local")
+    parser.add_argument("--url", help="mede um servidor já em execução (ex: http://host:1234/mediaplayer)")
+    parser.add_argument("--server-args", default="", help="argumentos extras para api.py no servidor local")
+    parser.add_argument("--port", type=int, default=API_PORT, help="porta do servidor local (ou --port em --server-args)")
+    parser.add_argument("--label", help="nome desta configuração no relatório")
+    parser.add_argument("--json", help="salva o resumo neste arquivo")
+    parser.add_argument("--compare", nargs="+", metavar="JSON", help="compara resumos salvos e sai")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+
+    mix = args.mix if isinstance(args.mix, dict) else parse_mix(args.mix)
+    process = workdir = None
+    if args.url:
+        base = args.url.rstrip("/")
+    else:
+        workdir = tempfile.mkdtemp(prefix="update_api_bench_")
+        print(f"[BENCH] Subindo a API em {workdir} com pacote de {args.package_mb:g} MB")
+        process, base = start_api(workdir, args.package_mb, args.server_args.split(), args.port)
+
+    try:
+        merged = run_load(base, mix, args.clients, args.processes, args.duration)
+    finally:
+        if process is not None:
+            stop_api(process)
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    config = {
+        "clients": args.clients,
+        "processes": max(1, min(args.processes, args.clients)),
+        "duration": args.duration,
+        "mix": mix,
+        "package_mb": None if args.url else args.package_mb,
+        "server": args.url or f"api.py {args.server_args}".strip(),
+    }
+    summary = summarize(merged, args.duration, args.label or config["server"], config)
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n[BENCH] Resumo salvo em {args.json}")
+
+
+if __name__ == "__main__":
+    main()
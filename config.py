@@ -36,9 +36,40 @@ MOUSE_CHECK_INTERVAL = 500  # milliseconds
 HOST = "localhost"
 MEDIA_PORT = 1337
 CONTADOR_PORT = 3000
+IPC_MAX_FRAME_SIZE = 1024 * 1024  # bytes por mensagem do protocolo IPC
+IPC_LOCAL_NAME = "ppl-player"  # prefixo do socket local/named pipe e da memória compartilhada
+STATE_RING_SLOTS = 64  # amostras de telemetria mantidas na memória compartilhada
+SINGLE_INSTANCE_TIMEOUT = 0.5  # segundos para conectar ao player já aberto
+SINGLE_INSTANCE_REPLY_TIMEOUT = 5.0  # segundos aguardando o player já aberto aceitar os argumentos
+IPC_DRAIN_BUDGET_MS = 8  # tempo máximo executando comandos por passada antes de devolver a GUI ao Qt
+IPC_LATENCY_BUDGET_MS = 50  # limite entre a leitura no socket e a ação na GUI; acima disso é registrado
+IPC_LATENCY_WINDOW = 2048  # últimas medições usadas nos percentis
+
+# Telemetry Configuration (posição enviada ao contador)
+TELEMETRY_SAMPLE_INTERVAL = 20  # milliseconds (amostragem na thread da GUI)
+TELEMETRY_IDLE_INTERVAL = 200  # milliseconds (pausado, parado ou sem consumidores)
+TELEMETRY_SEEK_TOLERANCE = 500  # ms além do avanço esperado para tratar como salto
+TELEMETRY_DEFAULT_RATE = 10  # envios por segundo
+TELEMETRY_MAX_RATE = 50  # envios por segundo
+TELEMETRY_MAX_BUFFER = 4096  # bytes pendentes por assinante antes de descartar amostras
+HUB_QUEUE_MAX = 1024  # eventos de estado/contagens/alertas pendentes por assinante
+HUB_MAX_BUFFER = 64 * 1024  # bytes no socket antes de esperar o assinante esvaziar
+
+# Count Overlay Configuration (contagens recebidas do contador)
+COUNT_INTERVAL_MINUTES = 15  # intervalo dos totais mostrados na timeline
+COUNT_DENSITY_COLOR = "#f59e0b"
 
 #API Configuration
 API_URL = "https://perplan.tech"
+UPDATE_DOWNLOAD_SEGMENTS = 4  # conexões paralelas (faixas HTTP Range) por download
+UPDATE_DOWNLOAD_MIN_SEGMENT = 4 * 1024 * 1024  # bytes; arquivos menores usam uma conexão só
+UPDATE_DOWNLOAD_CHUNK = 256 * 1024  # bytes lidos por vez do socket
+UPDATE_DOWNLOAD_RETRIES = 5  # tentativas por faixa antes de desistir
+UPDATE_DOWNLOAD_TIMEOUT = (5, 30)  # segundos: conexão, leitura sem dados
+UPDATE_DELTA_MAX_RATIO = 0.7  # acima desta fração do app alterada, baixa o pacote completo
+UPDATE_CHECK_INTERVAL = 60 * 60  # segundos entre consultas de versão bem-sucedidas
+UPDATE_CHECK_BACKOFF = (60, 6 * 60 * 60)  # segundos: espera após a 1ª falha, espera máxima
+UPDATE_CHECK_TIMEOUT = (3, 5)  # segundos: conexão, leitura
 
 # Auto-pause settings (for long videos)
 AUTO_PAUSE_MIN_DURATION = 50  # minutes
@@ -64,6 +95,12 @@ ZOOM_MIN_VALUE = 10
 ZOOM_MAX_VALUE = 40
 ZOOM_DEFAULT_SCALE_X = 80
 ZOOM_DEFAULT_SCALE_Y = 45
+ZOOM_PREVIEW_FPS = 10  # Taxa máxima de atualização do preview do zoom
+ZOOM_LIVE_MAX = 8.0  # Zoom máximo do modo ao vivo (roda do mouse)
+ZOOM_WHEEL_STEP = 1.25  # Fator aplicado a cada passo da roda do mouse
+ZOOM_INSET_MAX = 4  # Máximo de janelas picture-in-picture
+ZOOM_INSET_WIDTH_RATIO = 0.28  # Largura de cada inset em relação ao videoframe
+ZOOM_INSET_MARGIN = 12  # pixels
 
 # Speed Menu Options
 SPEED_OPTIONS = ["1x", "2x", "4x", "6x", "8x", "10x", "12x", "16x", "32x"]
@@ -72,6 +109,14 @@ SPEED_OPTIONS = ["1x", "2x", "4x", "6x", "8x", "10x", "12x", "16x", "32x"]
 DEFAULT_VIDEO_PATH = "P:/"
 VIDEO_FILTER = "Vídeos (*.dav *.mp4 *.avi *.mkv *.dav_);;Todos os Arquivos (*)"
 
+# Folder Scan Configuration
+FOLDER_SCAN_BATCH_SIZE = 64  # arquivos por lote enviado à playlist
+FOLDER_SCAN_FLUSH_INTERVAL = 0.2  # segundos até enviar um lote incompleto
+
+# Session Configuration
+SESSION_SAVE_INTERVAL = 5000  # milliseconds
+SESSION_JOURNAL_MAX_ENTRIES = 500  # entradas antes de compactar em snapshot
+
 # Notification Colors
 NOTIFICATION_COLORS = {
     "info": "rgba(189, 189, 189, 0.5)",
@@ -0,0 +1,92 @@
+"""
+Count event store for PPL Player.
+Keeps the counts sent by the counter apps in typed arrays, one column per
+field, and answers timeline queries (density, per-interval totals) by
+binary search over the time column.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+
+class CountStore:
+    """Columnar store of count events for one video.
+
+    ``times`` (video time in ms), ``categories`` and ``movements`` are
+    parallel ``array`` columns, so a study with hundreds of thousands of
+    events takes a few megabytes and no per-event Python objects. The
+    columns are always sorted by time: events usually arrive in order and
+    are appended, late ones are inserted at their bisected position. Each
+    category also keeps its own time column so per-category counts are
+    two bisections as well.
+    """
+
+    def __init__(self):
+        self.times = array("d")
+        self.categories = array("B")
+        self.movements = array("B")
+        self._category_times = {}  # categoria -> array("d") de tempos
+        self.version = 0  # muda a cada alteração (cache do overlay)
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, time_ms, category, movement=0):
+        """Add one event."""
+        column = self._category_times.get(category)
+        if column is None:
+            column = self._category_times[category] = array("d")
+
+        times = self.times
+        if not times or time_ms >= times[-1]:
+            times.append(time_ms)
+            self.categories.append(category)
+            self.movements.append(movement)
+        else:
+            # Evento atrasado: insere na posição (memmove em C, sem reordenar tudo)
+            position = bisect_right(times, time_ms)
+            times.insert(position, time_ms)
+            self.categories.insert(position, category)
+            self.movements.insert(position, movement)
+
+        if not column or time_ms >= column[-1]:
+            column.append(time_ms)
+        else:
+            column.insert(bisect_right(column, time_ms), time_ms)
+        self.version += 1
+
+    def extend(self, events):
+        """Add ``(time_ms, category, movement)`` tuples."""
+        for time_ms, category, movement in events:
+            self.append(time_ms, category, movement)
+
+    def clear(self):
+        self.__init__()
+
+    # Consultas
+
+    def count_between(self, start_ms, end_ms, category=None) -> int:
+        """Number of events with ``start_ms <= time < end_ms``."""
+        times = self.times if category is None else self._category_times.get(category, ())
+        return bisect_left(times, end_ms) - bisect_left(times, start_ms)
+
+    def histogram(self, start_ms, end_ms, bins) -> list:
+        """
+        Count events in ``bins`` equal slices of [start_ms, end_ms).
+
+        Costs one bisection per bin edge, independent of the event count.
+        """
+        if bins <= 0 or end_ms <= start_ms:
+            return []
+        step = (end_ms - start_ms) / bins
+        times = self.times
+        edges = [bisect_left(times, start_ms + step * i) for i in range(bins)]
+        edges.append(bisect_left(times, end_ms))
+        return [edges[i + 1] - edges[i] for i in range(bins)]
+
+    def interval_totals(self, start_ms, end_ms) -> Counter:
+        """Totals per ``(category, movement)`` in [start_ms, end_ms)."""
+        first = bisect_left(self.times, start_ms)
+        last = bisect_left(self.times, end_ms)
+        return Counter(zip(self.categories[first:last], self.movements[first:last]))
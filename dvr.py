@@ -0,0 +1,182 @@
+"""
+DVR filename parsing and playlist indexing for PPL Player.
+Extracts channel and recording time from Dahua/Hikvision export names and
+keeps playlist entries grouped by camera in recording order.
+"""
+
+import os
+import re
+from bisect import bisect_right, insort
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+# Canal: "ch01", "ch1_main", "channel 2", "cam3", "Camera 01", "D04"
+_CHANNEL_RE = re.compile(r"(?:^|[^a-z])(?:ch|channel|cam|camera|d)[ _-]?0*(\d{1,3})(?=[^\d]|$)", re.IGNORECASE)
+# Hikvision: "192.168.1.64_01_20230515080000..."
+_IP_CHANNEL_RE = re.compile(r"^\d{1,3}(?:\.\d{1,3}){3}_0*(\d{1,3})_")
+# Data/hora completas: "20230515080000", "20230515_080000", "2023-05-15 08-00-00"
+_DATETIME_RE = re.compile(
+    r"(\d{4})[-_.]?(\d{2})[-_.]?(\d{2})[ _T-]?(\d{2})[-_.:]?(\d{2})[-_.:]?(\d{2})"
+)
+# Dahua (cartão SD/exportação por pasta): "08.00.00-09.00.00[M][0@0][0].dav"
+_TIME_RANGE_RE = re.compile(r"^(\d{2})\.(\d{2})\.(\d{2})-(\d{2})\.(\d{2})\.(\d{2})")
+_FOLDER_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+# Dahua (cartão SD): ".../2023-05-15/001/dav/08/..." — a pasta de 3 dígitos é o canal
+_FOLDER_CHANNEL_RE = re.compile(r"^0*(\d{1,3})$")
+FOLDER_CHANNEL_DEPTH = 4  # pastas acima do arquivo onde o canal é procurado
+_NATURAL_RE = re.compile(r"(\d+)")
+
+
+class DvrSegment(NamedTuple):
+    """Information extracted from a DVR export filename."""
+
+    path: str
+    camera: Optional[int]
+    start: Optional[datetime]
+    end: Optional[datetime]
+
+
+def natural_sort_key(text: str):
+    """
+    Sort key that compares digit runs as numbers ("ch2" < "ch10").
+
+    Args:
+        text (str): Text to build the key for
+
+    Returns:
+        tuple: Key usable with sorted()/bisect
+    """
+    return tuple(int(part) if part.isdigit() else part for part in _NATURAL_RE.split(text.lower()))
+
+
+def _make_datetime(parts) -> Optional[datetime]:
+    try:
+        return datetime(*(int(p) for p in parts))
+    except ValueError:
+        return None
+
+
+def _folder_camera(path: str) -> Optional[int]:
+    """Channel taken from the parent folders, for exports that keep it out of the filename."""
+    folders = os.path.normpath(os.path.dirname(path)).replace("\\", "/").split("/")
+    folders = folders[-FOLDER_CHANNEL_DEPTH:]
+    for index in range(len(folders) - 1, -1, -1):
+        match = _CHANNEL_RE.search(folders[index])
+        if match:
+            return int(match.group(1))
+        # "001" logo abaixo da pasta de data, como no cartão SD da Dahua
+        if index > 0 and len(folders[index]) == 3 and _FOLDER_DATE_RE.fullmatch(folders[index - 1]):
+            match = _FOLDER_CHANNEL_RE.match(folders[index])
+            if match:
+                return int(match.group(1))
+    return None
+
+
+def parse_dvr_filename(path: str) -> DvrSegment:
+    """
+    Extract camera and recording interval from a DVR export filename.
+
+    Fields that cannot be recognised are returned as None.
+
+    Args:
+        path (str): Full path or filename of the segment
+
+    Returns:
+        DvrSegment: Parsed information
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+
+    match = _IP_CHANNEL_RE.match(name) or _CHANNEL_RE.search(name)
+    camera = int(match.group(1)) if match else _folder_camera(path)
+
+    stamps = [_make_datetime(m.groups()) for m in _DATETIME_RE.finditer(name)]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    start = stamps[0] if stamps else None
+    end = stamps[1] if len(stamps) > 1 else None
+
+    if start is None:
+        time_range = _TIME_RANGE_RE.match(name)
+        folder_date = _FOLDER_DATE_RE.search(os.path.dirname(path))
+        if time_range and folder_date:
+            date = folder_date.groups()
+            start = _make_datetime(date + time_range.groups()[:3])
+            end = _make_datetime(date + time_range.groups()[3:])
+
+    return DvrSegment(path, camera, start, end)
+
+
+def playlist_sort_key(path: str):
+    """
+    Order videos by camera, then recording time, then natural filename.
+
+    Args:
+        path (str): Video path
+
+    Returns:
+        tuple: Sort key
+    """
+    segment = parse_dvr_filename(path)
+    camera = segment.camera if segment.camera is not None else -1
+    return camera, segment.start or datetime.min, natural_sort_key(os.path.basename(path))
+
+
+class PlaylistIndex:
+    """Per-camera, time-ordered index over the player's playlist.
+
+    ``next_segment`` finds the following recording of the same camera by
+    binary search, regardless of the order files were added in.
+    """
+
+    def __init__(self):
+        self._cameras = {}  # câmera -> lista ordenada de (início, chave natural, caminho)
+        self._segments = {}  # caminho -> DvrSegment
+        self._positions = {}  # caminho -> índice na playlist
+
+    def __len__(self):
+        return len(self._positions)
+
+    def rebuild(self, playlist):
+        """Index ``playlist`` from scratch (after removals or reordering)."""
+        self._cameras.clear()
+        self._segments.clear()
+        self._positions.clear()
+        self.extend(playlist, 0)
+
+    def extend(self, paths, first_position):
+        """Index ``paths`` appended to the playlist at ``first_position``."""
+        for offset, path in enumerate(paths):
+            self._positions[path] = first_position + offset
+            if path in self._segments:
+                continue
+            segment = parse_dvr_filename(path)
+            self._segments[path] = segment
+            if segment.camera is not None and segment.start is not None:
+                entry = (segment.start, natural_sort_key(os.path.basename(path)), path)
+                insort(self._cameras.setdefault(segment.camera, []), entry)
+
+    def segment(self, path) -> Optional[DvrSegment]:
+        return self._segments.get(path)
+
+    def position(self, path) -> int:
+        """Return the playlist index of ``path`` (-1 if not indexed)."""
+        return self._positions.get(path, -1)
+
+    def next_segment(self, path) -> Optional[str]:
+        """Return the next recording of the same camera, or None."""
+        segment = self._segments.get(path)
+        if segment is None or segment.camera is None or segment.start is None:
+            return None
+        entries = self._cameras.get(segment.camera, [])
+        key = (segment.start, natural_sort_key(os.path.basename(path)), path)
+        position = bisect_right(entries, key)
+        return entries[position][2] if position < len(entries) else None
+
+    def previous_segment(self, path) -> Optional[str]:
+        """Return the previous recording of the same camera, or None."""
+        segment = self._segments.get(path)
+        if segment is None or segment.camera is None or segment.start is None:
+            return None
+        entries = self._cameras.get(segment.camera, [])
+        key = (segment.start, natural_sort_key(os.path.basename(path)), path)
+        position = bisect_right(entries, key) - 2
+        return entries[position][2] if position >= 0 else None
@@ -0,0 +1,113 @@
+"""
+Asynchronous folder ingestion for PPL Player.
+Walks folders on a worker thread and streams the video files it finds
+back to the GUI thread in batches.
+"""
+
+import threading
+import time
+from collections import deque
+
+from PySide6.QtCore import QObject, Signal
+
+from utils import iter_video_files
+from config import FOLDER_SCAN_BATCH_SIZE, FOLDER_SCAN_FLUSH_INTERVAL
+
+
+class FolderScanner(QObject):
+    """Recursive, cancellable folder scan that never blocks the UI."""
+
+    batch_found = Signal(list)  # lote de caminhos de vídeo
+    scan_finished = Signal(int, float, bool)  # total, segundos, cancelado
+
+    # Emitidos pela thread de leitura com a geração da busca; entregues na
+    # thread da GUI, onde lotes de uma busca cancelada e já substituída são descartados
+    _worker_batch = Signal(int, list)
+    _worker_finished = Signal(int, int, float, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cancel_event = threading.Event()
+        self._thread = None
+        self._generation = 0
+        self._stale = set()  # gerações canceladas que deram lugar a uma nova busca
+        # Pastas ainda não lidas pela busca em andamento; None quando não aceita mais
+        self._queue = None
+        self._queue_lock = threading.Lock()
+        self._worker_batch.connect(self._on_worker_batch)
+        self._worker_finished.connect(self._on_worker_finished)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, folders) -> bool:
+        """Scan ``folders``; while a scan is running they join it instead of replacing it.
+
+        Returns:
+            bool: True if the folders were added to the scan in progress
+        """
+        with self._queue_lock:
+            if self._queue is not None and not self._cancel_event.is_set():
+                self._queue.extend(folders)
+                return True
+            self._queue = deque(folders)
+        if self._cancel_event.is_set():
+            self._stale.add(self._generation)
+        self._generation += 1
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._queue, self._cancel_event, self._generation), daemon=True
+        )
+        self._thread.start()
+        return False
+
+    def cancel(self):
+        """Ask the running scan to stop; already emitted batches are kept."""
+        self._cancel_event.set()
+
+    def _on_worker_batch(self, generation, batch):
+        if generation not in self._stale:
+            self.batch_found.emit(batch)
+
+    def _on_worker_finished(self, generation, total, elapsed, cancelled):
+        # O aviso de fim (ou de cancelamento) chega mesmo de uma busca substituída
+        self._stale.discard(generation)
+        self.scan_finished.emit(total, elapsed, cancelled)
+
+    def _next_folder(self, queue, cancel_event):
+        """Next queued folder, or None after closing the queue to new folders."""
+        with self._queue_lock:
+            if queue and not cancel_event.is_set():
+                return queue.popleft()
+            if self._queue is queue:
+                self._queue = None
+            return None
+
+    def _run(self, queue, cancel_event, generation):
+        started = time.perf_counter()
+        total = 0
+        batch = []
+        last_flush = started
+
+        while True:
+            folder = self._next_folder(queue, cancel_event)
+            if folder is None:
+                break
+            for path in iter_video_files(folder, recursive=True, cancel_event=cancel_event):
+                batch.append(path)
+                now = time.perf_counter()
+                if len(batch) >= FOLDER_SCAN_BATCH_SIZE or now - last_flush >= FOLDER_SCAN_FLUSH_INTERVAL:
+                    if cancel_event.is_set():
+                        break
+                    total += len(batch)
+                    self._worker_batch.emit(generation, batch)
+                    batch = []
+                    last_flush = now
+
+        if batch and not cancel_event.is_set():
+            total += len(batch)
+            self._worker_batch.emit(generation, batch)
+
+        elapsed = time.perf_counter() - started
+        print(f"[SCAN] {total} vídeos encontrados em {elapsed:.2f}s")
+        self._worker_finished.emit(generation, total, elapsed, cancel_event.is_set())
@@ -0,0 +1,188 @@
+"""
+In-memory frame tap for PPL Player.
+Receives decoded frames from libVLC through video callbacks and exposes
+them to Qt as QImages that share memory with the decode buffers.
+"""
+
+import ctypes
+import threading
+from contextlib import contextmanager
+
+import vlc
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QImage
+
+from config import DEFAULT_SIZE
+
+# Número de buffers: um sendo escrito pelo VLC, um pronto e um em uso pela UI
+FRAME_BUFFER_COUNT = 3
+BYTES_PER_PIXEL = 4  # RV32 (BGRA em memória == QImage.Format_RGB32)
+
+# O python-vlc declara o chroma como c_char_p, que chega ao Python como
+# bytes imutáveis. Declaramos o callback com c_void_p para poder escrever
+# "RV32" diretamente no buffer do VLC.
+_VideoFormatCb = ctypes.CFUNCTYPE(
+    ctypes.c_uint,
+    ctypes.POINTER(ctypes.c_void_p),
+    ctypes.c_void_p,
+    ctypes.POINTER(ctypes.c_uint),
+    ctypes.POINTER(ctypes.c_uint),
+    ctypes.POINTER(ctypes.c_uint),
+    ctypes.POINTER(ctypes.c_uint),
+)
+_VideoCleanupCb = ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+
+
+class _FrameBuffer:
+    """A decode buffer and the QImage that views it without copying."""
+
+    __slots__ = ("data", "address", "image")
+
+    def __init__(self, width: int, height: int, stride: int):
+        self.data = bytearray(stride * height)
+        self.address = ctypes.addressof((ctypes.c_ubyte * len(self.data)).from_buffer(self.data))
+        self.image = QImage(memoryview(self.data), width, height, stride, QImage.Format_RGB32)
+
+
+class FrameTap(QObject):
+    """Triple-buffered sink for libVLC video callbacks.
+
+    VLC always writes into a buffer the UI is not reading; ``display``
+    publishes it and ``latest_frame`` hands the newest one to the GUI
+    thread. ``frame_ready`` is emitted at most once until the GUI consumes
+    a frame, so a fast decoder never floods the Qt event queue.
+
+    The player attaches it once, before the first media, and keeps it for
+    the whole session: the main view, its insets and the zoom preview all
+    read the same frames, so none of them ever has to reopen the media.
+    """
+
+    frame_ready = Signal()
+    format_changed = Signal(int, int)  # largura, altura reais do vídeo
+
+    def __init__(self, mediaplayer, parent=None):
+        super().__init__(parent)
+        self.mediaplayer = mediaplayer
+        self.width, self.height = DEFAULT_SIZE
+        self.frame_count = 0
+
+        self._lock = threading.Lock()
+        # Mantido pela GUI enquanto pinta; os buffers só são trocados sem ele
+        self._paint_lock = threading.Lock()
+        self.attached = False
+        self._buffers = []
+        self._write_index = 0
+        self._ready_index = 1
+        self._front_index = 2
+        self._fresh = False
+        self._notify_pending = False
+
+        # Mantém referências aos callbacks para o GC não liberá-los
+        self._setup_cb = _VideoFormatCb(self._on_setup)
+        self._cleanup_cb = _VideoCleanupCb(self._on_cleanup)
+        self._lock_cb = vlc.CallbackDecorators.VideoLockCb(self._on_lock)
+        self._unlock_cb = vlc.CallbackDecorators.VideoUnlockCb(self._on_unlock)
+        self._display_cb = vlc.CallbackDecorators.VideoDisplayCb(self._on_display)
+
+    def attach(self):
+        """Route the media player's video output into this tap.
+
+        Must be called before playback starts; VLC picks the output when
+        the video track is created.
+        """
+        vlc.dll.libvlc_video_set_format_callbacks(self.mediaplayer, self._setup_cb, self._cleanup_cb)
+        self.mediaplayer.video_set_callbacks(self._lock_cb, self._unlock_cb, self._display_cb, None)
+        self.attached = True
+
+    def detach(self):
+        """Remove the callbacks from the media player (used when closing)."""
+        try:
+            vlc.dll.libvlc_video_set_format_callbacks(self.mediaplayer, None, None)
+            self.mediaplayer.video_set_callbacks(None, None, None, None)
+        except Exception as e:
+            print(f"[FRAME_TAP] Erro ao remover callbacks: {e}")
+        self.attached = False
+
+    def video_size(self):
+        """Real resolution of the current video, also while the tap is detached."""
+        with self._lock:
+            if self._buffers:
+                return self.width, self.height
+        try:
+            width, height = self.mediaplayer.video_get_size(0)
+        except vlc.VLCException:
+            return 0, 0  # ainda sem faixa de vídeo
+        return width, height
+
+    def latest_frame(self):
+        """Return the newest decoded frame as a QImage, or None.
+
+        The image shares memory with the decode buffer and stays valid
+        until the next call; use ``QImage.copy()`` to keep it longer.
+        """
+        with self._lock:
+            if not self._buffers:
+                return None
+            if self._fresh:
+                self._front_index, self._ready_index = self._ready_index, self._front_index
+                self._fresh = False
+            self._notify_pending = False
+            return self._buffers[self._front_index].image
+
+    @contextmanager
+    def locked_frame(self):
+        """Yield the newest frame (or None) for painting.
+
+        The decode buffers are not replaced or freed while the block runs,
+        so the QImage stays valid even if VLC reconfigures the format.
+        """
+        with self._paint_lock:
+            yield self.latest_frame() if self.has_frame() else None
+
+    def has_frame(self) -> bool:
+        """Return True once at least one frame has been decoded."""
+        return self.frame_count > 0
+
+    # Callbacks do VLC (executados na thread de decodificação)
+
+    def _on_setup(self, opaque, chroma, width, height, pitches, lines):
+        w, h = width[0], height[0]
+        stride = w * BYTES_PER_PIXEL
+
+        ctypes.memmove(chroma, b"RV32", 4)
+        pitches[0] = stride
+        lines[0] = h
+
+        buffers = [_FrameBuffer(w, h, stride) for _ in range(FRAME_BUFFER_COUNT)]
+        with self._paint_lock, self._lock:
+            self._buffers = buffers
+            self._write_index, self._ready_index, self._front_index = 0, 1, 2
+            self._fresh = False
+            self.width, self.height = w, h
+            self.frame_count = 0
+
+        self.format_changed.emit(w, h)
+        return 1
+
+    def _on_cleanup(self, opaque):
+        with self._paint_lock, self._lock:
+            self._buffers = []
+            self._fresh = False
+
+    def _on_lock(self, opaque, planes):
+        with self._lock:
+            planes[0] = self._buffers[self._write_index].address
+        return None
+
+    def _on_unlock(self, opaque, picture, planes):
+        pass
+
+    def _on_display(self, opaque, picture):
+        with self._lock:
+            self._write_index, self._ready_index = self._ready_index, self._write_index
+            self._fresh = True
+            self.frame_count += 1
+            notify = not self._notify_pending
+            self._notify_pending = True
+        if notify:
+            self.frame_ready.emit()
@@ -0,0 +1,343 @@
+"""
+Binary IPC protocol for PPL Player.
+Length-prefixed, versioned frames exchanged between the player and the
+counting apps (contador) on MEDIA_PORT.
+
+Frame layout (network byte order):
+
+    length      uint32  bytes that follow this field (header + payload)
+    version     uint8   PROTOCOL_VERSION
+    kind        uint8   KIND_REQUEST / KIND_REPLY / KIND_EVENT
+    opcode      uint8   OP_*
+    status      uint8   STATUS_* (replies only, 0 in requests)
+    request_id  uint32  chosen by the client, echoed in the reply
+    payload     bytes   opcode-specific, see encode_request()
+
+Request IDs let a client pipeline several commands on one connection
+without waiting for each reply.
+"""
+
+import struct
+from typing import NamedTuple
+
+from config import IPC_MAX_FRAME_SIZE
+
+PROTOCOL_VERSION = 1
+
+LENGTH = struct.Struct("!I")
+HEADER = struct.Struct("!BBBBI")
+
+# Tipos de mensagem
+KIND_REQUEST = 1
+KIND_REPLY = 2
+KIND_EVENT = 3
+
+# Comandos
+OP_PING = 0
+OP_PLAY = 1
+OP_PAUSE = 2
+OP_SEEK = 3
+OP_SET_SPEED = 4
+OP_STEP_FRAME = 5
+OP_OPEN_FILE = 6
+OP_SUBSCRIBE = 7
+OP_TELEMETRY = 8  # evento enviado pelo player
+OP_COUNT_EVENTS = 9
+OP_STATE = 10  # evento: mudança de reprodução (play/pause, velocidade, seek, vídeo)
+OP_ALERT = 11
+OP_HANDOFF = 12  # argumentos de uma nova execução repassados ao player aberto
+OP_BRIDGE_STATS = 13  # latência medida entre a leitura no socket e a ação na GUI
+
+OPCODE_NAMES = {
+    OP_PING: "ping",
+    OP_PLAY: "play",
+    OP_PAUSE: "pause",
+    OP_SEEK: "seek",
+    OP_SET_SPEED: "set_speed",
+    OP_STEP_FRAME: "step_frame",
+    OP_OPEN_FILE: "open_file",
+    OP_SUBSCRIBE: "subscribe",
+    OP_TELEMETRY: "telemetry",
+    OP_COUNT_EVENTS: "count_events",
+    OP_STATE: "state",
+    OP_ALERT: "alert",
+    OP_HANDOFF: "handoff",
+    OP_BRIDGE_STATS: "stats",
+}
+
+# Tópicos de assinatura (máscara de bits)
+TOPIC_POSITION = 1  # OP_TELEMETRY na taxa pedida, sempre a amostra mais recente
+TOPIC_STATE = 2  # OP_STATE a cada mudança
+TOPIC_COUNTS = 4  # OP_COUNT_EVENTS recebidos de qualquer contador
+TOPIC_ALERTS = 8  # OP_ALERT
+TOPIC_ALL = TOPIC_POSITION | TOPIC_STATE | TOPIC_COUNTS | TOPIC_ALERTS
+
+# Níveis de alerta
+ALERT_INFO = 0
+ALERT_WARNING = 1
+ALERT_ERROR = 2
+
+# Status das respostas
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_UNKNOWN_OPCODE = 2
+STATUS_BAD_VERSION = 3
+STATUS_BAD_PAYLOAD = 4
+
+_SEEK = struct.Struct("!q")  # posição em ms
+_SPEED = struct.Struct("!f")  # velocidade
+_STEP = struct.Struct("!h")  # frames (negativo = para trás)
+_OPEN = struct.Struct("!q")  # posição inicial em ms, seguida do caminho em UTF-8
+_SUBSCRIBE = struct.Struct("!HB")  # envios de posição por segundo (0 = cancelar), tópicos
+_SUBSCRIBE_V1 = struct.Struct("!H")  # só a taxa: tópico de posição
+_ALERT = struct.Struct("!B")  # nível, seguido da mensagem em UTF-8
+_HANDOFF = struct.Struct("!H")  # tamanho do caminho do croqui; seguem croqui e vídeo em UTF-8
+_COUNT_VIDEO = struct.Struct("!i")  # índice do vídeo (-1 = atual), seguido dos eventos
+_COUNT_EVENT = struct.Struct("!dBB")  # tempo do vídeo (ms), categoria, movimento
+_STATE = struct.Struct("!qqfB")  # tempo, duração, velocidade, reproduzindo
+_TELEMETRY = struct.Struct("!IQiqqfB")  # seq, captura (µs), vídeo, tempo, duração, velocidade, reproduzindo
+TELEMETRY_SIZE = _TELEMETRY.size
+_BRIDGE_STATS = struct.Struct("!QQffff")  # comandos, acima do limite, p50/p99/máx até a ação, máx da ação (ms)
+
+
+class ProtocolError(Exception):
+    """Raised for malformed or oversized frames."""
+
+
+class Message(NamedTuple):
+    """A decoded frame."""
+
+    version: int
+    kind: int
+    opcode: int
+    status: int
+    request_id: int
+    payload: bytes
+
+
+class PlayerState(NamedTuple):
+    """Playback state carried by successful replies."""
+
+    time_ms: int
+    length_ms: int
+    rate: float
+    playing: bool
+
+    def pack(self) -> bytes:
+        return _STATE.pack(self.time_ms, self.length_ms, self.rate, self.playing)
+
+    @classmethod
+    def unpack(cls, payload: bytes) -> "PlayerState":
+        time_ms, length_ms, rate, playing = _STATE.unpack_from(payload)
+        return cls(time_ms, length_ms, rate, bool(playing))
+
+
+class BridgeStats(NamedTuple):
+    """Command latency measured by the player, from socket read to GUI action."""
+
+    commands: int
+    over_budget: int
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+    max_action_ms: float
+
+    def pack(self) -> bytes:
+        return _BRIDGE_STATS.pack(*self)
+
+    @classmethod
+    def unpack(cls, payload: bytes) -> "BridgeStats":
+        return cls(*_BRIDGE_STATS.unpack_from(payload))
+
+
+class Telemetry(NamedTuple):
+    """Playback position sample pushed to subscribers.
+
+    ``captured_us`` is the player's ``time.perf_counter`` clock when the
+    sample was taken; while playing, the video time at a later instant is
+    ``time_ms + elapsed * rate``.
+    """
+
+    seq: int
+    captured_us: int
+    video_index: int
+    time_ms: int
+    length_ms: int
+    rate: float
+    playing: bool
+
+    def pack(self) -> bytes:
+        return _TELEMETRY.pack(
+            self.seq, self.captured_us, self.video_index, self.time_ms, self.length_ms, self.rate, self.playing
+        )
+
+    @classmethod
+    def unpack(cls, payload: bytes) -> "Telemetry":
+        seq, captured_us, video_index, time_ms, length_ms, rate, playing = _TELEMETRY.unpack_from(payload)
+        return cls(seq, captured_us, video_index, time_ms, length_ms, rate, bool(playing))
+
+    def video_time_at(self, now_us: int) -> float:
+        """Estimate the video time (ms) at ``now_us`` on the same clock."""
+        if not self.playing:
+            return float(self.time_ms)
+        return self.time_ms + (now_us - self.captured_us) / 1000 * self.rate
+
+
+def encode_frame(kind: int, opcode: int, request_id: int, payload: bytes = b"", status: int = 0) -> bytes:
+    """
+    Build one frame.
+
+    Args:
+        kind (int): KIND_REQUEST, KIND_REPLY or KIND_EVENT
+        opcode (int): OP_* value
+        request_id (int): Request identifier (0..2**32-1)
+        payload (bytes): Encoded arguments or result
+        status (int): STATUS_* value (replies)
+
+    Returns:
+        bytes: Frame ready to be written to the socket
+    """
+    header = HEADER.pack(PROTOCOL_VERSION, kind, opcode, status, request_id)
+    return LENGTH.pack(len(header) + len(payload)) + header + payload
+
+
+def encode_request(opcode: int, request_id: int, *args) -> bytes:
+    """
+    Build a request frame with the arguments of ``opcode``.
+
+    ``seek(time_ms)``, ``set_speed(rate)``, ``step_frame(frames)``,
+    ``open_file(path, start_ms=0)``, ``subscribe(rate_hz, topics=TOPIC_POSITION)``,
+    ``count_events(events, video_index=-1)`` with ``(time_ms, category,
+    movement)`` tuples, ``alert(message, level=ALERT_INFO)`` and
+    ``handoff(video, croqui)`` (either may be None); the other commands
+    take no arguments.
+    """
+    if opcode == OP_HANDOFF:
+        croqui = (args[1] or "").encode("utf-8")
+        payload = _HANDOFF.pack(len(croqui)) + croqui + (args[0] or "").encode("utf-8")
+    elif opcode == OP_COUNT_EVENTS:
+        payload = encode_count_events(args[0], int(args[1]) if len(args) > 1 else -1)
+    elif opcode == OP_ALERT:
+        payload = encode_alert(args[0], int(args[1]) if len(args) > 1 else ALERT_INFO)
+    elif opcode == OP_SUBSCRIBE:
+        payload = _SUBSCRIBE.pack(int(args[0]), int(args[1]) if len(args) > 1 else TOPIC_POSITION)
+    elif opcode == OP_SEEK:
+        payload = _SEEK.pack(int(args[0]))
+    elif opcode == OP_SET_SPEED:
+        payload = _SPEED.pack(float(args[0]))
+    elif opcode == OP_STEP_FRAME:
+        payload = _STEP.pack(int(args[0]) if args else 1)
+    elif opcode == OP_OPEN_FILE:
+        start_ms = int(args[1]) if len(args) > 1 else 0
+        payload = _OPEN.pack(start_ms) + args[0].encode("utf-8")
+    else:
+        payload = b""
+    return encode_frame(KIND_REQUEST, opcode, request_id, payload)
+
+
+def decode_request_args(opcode: int, payload: bytes) -> tuple:
+    """
+    Decode the arguments of a request (inverse of encode_request).
+
+    Raises:
+        ProtocolError: If the payload does not match the opcode
+    """
+    try:
+        if opcode == OP_COUNT_EVENTS:
+            (video_index,) = _COUNT_VIDEO.unpack_from(payload)
+            return video_index, list(_COUNT_EVENT.iter_unpack(payload[_COUNT_VIDEO.size:]))
+        if opcode == OP_HANDOFF:
+            (croqui_size,) = _HANDOFF.unpack_from(payload)
+            croqui = payload[_HANDOFF.size:_HANDOFF.size + croqui_size].decode("utf-8")
+            video = payload[_HANDOFF.size + croqui_size:].decode("utf-8")
+            return video or None, croqui or None
+        if opcode == OP_ALERT:
+            (level,) = _ALERT.unpack_from(payload)
+            return payload[_ALERT.size:].decode("utf-8"), level
+        if opcode == OP_SUBSCRIBE:
+            if len(payload) == _SUBSCRIBE_V1.size:
+                return _SUBSCRIBE_V1.unpack(payload) + (TOPIC_POSITION,)
+            return _SUBSCRIBE.unpack(payload)
+        if opcode == OP_SEEK:
+            return _SEEK.unpack(payload)
+        if opcode == OP_SET_SPEED:
+            return _SPEED.unpack(payload)
+        if opcode == OP_STEP_FRAME:
+            return _STEP.unpack(payload)
+        if opcode == OP_OPEN_FILE:
+            (start_ms,) = _OPEN.unpack_from(payload)
+            return payload[_OPEN.size:].decode("utf-8"), start_ms
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ProtocolError(f"payload inválido para {OPCODE_NAMES.get(opcode, opcode)}: {e}") from e
+    return ()
+
+
+def encode_count_events(events, video_index=-1) -> bytes:
+    """Payload of OP_COUNT_EVENTS: video index followed by the events."""
+    return _COUNT_VIDEO.pack(video_index) + b"".join(_COUNT_EVENT.pack(*event) for event in events)
+
+
+def encode_alert(message: str, level=ALERT_INFO) -> bytes:
+    """Payload of OP_ALERT: level followed by the UTF-8 message."""
+    return _ALERT.pack(level) + message.encode("utf-8")
+
+
+def encode_reply(request: Message, status: int, payload: bytes = b"") -> bytes:
+    """Build the reply frame for ``request``."""
+    return encode_frame(KIND_REPLY, request.opcode, request.request_id, payload, status)
+
+
+def encode_event(opcode: int, payload: bytes, request_id: int = 0) -> bytes:
+    """Build an unsolicited event frame (e.g. OP_TELEMETRY)."""
+    return encode_frame(KIND_EVENT, opcode, request_id, payload)
+
+
+def encode_error(request: Message, status: int, message: str) -> bytes:
+    """Build an error reply carrying a UTF-8 message."""
+    return encode_reply(request, status, message.encode("utf-8"))
+
+
+def decode_body(body: bytes) -> Message:
+    """Decode a frame body (everything after the length field)."""
+    if len(body) < HEADER.size:
+        raise ProtocolError(f"frame curto demais ({len(body)} bytes)")
+    version, kind, opcode, status, request_id = HEADER.unpack_from(body)
+    return Message(version, kind, opcode, status, request_id, body[HEADER.size:])
+
+
+async def read_message(reader) -> Message:
+    """
+    Read one frame from an asyncio StreamReader.
+
+    Raises:
+        asyncio.IncompleteReadError: When the peer closes the connection
+        ProtocolError: For oversized or malformed frames
+    """
+    (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+    if length > IPC_MAX_FRAME_SIZE:
+        raise ProtocolError(f"frame de {length} bytes excede o limite")
+    return decode_body(await reader.readexactly(length))
+
+
+class FrameDecoder:
+    """Incremental decoder for blocking sockets: feed bytes, get messages."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes):
+        """Append received bytes and return the complete messages."""
+        self._buffer += data
+        messages = []
+        offset = 0
+        while len(self._buffer) - offset >= LENGTH.size:
+            (length,) = LENGTH.unpack_from(self._buffer, offset)
+            if length > IPC_MAX_FRAME_SIZE:
+                raise ProtocolError(f"frame de {length} bytes excede o limite")
+            end = offset + LENGTH.size + length
+            if end > len(self._buffer):
+                break
+            messages.append(decode_body(bytes(self._buffer[offset + LENGTH.size:end])))
+            offset = end
+        del self._buffer[:offset]
+        return messages
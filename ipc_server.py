@@ -0,0 +1,346 @@
+"""
+Remote-control server for PPL Player.
+Accepts ipc_protocol frames on MEDIA_PORT (asyncio thread) and runs the
+commands on the Qt GUI thread, replying with the resulting player state.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+import ipc_protocol as proto
+from ipc_transport import IS_WINDOWS, start_local_server, local_address
+from config import HOST, MEDIA_PORT, IPC_DRAIN_BUDGET_MS, IPC_LATENCY_BUDGET_MS, IPC_LATENCY_WINDOW
+
+
+class LatencyTracker:
+    """Socket-read → GUI-action latency of the bridge's commands.
+
+    Keeps the all-time maximum (the measured upper bound) and a window of
+    recent samples for percentiles. Written on the GUI thread only; the
+    asyncio thread reads a snapshot, where a slightly stale value is fine.
+    """
+
+    def __init__(self, window=IPC_LATENCY_WINDOW, budget_ms=IPC_LATENCY_BUDGET_MS):
+        self.samples = deque(maxlen=window)
+        self.budget = budget_ms / 1000
+        self.commands = 0
+        self.over_budget = 0
+        self.max_latency = 0.0
+        self.max_action = 0.0
+
+    def record(self, latency, action):
+        self.commands += 1
+        self.samples.append(latency)
+        self.max_action = max(self.max_action, action)
+        if latency > self.budget:
+            self.over_budget += 1
+        if latency > self.max_latency:
+            self.max_latency = latency
+            if latency > self.budget:
+                print(f"[SERVER] Comando levou {latency * 1000:.1f} ms da leitura até a GUI (limite {self.budget * 1000:.0f} ms)")
+
+    def snapshot(self) -> proto.BridgeStats:
+        samples = sorted(self.samples)
+
+        def percentile(p):
+            return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000 if samples else 0.0
+
+        return proto.BridgeStats(
+            self.commands,
+            self.over_budget,
+            percentile(0.50),
+            percentile(0.99),
+            self.max_latency * 1000,
+            self.max_action * 1000,
+        )
+
+
+class PlayerCommandBridge(QObject):
+    """Runs protocol commands on the GUI thread.
+
+    ``submit`` is called from the asyncio thread and appends to a deque
+    (append/popleft are atomic, so no lock is taken); an argument-less
+    queued signal wakes the thread that owns the player, which drains the
+    pending commands in order. A drain pass stops after
+    ``IPC_DRAIN_BUDGET_MS`` and re-posts the wake-up, so a burst of
+    commands cannot keep Qt from painting or handling input. Results go
+    back to the asyncio loop through ``call_soon_threadsafe``.
+
+    The time from the socket read to the start of each action is recorded
+    in ``latency``. After ``close()`` (called from closeEvent) new and
+    pending commands fail with an error reply instead of touching the
+    player.
+    """
+
+    wake = Signal()
+
+    def __init__(self, player):
+        super().__init__()
+        self.player = player
+        self.handlers = {
+            proto.OP_PING: lambda: None,
+            proto.OP_PLAY: player.play,
+            proto.OP_PAUSE: player.pause,
+            proto.OP_SEEK: self._seek,
+            proto.OP_SET_SPEED: self._set_speed,
+            proto.OP_STEP_FRAME: self._step_frame,
+            proto.OP_OPEN_FILE: self._open_file,
+            proto.OP_COUNT_EVENTS: self._count_events,
+            proto.OP_ALERT: self._alert,
+            proto.OP_HANDOFF: self._handoff,
+        }
+        self.pending = deque()
+        self.latency = LatencyTracker()
+        self.closed = False
+        self._wake_pending = False
+        self._drain_budget = IPC_DRAIN_BUDGET_MS / 1000
+        self.wake.connect(self._drain)
+
+    def submit(self, loop, opcode, args, received=None):
+        """
+        Queue a command for the GUI thread and return a future with the result.
+
+        ``received`` is the ``time.perf_counter()`` of the socket read.
+        """
+        future = loop.create_future()
+        self.pending.append((opcode, args, loop, future, received or time.perf_counter()))
+        if self.closed:
+            # close() pode ter esvaziado a fila antes deste append
+            self._fail_pending()
+        # Um único sinal por rajada; objetos Python não atravessam a fila do Qt
+        elif not self._wake_pending:
+            self._wake_pending = True
+            self.wake.emit()
+        return future
+
+    def _drain(self):
+        self._wake_pending = False
+        deadline = time.perf_counter() + self._drain_budget
+        while self.pending and not self.closed:
+            self._execute(*self.pending.popleft())
+            if self.pending and time.perf_counter() > deadline:
+                # Devolve a GUI ao Qt; o restante roda na próxima passada
+                self._wake_pending = True
+                self.wake.emit()
+                return
+
+    def _execute(self, opcode, args, loop, future, received):
+        started = time.perf_counter()
+        try:
+            if self.player.is_closing:
+                raise RuntimeError("player encerrando")
+            self.handlers[opcode](*args)
+            result = (proto.STATUS_OK, self.state().pack())
+        except Exception as e:
+            result = (proto.STATUS_ERROR, str(e).encode("utf-8"))
+        self.latency.record(started - received, time.perf_counter() - started)
+        loop.call_soon_threadsafe(_set_future_result, future, result)
+
+    def close(self):
+        """Stop executing commands; pending ones get an error reply (GUI thread)."""
+        self.closed = True
+        self._fail_pending()
+        stats = self.latency.snapshot()
+        if stats.commands:
+            print(
+                f"[SERVER] {stats.commands} comandos: leitura→ação p50 {stats.p50_ms:.2f} ms, "
+                f"p99 {stats.p99_ms:.2f} ms, máx {stats.max_ms:.2f} ms"
+            )
+
+    def _fail_pending(self):
+        result = (proto.STATUS_ERROR, "player encerrando".encode("utf-8"))
+        while True:
+            try:
+                _, _, loop, future, _ = self.pending.popleft()
+            except IndexError:
+                return
+            try:
+                loop.call_soon_threadsafe(_set_future_result, future, result)
+            except RuntimeError:
+                pass  # loop já encerrado
+
+    def state(self):
+        """Snapshot of the playback state (GUI thread)."""
+        mediaplayer = self.player.mediaplayer
+        return proto.PlayerState(
+            mediaplayer.get_time(),
+            mediaplayer.get_length(),
+            self.player.speed_factor,
+            bool(mediaplayer.is_playing()),
+        )
+
+    # Comandos
+
+    def _seek(self, time_ms):
+        self.player.set_position(max(0, time_ms))
+
+    def _set_speed(self, rate):
+        if rate <= 0:
+            raise ValueError(f"velocidade inválida: {rate}")
+        self.player.set_speed(rate)
+
+    def _step_frame(self, frames):
+        for _ in range(abs(frames)):
+            if frames > 0:
+                self.player.step_frame()
+            else:
+                self.player.on_previous_frame()
+
+    def _open_file(self, path, start_ms):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"arquivo não encontrado: {path}")
+        if path not in self.player.playlist:
+            self.player.add_to_playlist([path])
+        self.player.current_video_index = self.player.playlist.index(path)
+        self.player.open_file(path, start_ms)
+
+    def _count_events(self, video_index, events):
+        if video_index < 0:
+            video_index = self.player.current_video_index
+        if not 0 <= video_index < len(self.player.playlist):
+            raise IndexError(f"vídeo {video_index} fora da playlist")
+        self.player.add_counts(self.player.playlist[video_index], events)
+        if self.player.hub is not None:
+            payload = proto.encode_count_events(events, video_index)
+            self.player.hub.publish(proto.TOPIC_COUNTS, proto.encode_event(proto.OP_COUNT_EVENTS, payload))
+
+    def _alert(self, message, level):
+        self.player.alert(message, level)
+
+    def _handoff(self, video, croqui):
+        if video is not None and not os.path.exists(video):
+            raise FileNotFoundError(f"arquivo não encontrado: {video}")
+        if croqui is not None and not os.path.exists(croqui):
+            raise FileNotFoundError(f"croqui não encontrado: {croqui}")
+        # O modal do croqui tem seu próprio loop de eventos: roda fora do _drain
+        # para que a nova execução receba a resposta e encerre imediatamente
+        QTimer.singleShot(0, lambda: self.player.handle_handoff(video, croqui))
+
+
+def _set_future_result(future, result):
+    if not future.done():
+        future.set_result(result)
+
+
+class IpcServer:
+    """asyncio server speaking ipc_protocol on MEDIA_PORT and on the local
+    transport (Unix socket or named pipe), which skips the TCP stack for
+    clients on the same machine.
+
+    Requests are read continuously and handed to the bridge as soon as
+    they arrive, so a client may pipeline commands; each reply is written
+    when its command completes and carries the request ID.
+    """
+
+    def __init__(self, bridge, hub=None, host=HOST, port=MEDIA_PORT):
+        self.bridge = bridge
+        self.hub = hub
+        self.host = host
+        self.port = port
+        self.server = None
+        self.local_server = None
+        self.connections = set()
+
+    async def serve(self):
+        try:
+            self.local_server = await start_local_server(self.handle_connection, local_address(self.port))
+            print(f"[SERVER] Escutando em {local_address(self.port)}")
+        except (OSError, NotImplementedError) as e:
+            # Sem transporte local os clientes continuam usando TCP
+            print(f"[SERVER] Transporte local indisponível: {e}")
+
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"[SERVER] Escutando em {self.host}:{self.port}")
+        try:
+            await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    async def close(self):
+        """Stop accepting connections and close the open ones (asyncio thread)."""
+        for server in (self.server, self.local_server):
+            if server is not None:
+                server.close()
+        if self.local_server is not None and not IS_WINDOWS:
+            # Sem o arquivo, a próxima execução não tenta um socket morto
+            try:
+                os.unlink(local_address(self.port))
+            except OSError:
+                pass
+        for writer in list(self.connections):
+            writer.close()
+        self.server = self.local_server = None
+        print("[SERVER] Servidor encerrado")
+
+    def shutdown(self, loop, timeout=1.0):
+        """Run ``close()`` on ``loop`` and wait for it (called from the GUI thread)."""
+        if not loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.close(), loop).result(timeout)
+        except Exception as e:
+            print(f"[SERVER] Erro ao encerrar servidor: {e}")
+
+    async def handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        addr = writer.get_extra_info("peername")
+        print(f"[SERVER] Conectado por {addr}")
+        self.connections.add(writer)
+        try:
+            while True:
+                message = await proto.read_message(reader)
+                received = time.perf_counter()
+                args, reply = self._prepare(message)
+                if reply is not None:
+                    writer.write(reply)
+                elif message.opcode == proto.OP_SUBSCRIBE:
+                    writer.write(self._subscribe(message, writer, *args))
+                elif message.opcode == proto.OP_BRIDGE_STATS:
+                    # Respondido aqui: consultar as medições não deve entrar na fila medida
+                    writer.write(proto.encode_reply(message, proto.STATUS_OK, self.bridge.latency.snapshot().pack()))
+                else:
+                    future = self.bridge.submit(loop, message.opcode, args, received)
+                    future.add_done_callback(lambda f, m=message: self._send_reply(writer, m, f))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        except proto.ProtocolError as e:
+            print(f"[SERVER] Erro de protocolo de {addr}: {e}")
+        except ConnectionError as e:
+            print(f"[SERVER] Conexão perdida com {addr}: {e}")
+        finally:
+            self.connections.discard(writer)
+            if self.hub is not None:
+                self.hub.unsubscribe(writer)
+            writer.close()
+            print(f"[SERVER] Desconectado: {addr}")
+
+    def _subscribe(self, message, writer, rate_hz, topics):
+        """Subscribe this connection to ``topics`` of the hub (asyncio thread)."""
+        if self.hub is None:
+            return proto.encode_error(message, proto.STATUS_ERROR, "assinaturas indisponíveis")
+        self.hub.subscribe(writer, rate_hz, topics)
+        return proto.encode_reply(message, proto.STATUS_OK)
+
+    def _prepare(self, message):
+        """Decode the request arguments, or build the error reply if it cannot be dispatched."""
+        if message.version != proto.PROTOCOL_VERSION:
+            return None, proto.encode_error(message, proto.STATUS_BAD_VERSION, f"versão {message.version} não suportada")
+        known = message.opcode in self.bridge.handlers or message.opcode in (proto.OP_SUBSCRIBE, proto.OP_BRIDGE_STATS)
+        if message.kind != proto.KIND_REQUEST or not known:
+            return None, proto.encode_error(message, proto.STATUS_UNKNOWN_OPCODE, f"comando desconhecido: {message.opcode}")
+        try:
+            return proto.decode_request_args(message.opcode, message.payload), None
+        except proto.ProtocolError as e:
+            return None, proto.encode_error(message, proto.STATUS_BAD_PAYLOAD, str(e))
+
+    @staticmethod
+    def _send_reply(writer, message, future):
+        if writer.is_closing() or future.cancelled():
+            return
+        status, payload = future.result()
+        writer.write(proto.encode_reply(message, status, payload))
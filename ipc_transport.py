@@ -0,0 +1,192 @@
+"""
+Local IPC transports for PPL Player.
+Serves the ipc_protocol over a Unix-domain socket (POSIX) or a named pipe
+(Windows) next to the TCP port, and lets clients pick the fastest
+transport available with automatic fallback to TCP.
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import time
+
+from config import HOST, MEDIA_PORT, IPC_LOCAL_NAME
+
+IS_WINDOWS = sys.platform == "win32"
+ERROR_PIPE_BUSY = 231
+PIPE_POLL_INTERVAL = 0.001  # segundos entre consultas ao pipe aguardando resposta
+
+# asyncio é importado dentro das funções assíncronas: o aviso de instância
+# única usa só open_blocking_connection e precisa iniciar em milissegundos
+
+
+def local_address(port=MEDIA_PORT) -> str:
+    """Named pipe (Windows) or Unix socket path for the player on ``port``."""
+    if IS_WINDOWS:
+        return rf"\\.\pipe\{IPC_LOCAL_NAME}-{port}"
+    return os.path.join(tempfile.gettempdir(), f"{IPC_LOCAL_NAME}-{port}.sock")
+
+
+async def start_local_server(client_connected_cb, address=None):
+    """
+    Start serving ``client_connected_cb(reader, writer)`` on the local transport.
+
+    Returns:
+        Server object with ``close()``; raises OSError/NotImplementedError
+        when the platform or event loop has no local transport.
+    """
+    import asyncio
+    address = address or local_address()
+    loop = asyncio.get_running_loop()
+
+    if IS_WINDOWS:
+        if not hasattr(loop, "start_serving_pipe"):
+            raise NotImplementedError("named pipes exigem o ProactorEventLoop")
+
+        def factory():
+            reader = asyncio.StreamReader()
+            return asyncio.StreamReaderProtocol(reader, client_connected_cb)
+
+        servers = await loop.start_serving_pipe(factory, address)
+        return _PipeServer(servers)
+
+    # Socket de uma execução anterior que terminou sem remover o arquivo
+    if os.path.exists(address):
+        os.unlink(address)
+    return await asyncio.start_unix_server(client_connected_cb, address)
+
+
+class _PipeServer:
+    """Minimal close() wrapper around the pipe servers returned by the proactor."""
+
+    def __init__(self, servers):
+        self.servers = servers
+
+    def close(self):
+        for server in self.servers:
+            server.close()
+
+
+async def open_local_connection(address=None):
+    """Connect to the player over the local transport."""
+    import asyncio
+    address = address or local_address()
+    if IS_WINDOWS:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        protocol = asyncio.StreamReaderProtocol(reader)
+        transport, _ = await loop.create_pipe_connection(lambda: protocol, address)
+        return reader, asyncio.StreamWriter(transport, protocol, reader, loop)
+    return await asyncio.open_unix_connection(address)
+
+
+async def open_player_connection(host=HOST, port=MEDIA_PORT, prefer_local=True):
+    """
+    Connect to the player, trying the local transport before TCP.
+
+    Returns:
+        tuple: (reader, writer, transport name: "local" or "tcp")
+    """
+    import asyncio
+    if prefer_local:
+        try:
+            reader, writer = await open_local_connection(local_address(port))
+            return reader, writer, "local"
+        except (OSError, NotImplementedError, AttributeError):
+            pass
+    reader, writer = await asyncio.open_connection(host, port)
+    return reader, writer, "tcp"
+
+
+class _PipeConnection:
+    """Blocking named pipe client with the socket methods used by callers.
+
+    While every pipe instance is busy, opening waits with WaitNamedPipe
+    until ``timeout`` (seconds) runs out, then raises TimeoutError.
+    ``recv`` honours ``settimeout`` like a socket: it polls PeekNamedPipe
+    and only reads once data is available.
+    """
+
+    def __init__(self, address, timeout=0.5):
+        import ctypes
+        self.timeout = None
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.pipe = open(address, "r+b", buffering=0)
+                return
+            except OSError as e:
+                if getattr(e, "winerror", None) != ERROR_PIPE_BUSY:
+                    raise
+            # Todas as instâncias ocupadas: espera uma liberar, sem passar do prazo
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0 or not ctypes.windll.kernel32.WaitNamedPipeW(address, remaining_ms):
+                raise TimeoutError(f"Named pipe ocupado: {address}")
+
+    def sendall(self, data):
+        self.pipe.write(data)
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def recv(self, size):
+        if self.timeout is not None:
+            available = self._wait_readable(time.monotonic() + self.timeout)
+            if not available:
+                return b""
+            size = min(size, available)
+        return self.pipe.read(size)
+
+    def _wait_readable(self, deadline):
+        """Bytes waiting in the pipe (0 if it was closed); TimeoutError past ``deadline``."""
+        import ctypes
+        import msvcrt
+        from ctypes import wintypes
+        handle = msvcrt.get_osfhandle(self.pipe.fileno())
+        available = wintypes.DWORD()
+        while True:
+            if not ctypes.windll.kernel32.PeekNamedPipe(handle, None, 0, None, ctypes.byref(available), None):
+                return 0  # o outro lado fechou o pipe
+            if available.value:
+                return available.value
+            if time.monotonic() >= deadline:
+                raise TimeoutError("sem resposta no named pipe")
+            time.sleep(PIPE_POLL_INTERVAL)
+
+    def close(self):
+        self.pipe.close()
+
+
+def open_blocking_connection(host=HOST, port=MEDIA_PORT, timeout=0.5):
+    """
+    Blocking connection to the player (local transport first, then TCP).
+
+    Used where an event loop would cost more than the exchange itself,
+    e.g. the single-instance check at start-up. ``timeout`` only bounds
+    connecting; callers set their own deadline for the reply with
+    ``settimeout``.
+
+    Returns:
+        Object with sendall(), recv() and close()
+
+    Raises:
+        OSError: If no player is listening
+    """
+    address = local_address(port)
+    try:
+        if IS_WINDOWS:
+            return _PipeConnection(address, timeout)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    except OSError:
+        pass
+    sock = socket.create_connection((host, port), timeout=timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
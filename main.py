@@ -1,6 +1,13 @@
 import sys
 import os
 import argparse
+
+if __name__ == "__main__":
+    # Player já aberto: repassa os argumentos e encerra antes de carregar Qt/VLC
+    from single_instance import hand_off_from_argv
+    if hand_off_from_argv(sys.argv[1:]):
+        sys.exit(0)
+
 from PySide6.QtWidgets import QApplication , QMessageBox
 from PySide6.QtGui import QIcon
 from PySide6.QtCore import QObject, Signal, Qt
@@ -19,24 +26,14 @@ from config import (
 update_checker = None
 
 def get_version_api() -> str:
-    """Obtém versão da API (lazy import para não atrasar inicialização)"""
-    import requests
-    
-    URL = f"{API_URL}/mediaplayer/api/version"
-    try:
-        response = requests.get(URL, timeout=30)  # Timeout reduzido para 5s
-        if response.status_code == 200:
-            data = response.json()
-            version = data.get("version")
-            if version:
-                return version
-            else:
-                print("[APP] Versão não encontrada na resposta da API.")
-        else:
-            print(f"[APP] Erro ao obter informações da versão: {response.status_code}")
-    except Exception as e:
-        print(f"[APP] Erro ao conectar API: {e}")
-    return None
+    """Obtém versão da API, respeitando o cache/intervalo (lazy import para não atrasar inicialização)"""
+    from update_check import VersionChecker
+    from utils import get_app_data_folder
+
+    cache_folder = get_app_data_folder()
+    os.makedirs(cache_folder, exist_ok=True)
+    checker = VersionChecker(f"{API_URL}/mediaplayer", os.path.join(cache_folder, "version_check.json"))
+    return checker.remote_version()
 
 class UpdateChecker(QObject):
     """Classe para verificar atualizações de forma thread-safe"""
@@ -231,10 +228,13 @@ def close_update_progress(success, message):
 
 def updater_app():
     """Sistema de atualização integrado com API"""
-    import requests
+    import shutil
     import subprocess
     import time
     from utils import create_version_info, get_app_data_folder, get_version_info
+    from update_download import download_file, DownloadError
+    from update_delta import prepare_update_package
+    from update_check import is_newer
     
     
     try:
@@ -269,9 +269,8 @@ def updater_app():
         print(f"[APP] Versão local: {local_version}")
         print(f"[APP] Versão remota: {remote_version}")
         
-        # Compara versões
-
-        if float(remote_version) > float(local_version):
+        # Compara versões por componente ("3.10" > "3.9")
+        if is_newer(remote_version, local_version):
             print("[APP] 🎉 Nova atualização disponível!")
             
             # Pergunta ao usuário de forma thread-safe
@@ -296,58 +295,76 @@ def updater_app():
             print("[APP] 📥 Baixando atualização...")
             update_checker.log_progress("📥 Baixando atualização...", 20)
             
-            # URL de download da API
-            download_url = f"{API_URL}/mediaplayer/api/download"
+            # Detecta se está rodando como executável ou script
+            is_frozen = getattr(sys, 'frozen', False)
+            
+            if is_frozen:
+                # Rodando como executável (.exe)
+                app_exe = sys.executable  # Caminho do .exe atual
+                app_dir = os.path.dirname(app_exe)
+                app_name = os.path.basename(app_exe)
+                process_name = app_name
+            else:
+                # Rodando como script Python
+                app_dir = os.path.dirname(os.path.abspath(__file__))
+                app_name = "main.py"
+                process_name = "python.exe"
             
             # Pasta temporária para download
             temp_folder = get_app_data_folder()
             os.makedirs(temp_folder, exist_ok=True)
             zip_path = os.path.join(temp_folder, "update_temp.zip")
             
-            # Baixa o arquivo ZIP
-            response = requests.get(download_url, timeout=120)
-            if response.status_code == 200:
-                # Etapa 3: Salvamento
-                print(f"[APP] 💾 Salvando arquivo...")
-                update_checker.log_progress("💾 Salvando arquivo...", 40)
-                with open(zip_path, 'wb') as f:
-                    f.write(response.content)
-                
-                print(f"[APP] ✅ Arquivo salvo: {zip_path}")
+            # Pacote parcial só com os arquivos que mudaram; sem ele, o completo
+            api_base = f"{API_URL}/mediaplayer"
+            package = prepare_update_package(api_base, app_dir, os.path.join(temp_folder, "local_manifest.json"))
+            if package:
+                print(f"[APP] 📦 Atualização parcial: {package['files']} arquivos, {package['size'] / 1e6:.1f} MB")
+                download_url, expected_sha256 = package["url"], package["sha256"]
+            else:
+                download_url, expected_sha256 = f"{api_base}/api/download", None
+            
+            def download_progress(done, total):
+                if total:
+                    # Download ocupa a faixa de 20% a 60% da barra
+                    update_checker.log_progress(
+                        f"📥 Baixando atualização... {done / 1e6:.1f} de {total / 1e6:.1f} MB",
+                        20 + int(40 * done / total),
+                    )
+                else:
+                    update_checker.log_progress(f"📥 Baixando atualização... {done / 1e6:.1f} MB", -1)
+
+            # Baixa o ZIP direto para o disco, retomando um download interrompido
+            try:
+                digest = download_file(download_url, zip_path, progress=download_progress, sha256=expected_sha256)
+                download_error = None
+            except DownloadError as e:
+                download_error = str(e)
+
+            if download_error is None:
+                print(f"[APP] ✅ Arquivo salvo e verificado: {zip_path} (sha256 {digest[:12]}…)")
                 
-                # Etapa 4: Extração
-                print(f"[APP] 📦 Extraindo arquivos...")
-                update_checker.log_progress("📦 Extraindo arquivos...", 60)
+                # Etapa 4: Extração do updater; o restante o próprio updater
+                # extrai e verifica em paralelo numa pasta ao lado da instalação
+                print(f"[APP] 📦 Extraindo atualizador...")
+                update_checker.log_progress("📦 Extraindo atualizador...", 60)
                 
                 import zipfile
                 extract_folder = os.path.join(temp_folder, "update_extracted")
+                shutil.rmtree(extract_folder, ignore_errors=True)
                 os.makedirs(extract_folder, exist_ok=True)
                 
                 with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(extract_folder)
+                    if "updater.exe" in zip_ref.namelist():
+                        zip_ref.extract("updater.exe", extract_folder)
                 
-                print(f"[APP] ✅ Arquivos extraídos: {extract_folder}")
-                update_checker.log_progress("✅ Arquivos extraídos", 80)
+                print(f"[APP] ✅ Atualizador extraído: {extract_folder}")
+                update_checker.log_progress("✅ Atualizador extraído", 80)
                 
                 # Procura updater.exe nos arquivos extraídos
                 updater_exe = os.path.join(extract_folder, "updater.exe")
                 
                 if os.path.exists(updater_exe):
-                    # Detecta se está rodando como executável ou script
-                    is_frozen = getattr(sys, 'frozen', False)
-                    
-                    if is_frozen:
-                        # Rodando como executável (.exe)
-                        app_exe = sys.executable  # Caminho do .exe atual
-                        app_dir = os.path.dirname(app_exe)
-                        app_name = os.path.basename(app_exe)
-                        process_name = app_name
-                    else:
-                        # Rodando como script Python
-                        app_dir = os.path.dirname(os.path.abspath(__file__))
-                        app_name = "main.py"
-                        process_name = "python.exe"
-                    
                     # Etapa 4: Preparação
                     print("[APP] 🔄 Preparando instalação...")
                     update_checker.log_progress("🔄 Preparando instalação...", 90)
@@ -355,12 +372,16 @@ def updater_app():
                     # Comando para executar updater.exe
                     cmd = [
                         updater_exe,
-                        "--zip", extract_folder,  # Passa a pasta com os arquivos extraídos
+                        "--zip", zip_path,  # Pacote baixado e verificado
                         "--target", app_dir,
                         "--process", process_name,
+                        "--pid", str(os.getpid()),
                         "--version", str(remote_version),
                         "--app-name", app_name
                     ]
+                    if package:
+                        # Pacote parcial: mescla nas pastas em vez de substituí-las
+                        cmd.append("--delta")
                     
                     # Etapa 5: Instalação
                     print(f"[APP] 🚀 Iniciando instalação...")
@@ -395,7 +416,7 @@ def updater_app():
                     update_checker.update_finished.emit(False, error_msg)
 
             else:
-                error_msg = f"Erro ao baixar: HTTP {response.status_code}"
+                error_msg = f"Erro ao baixar: {download_error}"
                 print(f"[APP] ❌ {error_msg}")
                 update_checker.update_finished.emit(False, error_msg)
                     
@@ -415,60 +436,59 @@ def updater_app():
 
 
 
-async def handle_client(reader, writer):
-    import asyncio
-    addr = writer.get_extra_info("peername")
-    print(f"[SERVER] Conectado por {addr}")
-    while True:
-        data = await reader.read(1024)
-        if not data:
-            break
-        print(f"[SERVER] Recebido: {data.decode()}")
-    writer.close()
-
-async def server():
-    import asyncio
-    server = await asyncio.start_server(handle_client, HOST, MEDIA_PORT)
-    print(f"[SERVER] Escutando em {HOST}:{MEDIA_PORT}")
-    async with server:
-        await server.serve_forever()
-
-async def client():
+async def client(hub):
+    """Conecta ao contador e envia posição, estado e alertas enquanto ele estiver aberto."""
     import asyncio
+    from config import TELEMETRY_DEFAULT_RATE
+    from ipc_protocol import TOPIC_POSITION, TOPIC_STATE, TOPIC_ALERTS
     try:
         reader, writer = await asyncio.open_connection(HOST, CONTADOR_PORT)
         print(f"[CLIENT] Conectado ao peer em {HOST}:{CONTADOR_PORT}")
-    except ConnectionRefusedError:
+    except (ConnectionRefusedError, OSError):
         print("[CLIENT] Não foi possível conectar, peer não disponível.")
         return
 
-    async def send_messages():
-        while True:
-            msg = await asyncio.get_event_loop().run_in_executor(None, input)
-            if msg.strip().lower() == "sair":
-                writer.close()
-                await writer.wait_closed()
-                break
-            writer.write(msg.encode())
-            await writer.drain()
-
-    async def receive_messages():
-        while True:
-            data = await reader.read(1024)
-            if not data:
-                break
-            print(f"[CLIENT] Recebido: {data.decode()}")
-
-    await asyncio.gather(send_messages(), receive_messages())
-
-def start_server(loop):
-    loop.create_task(server())
+    hub.subscribe(writer, TELEMETRY_DEFAULT_RATE, TOPIC_POSITION | TOPIC_STATE | TOPIC_ALERTS)
+    try:
+        # O contador não envia nada por esta conexão; só aguarda o fechamento
+        while await reader.read(1024):
+            pass
+    except ConnectionError:
+        pass
+    finally:
+        hub.unsubscribe(writer)
+        writer.close()
+        print("[CLIENT] Contador desconectado")
+
+def start_server(loop, player):
+    """Inicia o servidor de controle remoto (ipc_protocol) no asyncio loop."""
+    import asyncio
+    from ipc_server import PlayerCommandBridge, IpcServer
+    from pubsub import PubSubHub
+    from telemetry import TelemetrySampler
+    from state_ring import StateRing
+    from ipc_protocol import TELEMETRY_SIZE
+
+    # Telemetria também em memória compartilhada para leitores locais
+    try:
+        player.state_ring = StateRing.create(TELEMETRY_SIZE)
+    except (OSError, ValueError) as e:
+        print(f"[APP] Memória compartilhada indisponível, telemetria só por socket: {e}")
+        player.state_ring = None
+
+    # Bridge e amostrador são criados aqui, na thread da GUI, para rodarem nela
+    player.command_bridge = PlayerCommandBridge(player)
+    player.hub = PubSubHub(loop)
+    player.telemetry_sampler = TelemetrySampler(player, player.hub, state_ring=player.state_ring)
+    player.ipc_server = IpcServer(player.command_bridge, player.hub, HOST, MEDIA_PORT)
+    player.ipc_loop = loop  # closeEvent encerra o servidor neste loop
+    asyncio.run_coroutine_threadsafe(player.ipc_server.serve(), loop)
     print("[APP] Servidor iniciado no asyncio loop.")
 
-def start_client(loop):
+def start_client(loop, player):
     import asyncio
-    asyncio.run_coroutine_threadsafe(client(), loop)
-    print("[APP] Cliente iniciado manualmente no asyncio loop.")
+    asyncio.run_coroutine_threadsafe(client(player.hub), loop)
+    print("[APP] Cliente de telemetria iniciado no asyncio loop.")
 
 def run_asyncio_loop(loop):
     import asyncio
@@ -480,6 +500,7 @@ def parse_arguments():
 
     parser.add_argument("--croqui", type=str, help="Caminho para o arquivo de imagem do croqui")
     parser.add_argument("--video", type=str, help="Caminho para o arquivo de vídeo")
+    parser.add_argument("--new-instance", action="store_true", help="Abre outro player mesmo se já houver um em execução")
 
     args = parser.parse_args()
 
@@ -566,8 +587,11 @@ if __name__ == "__main__":
     t = Thread(target=run_asyncio_loop, args=(loop,), daemon=True)
     t.start()
 
-    # Inicia o servidor automaticamente
-    #start_server(loop)
+    # Inicia o servidor de controle remoto automaticamente
+    start_server(loop, player)
+
+    # Envia a posição ao contador, se ele estiver escutando em CONTADOR_PORT
+    start_client(loop, player)
 
     # Processa argumentos recebidos
     croqui_accepted = True  # Por padrão, aceita continuar
@@ -582,7 +606,7 @@ if __name__ == "__main__":
     # Se foi passado um vídeo e o croqui foi aceito (ou não havia croqui), carrega o vídeo
     if args.video and croqui_accepted:
         if os.path.exists(args.video) and args.video.lower().endswith(SUPPORTED_VIDEO_EXTENSIONS):
-            player.playlist.append(args.video)
+            player.add_to_playlist([args.video])
             player.current_video_index = 0
             player.open_file(args.video)
         
@@ -590,10 +614,14 @@ if __name__ == "__main__":
     elif len(sys.argv) > 1 and not args.croqui and not args.video:
         video_path = sys.argv[1]
         if os.path.exists(video_path) and video_path.lower().endswith(SUPPORTED_VIDEO_EXTENSIONS):
-            player.playlist.append(video_path)
+            player.add_to_playlist([video_path])
             player.current_video_index = 0
             player.open_file(video_path)
 
+    # Sem vídeo informado, restaura a sessão anterior
+    else:
+        player.restore_session()
+
     # Executa o app e captura o código de saída
     try:
         print("[APP] Iniciando loop de eventos Qt...")
@@ -629,6 +657,14 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"[APP] Erro no cleanup do player: {e}")
     
+    try:
+        # Remove a memória compartilhada da telemetria
+        if 'player' in locals() and getattr(player, 'state_ring', None):
+            player.telemetry_sampler.timer.stop()
+            player.state_ring.close()
+    except Exception as e:
+        print(f"[APP] Erro ao liberar memória compartilhada: {e}")
+    
     try:
         # Para o loop asyncio se existir
         if 'loop' in locals() and loop and loop.is_running():
@@ -1,22 +1,239 @@
 from PySide6.QtWidgets import (
     QDialog,
-    QListWidget,
+    QListView,
     QVBoxLayout,
     QHBoxLayout,
     QPushButton,
-    QWidget,
+    QStyledItemDelegate,
+    QStyle,
+    QAbstractItemView,
+    QLineEdit,
     QLabel,
-    QListWidgetItem,
 )
-from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QIcon
+from PySide6.QtCore import Qt, QSize, QAbstractListModel, QModelIndex, QRect, QEvent, QTimer
+from PySide6.QtGui import QIcon, QColor
 import os
+import time
+from bisect import bisect_left
 
 icon_path = os.path.join(os.path.dirname(__file__), "icons")
 
+ROW_HEIGHT = 36
+REMOVE_ICON_SIZE = 20
+CURRENT_ROLE = Qt.UserRole + 1
+
+
+class PlaylistModel(QAbstractListModel):
+    """Modelo sobre a lista de vídeos do player (a mesma lista, sem cópia).
+
+    As linhas são desenhadas sob demanda pelo delegate, então abrir ou
+    remover itens não cria nem reconstrói widgets. O filtro da busca é
+    uma lista de índices da playlist (``visible``); as linhas da view são
+    posições nessa lista. A cada tecla, os caminhos encontrados viram
+    índices por um dicionário (sem varrer a playlist) e a view recebe só
+    as linhas que entraram ou saíram.
+    """
+
+    def __init__(self, playlist, current_index, parent=None):
+        super().__init__(parent)
+        self.playlist = playlist
+        self.current_index = current_index
+        self.matches = None  # resultado da busca (None = sem filtro)
+        self.visible = None  # índices da playlist exibidos quando filtrado
+        self._rows = {}  # caminho -> índices da playlist
+        self._indexed_rows = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.playlist) if self.visible is None else len(self.visible)
+
+    def source_row(self, row):
+        """Converte a linha da view no índice da playlist."""
+        return row if self.visible is None else self.visible[row]
+
+    def view_row(self, source_row):
+        """Converte o índice da playlist na linha da view (-1 se oculto)."""
+        if self.visible is None:
+            return source_row
+        position = bisect_left(self.visible, source_row)
+        if position < len(self.visible) and self.visible[position] == source_row:
+            return position
+        return -1
+
+    def set_matches(self, matches):
+        """Aplica o resultado da busca (conjunto de caminhos) inserindo/removendo só as linhas que mudaram."""
+        self.matches = matches
+        old = self.visible if self.visible is not None else range(len(self.playlist))
+        new = self._visible_rows()
+        target = new if new is not None else range(len(self.playlist))
+
+        # Remoções de trás para frente: as posições anteriores não mudam
+        visible = list(old)
+        keep = set(target)
+        runs = []
+        for position, row in enumerate(visible):
+            if row in keep:
+                continue
+            if runs and runs[-1][1] == position - 1:
+                runs[-1][1] = position
+            else:
+                runs.append([position, position])
+        self.visible = visible
+        for start, end in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del visible[start:end + 1]
+            self.endRemoveRows()
+
+        # Inserções em ordem: o prefixo já exibido é igual ao da lista nova
+        present = set(old)
+        position = 0
+        while position < len(target):
+            if target[position] in present:
+                position += 1
+                continue
+            first = position
+            while position < len(target) and target[position] not in present:
+                position += 1
+            self.beginInsertRows(QModelIndex(), first, position - 1)
+            visible[first:first] = target[first:position]
+            self.endInsertRows()
+
+        if new is None:
+            self.visible = None
+
+    def _row_lookup(self):
+        """Caminho -> índices da playlist, estendido quando a playlist só cresceu."""
+        for row in range(self._indexed_rows, len(self.playlist)):
+            self._rows.setdefault(self.playlist[row], []).append(row)
+        self._indexed_rows = len(self.playlist)
+        return self._rows
+
+    def _visible_rows(self):
+        if self.matches is None:
+            return None
+        rows = self._row_lookup()
+        return sorted(row for path in self.matches for row in rows.get(path, ()))
+
+    def _update_visible(self):
+        # Chamado depois de remoções: os índices da playlist mudaram
+        self._rows = {}
+        self._indexed_rows = 0
+        self.visible = self._visible_rows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.source_row(index.row())
+        if role == Qt.DisplayRole:
+            return os.path.basename(self.playlist[row])
+        if role in (Qt.UserRole, Qt.ToolTipRole):
+            return self.playlist[row]
+        if role == CURRENT_ROLE:
+            return row == self.current_index
+        return None
+
+    def remove_rows(self, rows):
+        """Remove os índices da playlist informados (exceto o vídeo atual) e retorna quantos saíram."""
+        rows = sorted({r for r in rows if 0 <= r < len(self.playlist) and r != self.current_index}, reverse=True)
+        if not rows:
+            return 0
+
+        if self.visible is not None:
+            # Com filtro ativo as posições da view mudam; recalcula a lista visível
+            self.beginResetModel()
+            for row in rows:
+                del self.playlist[row]
+                if self.current_index > row:
+                    self.current_index -= 1
+            self._update_visible()
+            self.endResetModel()
+            return len(rows)
+
+        # Agrupa linhas consecutivas para emitir um único sinal por bloco
+        start = end = rows[0]
+        for row in rows[1:] + [None]:
+            if row is not None and row == start - 1:
+                start = row
+                continue
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del self.playlist[start:end + 1]
+            if self.current_index > end:
+                self.current_index -= end - start + 1
+            self.endRemoveRows()
+            if row is not None:
+                start = end = row
+        self._rows = {}
+        self._indexed_rows = 0
+        return len(rows)
+
+    def clear_except_current(self):
+        """Remove todos os vídeos, exceto o vídeo atual (se presente)."""
+        self.beginResetModel()
+        if 0 <= self.current_index < len(self.playlist):
+            current_video = self.playlist[self.current_index]
+            self.playlist.clear()
+            self.playlist.append(current_video)
+            self.current_index = 0  # O vídeo atual passa a ser o único
+        else:
+            self.playlist.clear()
+            self.current_index = -1
+        self._update_visible()
+        self.endResetModel()
+
+
+class PlaylistDelegate(QStyledItemDelegate):
+    """Desenha cada linha (nome + botão de remover) somente quando visível."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.remove_icon = QIcon(os.path.join(icon_path, "remove.png"))
+        self.text_color = QColor("white")
+        self.current_color = QColor("#4FC3F7")
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def remove_button_rect(self, rect):
+        return QRect(
+            rect.right() - REMOVE_ICON_SIZE - 8,
+            rect.center().y() - REMOVE_ICON_SIZE // 2,
+            REMOVE_ICON_SIZE,
+            REMOVE_ICON_SIZE,
+        )
+
+    def paint(self, painter, option, index):
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, QColor("#0078D7"))
+        elif option.state & QStyle.State_MouseOver:
+            painter.fillRect(option.rect, QColor("#404040"))
+
+        is_current = index.data(CURRENT_ROLE)
+        button_rect = self.remove_button_rect(option.rect)
+        text_rect = option.rect.adjusted(8, 0, -(REMOVE_ICON_SIZE + 16), 0)
+        text = option.fontMetrics.elidedText(index.data(Qt.DisplayRole), Qt.ElideMiddle, text_rect.width())
+
+        painter.setPen(self.current_color if is_current else self.text_color)
+        painter.drawText(text_rect, Qt.AlignVCenter | Qt.AlignLeft, text)
+        self.remove_icon.paint(painter, button_rect, mode=QIcon.Disabled if is_current else QIcon.Normal)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (
+            event.type() == QEvent.MouseButtonRelease
+            and event.button() == Qt.LeftButton
+            and self.remove_button_rect(option.rect).contains(event.position().toPoint())
+        ):
+            model.remove_rows([model.source_row(index.row())])
+            return True
+        return super().editorEvent(event, model, option, index)
+
 
 class PlaylistModal(QDialog):
-    def __init__(self, parent, playlist, current_index):
+    def __init__(self, parent, playlist, current_index, search_index=None, segment_lookup=None):
+        self._open_started = time.perf_counter()
+        self.open_time_ms = None
         super().__init__(parent)
         self.setWindowTitle("Playlist")
         self.setWindowIcon(QIcon(os.path.join(icon_path, "playlist.png")))
@@ -27,52 +244,50 @@ class PlaylistModal(QDialog):
             background-color: #1E1E1E; /* Fundo escuro */
             border-radius: 10px;
         }
-        QListWidget {
-            background-color: #252525;
+        QLineEdit {
+            background-color: #2D2D2D;
             color: white;
-            font-size: 14px;
-            padding: 10px;
+            border: 1px solid #555;
             border-radius: 5px;
-            outline: none;
+            padding: 6px;
+            font-size: 14px;
         }
-        QListWidget::item {
-            height: 30px;
-            padding: 5px;
+        QLineEdit:focus {
+            border: 1px solid #00AFFF;
         }
-        QListWidget::item:selected {
-            background-color: #0078D7; /* Cor de seleção */
+        QListView {
+            background-color: #252525;
             color: white;
+            font-size: 14px;
+            padding: 10px;
             border-radius: 5px;
             outline: none;
         }
-        QListWidget::item:hover {
-            background-color: #404040; /* Destaque ao passar o mouse */
-        }
-        
-        QListWidget::verticalScrollBar {
+
+        QListView::verticalScrollBar {
             border: none;
             background: #2E2E2E;  /* Cor de fundo da barra */
             width: 10px;  /* Largura da scrollbar */
             margin: 5px 0px 5px 0px;
             border-radius: 5px;
         }
-        
-        QListWidget::verticalScrollBar::handle {
+
+        QListView::verticalScrollBar::handle {
             background: #0078D7;  /* Cor do controle */
             min-height: 30px;
             border-radius: 5px;
         }
-        
-        QListWidget::verticalScrollBar::handle:hover {
+
+        QListView::verticalScrollBar::handle:hover {
             background: #005A9E;  /* Cor ao passar o mouse */
         }
-        
-        QListWidget::verticalScrollBar::handle:pressed {
+
+        QListView::verticalScrollBar::handle:pressed {
             background: #00407A;  /* Cor ao clicar */
         }
-        
-        QListWidget::verticalScrollBar::add-line, 
-        QListWidget::verticalScrollBar::sub-line {
+
+        QListView::verticalScrollBar::add-line,
+        QListView::verticalScrollBar::sub-line {
             background: none;
             border: none;
         }
@@ -81,17 +296,40 @@ class PlaylistModal(QDialog):
         self.playlist = playlist
         self.selected_video = None  # Armazena o vídeo selecionado
         self.selected_index = -1
-        self.current_index = current_index
+        self.search_index = search_index
+        self.segment_lookup = segment_lookup
 
-        # Criando a lista de vídeos
-        self.list_widget = QListWidget(self)
-        self.build_list_items()
+        # Modelo + delegate: as linhas só são desenhadas quando ficam visíveis
+        self.model = PlaylistModel(self.playlist, current_index, self)
+        self.list_view = QListView(self)
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(PlaylistDelegate(self.list_view))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setMouseTracking(True)
+        self.list_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.list_view.doubleClicked.connect(self.select_video)
+        if 0 <= current_index < len(self.playlist):
+            self.list_view.scrollTo(self.model.index(current_index), QAbstractItemView.PositionAtCenter)
+
+        # Busca incremental: "camera 3 17:00", "ch2 08h-09h", partes do nome
+        self.filter_input = QLineEdit(self)
+        self.filter_input.setPlaceholderText("Filtrar (ex: camera 3 17:00)")
+        self.filter_input.setClearButtonEnabled(True)
+        self.filter_input.textChanged.connect(self.apply_filter)
+        self.filter_count = QLabel(self)
+        self.filter_count.setStyleSheet("color: #BBBBBB; background-color: transparent;")
 
         # Botão para selecionar um vídeo
         self.select_button = QPushButton(" Reproduzir")
         self.select_button.setIcon(QIcon(os.path.join(icon_path, "play-playlist.png")))
         self.select_button.clicked.connect(self.select_video)
 
+        # Botão para remover os vídeos selecionados
+        self.remove_button = QPushButton(" Remover Selecionados")
+        self.remove_button.setIcon(QIcon(os.path.join(icon_path, "remove.png")))
+        self.remove_button.setStyleSheet("color: white;")
+        self.remove_button.clicked.connect(self.remove_selected)
+
         # Botão para limpar a playlist
         self.clear_button = QPushButton(" Limpar Playlist")
         self.clear_button.setIcon(QIcon(os.path.join(icon_path, "trash.png")))
@@ -100,81 +338,76 @@ class PlaylistModal(QDialog):
 
         # Layout do modal
         layout = QVBoxLayout()
-        layout.addWidget(self.list_widget)
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(self.filter_input)
+        filter_layout.addWidget(self.filter_count)
+        layout.addLayout(filter_layout)
+        layout.addWidget(self.list_view)
 
         # Layout horizontal para os botões
         buttons_layout = QHBoxLayout()
         buttons_layout.addWidget(self.select_button)
+        buttons_layout.addWidget(self.remove_button)
         buttons_layout.addWidget(self.clear_button)
 
         layout.addLayout(buttons_layout)
         self.setLayout(layout)
 
-    def build_list_items(self):
-        """Recria os itens do QListWidget usando setItemWidget para ter um botão de remoção."""
-        self.list_widget.clear()  # limpa tudo
-        for i, video in enumerate(self.playlist):
-            item = QListWidgetItem(self.list_widget)
-            # Guardamos o caminho completo no UserRole (opcional)
-            item.setData(Qt.UserRole, video)
-
-            # Cria um widget horizontal com (Label + Botão "remover")
-            row_widget = QWidget()
-            row_layout = QHBoxLayout(row_widget)
-            row_layout.setContentsMargins(0, 0, 0, 0)
-
-            # Label com o nome do arquivo
-            label = QLabel(os.path.basename(video))
-            label.setStyleSheet(
-                "color: white; background-color: transparent;"
-            )  # cor do texto
-            row_layout.addWidget(label)
-
-            # "Empurra" o botão para a direita
-            row_layout.addStretch()
-
-            # Botão de remover
-            remove_button = QPushButton()
-            remove_button.setIcon(QIcon(os.path.join(icon_path, "remove.png")))
-            remove_button.setFixedSize(25, 25)  # Tamanho fixo do botão
-            remove_button.setStyleSheet(
-                """
-                QPushButton {
-                    background-color: transparent;
-                    color: white;
-                }
-                QPushButton:hover {
-                    background-color: rgba(255, 255, 255, 30);
-                    border-radius: 12px; 
-                }
-            """
-            )
-
-            if i == self.current_index:
-                remove_button.setEnabled(False)
+    @property
+    def current_index(self):
+        """Índice do vídeo atual, ajustado após remoções."""
+        return self.model.current_index
 
-            # Conecta o botão a um método que remove este item
-            remove_button.clicked.connect(lambda checked, row=i: self.remove_video(row))
-            row_layout.addWidget(remove_button)
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.open_time_ms is None:
+            self.open_time_ms = (time.perf_counter() - self._open_started) * 1000
+            print(f"[PLAYLIST] Aberta em {self.open_time_ms:.1f} ms ({len(self.playlist)} vídeos)")
+            # Indexa a busca depois que o modal já está visível
+            QTimer.singleShot(0, self.prepare_search)
 
-            # Define o layout do row_widget
-            row_widget.setLayout(row_layout)
+    def prepare_search(self):
+        """Indexa os vídeos ainda não indexados para a busca."""
+        if self.search_index is None:
+            return
+        started = time.perf_counter()
+        self.search_index.sync(self.playlist, self.segment_lookup)
+        elapsed = (time.perf_counter() - started) * 1000
+        if elapsed >= 1:
+            print(f"[PLAYLIST] Índice de busca atualizado em {elapsed:.1f} ms")
 
-            # Associa row_widget ao QListWidgetItem
-            self.list_widget.setItemWidget(item, row_widget)
+    def apply_filter(self, text):
+        """Atualiza o filtro a cada tecla, sem recriar as linhas."""
+        if self.search_index is None:
+            return
+        self.prepare_search()
+        matches = self.search_index.search(text)
+        self.model.set_matches(matches)
+        if matches is None:
+            self.filter_count.clear()
+            # Volta à lista completa posicionada no vídeo atual
+            row = self.model.view_row(self.current_index)
+            if row != -1:
+                self.list_view.scrollTo(self.model.index(row), QAbstractItemView.PositionAtCenter)
+        else:
+            self.filter_count.setText(f"{self.model.rowCount()} / {len(self.playlist)}")
 
     def remove_video(self, row):
-        """Remove o vídeo 'row' da playlist e atualiza a lista."""
-        if 0 <= row < len(self.playlist):
-            if row == self.current_index:
-                print("Não é possível remover o vídeo atual!")
-                return
-            del self.playlist[row]
-            self.build_list_items()  # reconstrói a lista
+        """Remove o vídeo 'row' da playlist."""
+        if row == self.current_index:
+            print("Não é possível remover o vídeo atual!")
+            return
+        self.model.remove_rows([row])
+
+    def remove_selected(self):
+        """Remove todos os vídeos selecionados (o vídeo atual é mantido)."""
+        rows = [self.model.source_row(index.row()) for index in self.list_view.selectionModel().selectedRows()]
+        self.model.remove_rows(rows)
 
     def select_video(self):
         """Pega o vídeo selecionado e fecha o modal."""
-        index = self.list_widget.currentRow()
+        current = self.list_view.currentIndex()
+        index = self.model.source_row(current.row()) if current.isValid() else -1
         if 0 <= index < len(self.playlist):
             self.selected_video = self.playlist[index]
             self.selected_index = index
@@ -182,12 +415,4 @@ class PlaylistModal(QDialog):
 
     def clear_playlist(self):
         """Remove todos os vídeos da playlist, exceto o vídeo atual (se presente)."""
-        if 0 <= self.current_index < len(self.playlist):
-            current_video = self.playlist[self.current_index]
-            self.playlist.clear()
-            self.playlist.append(current_video)
-            self.current_index = 0  # O vídeo atual passa a ser o único
-        else:
-            self.playlist.clear()
-            self.current_index = -1
-        self.build_list_items()  # Reconstrói a lista exibida
+        self.model.clear_except_current()
@@ -0,0 +1,216 @@
+"""
+Incremental playlist search for PPL Player.
+Indexes filename tokens, camera and recording time so the playlist filter
+can be updated on every keystroke, even with thousands of entries.
+"""
+
+import os
+import re
+from bisect import bisect_left
+from typing import NamedTuple, Optional, Tuple
+
+from dvr import parse_dvr_filename
+
+_TOKEN_RE = re.compile(r"[a-z]+|\d+")
+_CAMERA_QUERY_RE = re.compile(r"\b(?:c[âa]mera|cam|canal|ch)\s*0*(\d{1,3})\b")
+_TIME_QUERY_RE = re.compile(r"\b(\d{1,2})[:h](\d{1,2})?(?:\s*-\s*(\d{1,2})(?:[:h](\d{2})?)?)?")
+
+
+class SearchQuery(NamedTuple):
+    """A parsed search string."""
+
+    camera: Optional[int]
+    time_range: Optional[Tuple[int, int]]  # minutos do dia [início, fim)
+    terms: Tuple[str, ...]
+
+    def refines(self, previous: "SearchQuery") -> bool:
+        """True when every result of this query is also a result of ``previous``."""
+        if self.camera != previous.camera or self.time_range != previous.time_range:
+            return False
+        if len(self.terms) < len(previous.terms):
+            return False
+        return all(new.startswith(old) for old, new in zip(previous.terms, self.terms))
+
+
+def tokenize(text: str):
+    """
+    Split a filename into lowercase search tokens.
+
+    Letter and digit runs become separate tokens, numbers also appear
+    without leading zeros and glued to the preceding word ("ch03" gives
+    "ch", "03", "3" and "ch3").
+
+    Args:
+        text (str): Text to tokenise
+
+    Returns:
+        set: Search tokens
+    """
+    parts = _TOKEN_RE.findall(text.lower())
+    tokens = set(parts)
+    previous = ""
+    for part in parts:
+        if part.isdigit():
+            number = str(int(part))
+            tokens.add(number)
+            if previous and not previous.isdigit():
+                tokens.add(previous + number)
+        previous = part
+    return tokens
+
+
+def parse_query(text: str) -> SearchQuery:
+    """
+    Parse a search string such as "camera 3 17:00" or "ch2 08h-09h30".
+
+    Args:
+        text (str): Text typed by the user
+
+    Returns:
+        SearchQuery: Camera, time-of-day range and remaining terms
+    """
+    text = text.lower().strip()
+
+    camera = None
+    match = _CAMERA_QUERY_RE.search(text)
+    if match:
+        camera = int(match.group(1))
+        text = text[:match.start()] + " " + text[match.end():]
+
+    time_range = None
+    match = _TIME_QUERY_RE.search(text)
+    if match and int(match.group(1)) < 24:
+        minutes = match.group(2) or ""
+        # "17:3" (digitação parcial) equivale a 17:30-17:39
+        start = int(match.group(1)) * 60 + (int(minutes) * 10 if len(minutes) == 1 else int(minutes or 0))
+        if match.group(3) is not None:
+            end = int(match.group(3)) * 60 + int(match.group(4) or 0)
+        else:
+            # "17:00" cobre o minuto, "17h" a hora inteira
+            end = start + {0: 60, 1: 10, 2: 1}[len(minutes)]
+        time_range = (start, max(end, start + 1))
+        text = text[:match.start()] + " " + text[match.end():]
+
+    return SearchQuery(camera, time_range, tuple(_TOKEN_RE.findall(text)))
+
+
+class PlaylistSearchIndex:
+    """Inverted index over playlist paths.
+
+    Terms are prefix-matched against a sorted token list, so each keystroke
+    costs a few bisections plus set intersections instead of a scan of
+    every filename. When the new query only narrows the previous one, only
+    the terms that changed are looked up and intersected with the previous
+    result.
+    """
+
+    def __init__(self):
+        self._paths = {}  # caminho -> (tokens, câmera, início, fim)
+        self._postings = {}  # token -> conjunto de caminhos
+        self._sorted_tokens = []
+        self._tokens_dirty = False
+        self._cameras = {}  # câmera -> conjunto de caminhos
+        self._last_query = None
+        self._last_result = None
+
+    def __len__(self):
+        return len(self._paths)
+
+    def sync(self, playlist, segment_lookup=None):
+        """Index the paths of ``playlist`` that are not indexed yet.
+
+        Removed paths may stay in the index; callers filter results
+        against the rows they still have.
+
+        Args:
+            playlist (list): Current playlist
+            segment_lookup (callable, optional): path -> DvrSegment, to reuse
+                segments already parsed by the PlaylistIndex
+        """
+        added = False
+        for path in playlist:
+            if path in self._paths:
+                continue
+            segment = segment_lookup(path) if segment_lookup else None
+            if segment is None:
+                segment = parse_dvr_filename(path)
+            tokens = tokenize(os.path.basename(path))
+            self._paths[path] = (tokens, segment.camera, segment.start, segment.end)
+            for token in tokens:
+                self._postings.setdefault(token, set()).add(path)
+            if segment.camera is not None:
+                self._cameras.setdefault(segment.camera, set()).add(path)
+            added = True
+
+        if added:
+            self._tokens_dirty = True
+            self._last_query = None
+            self._last_result = None
+
+    def search(self, text: str):
+        """Return the set of indexed paths matching ``text`` (None = everything)."""
+        query = parse_query(text)
+        if query.camera is None and query.time_range is None and not query.terms:
+            self._last_query, self._last_result = query, None
+            return None
+
+        if self._last_result is not None and query.refines(self._last_query):
+            # Só os termos que mudaram precisam ser consultados de novo
+            result = set(self._last_result)
+            previous_terms = self._last_query.terms
+            for position, term in enumerate(query.terms):
+                if position >= len(previous_terms) or term != previous_terms[position]:
+                    result &= self._prefix_postings(term)
+        else:
+            result = self._evaluate(query)
+
+        self._last_query, self._last_result = query, result
+        return result
+
+    def _evaluate(self, query):
+        sets = []
+        if query.camera is not None:
+            sets.append(self._cameras.get(query.camera, set()))
+        for term in query.terms:
+            sets.append(self._prefix_postings(term))
+        if not sets:
+            sets.append(self._paths.keys())
+
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+
+        if query.time_range is not None:
+            result = {path for path in result if self._matches_time(path, query.time_range)}
+        return result
+
+    def _prefix_postings(self, prefix):
+        if self._tokens_dirty:
+            self._sorted_tokens = sorted(self._postings)
+            self._tokens_dirty = False
+
+        matches = set()
+        position = bisect_left(self._sorted_tokens, prefix)
+        while position < len(self._sorted_tokens) and self._sorted_tokens[position].startswith(prefix):
+            matches |= self._postings[self._sorted_tokens[position]]
+            position += 1
+        return matches
+
+    def _matches_time(self, path, time_range):
+        _, _, start, end = self._paths[path]
+        if start is None:
+            return False
+        query_start, query_end = time_range
+        segment_start = start.hour * 60 + start.minute
+        if end is not None:
+            segment_end = segment_start + max(1, int((end - start).total_seconds() // 60))
+        else:
+            segment_end = segment_start + 1
+        # Trechos que passam da meia-noite também cobrem o início do dia seguinte
+        for offset in (0, -24 * 60):
+            if segment_start + offset < query_end and query_start < segment_end + offset:
+                return True
+        return False
@@ -0,0 +1,133 @@
+"""
+Publish/subscribe hub for PPL Player.
+Fans out position, state, count and alert events to every connected
+client (counters, supervisor dashboards, loggers) by topic, with a
+bounded amount of pending data per subscriber.
+"""
+
+import asyncio
+from collections import deque
+
+import ipc_protocol as proto
+from config import TELEMETRY_MAX_RATE, TELEMETRY_MAX_BUFFER, HUB_QUEUE_MAX, HUB_MAX_BUFFER
+
+
+class Subscriber:
+    """One connection: its topics, position rate, queue and counters."""
+
+    def __init__(self, writer, topics, rate_hz):
+        self.writer = writer
+        self.topics = topics
+        self.interval = 1 / max(1, min(TELEMETRY_MAX_RATE, rate_hz))
+        self.queue = deque()
+        self.wake = asyncio.Event()
+        self.last_position_seq = -1
+        self.sent = 0
+        self.dropped = 0
+        self.task = None
+
+
+class PubSubHub:
+    """Topic hub running on the asyncio loop.
+
+    Each subscriber has its own sender task, so a client that stops
+    reading only stalls its own task. Position samples are never queued:
+    the task sends the latest one at the subscriber's rate, skipping ticks
+    while more than ``TELEMETRY_MAX_BUFFER`` bytes are pending. State,
+    count and alert events go through a per-subscriber queue capped at
+    ``HUB_QUEUE_MAX`` frames (plus ``HUB_MAX_BUFFER`` bytes in the socket);
+    when it is full the oldest frame is dropped.
+    Publishing is therefore O(subscribers) appends and never waits on a
+    socket.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.latest_position = None
+        self.subscribers = {}  # writer -> Subscriber
+
+    def has_subscribers(self):
+        return bool(self.subscribers)
+
+    # Publicação (qualquer thread)
+
+    def publish_position(self, sample, state_changed=False):
+        """Store the latest telemetry sample; discrete changes also go to TOPIC_STATE."""
+        self.latest_position = sample
+        if state_changed:
+            self.loop.call_soon_threadsafe(self._state_changed, sample)
+
+    def publish(self, topic, frame):
+        """Queue an encoded event ``frame`` for every subscriber of ``topic``."""
+        self.loop.call_soon_threadsafe(self._fan_out, topic, frame)
+
+    # Métodos abaixo rodam no asyncio loop
+
+    def _state_changed(self, sample):
+        self._fan_out(proto.TOPIC_STATE, proto.encode_event(proto.OP_STATE, sample.pack()))
+        # Assinantes de posição recebem a nova posição sem esperar o próximo tick
+        for subscriber in self.subscribers.values():
+            if subscriber.topics & proto.TOPIC_POSITION:
+                subscriber.wake.set()
+
+    def _fan_out(self, topic, frame):
+        for subscriber in self.subscribers.values():
+            if not subscriber.topics & topic:
+                continue
+            if len(subscriber.queue) >= HUB_QUEUE_MAX:
+                subscriber.queue.popleft()
+                subscriber.dropped += 1
+            subscriber.queue.append(frame)
+            subscriber.wake.set()
+
+    def subscribe(self, writer, rate_hz, topics=proto.TOPIC_POSITION):
+        """Start (or replace) the subscription of ``writer``; rate 0 or no topics cancels."""
+        self.unsubscribe(writer)
+        if rate_hz <= 0 or not topics & proto.TOPIC_ALL:
+            return
+        subscriber = Subscriber(writer, topics, rate_hz)
+        subscriber.task = asyncio.ensure_future(self._run(subscriber))
+        self.subscribers[writer] = subscriber
+
+    def unsubscribe(self, writer):
+        subscriber = self.subscribers.pop(writer, None)
+        if subscriber is None:
+            return
+        subscriber.task.cancel()
+        if subscriber.dropped:
+            print(f"[HUB] Assinante lento: {subscriber.sent} enviadas, {subscriber.dropped} descartadas")
+
+    async def _run(self, subscriber):
+        writer = subscriber.writer
+        transport = writer.transport
+        wants_position = subscriber.topics & proto.TOPIC_POSITION
+        timeout = subscriber.interval if wants_position else None
+        try:
+            while not writer.is_closing():
+                try:
+                    await asyncio.wait_for(subscriber.wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                subscriber.wake.clear()
+
+                while subscriber.queue:
+                    writer.write(subscriber.queue.popleft())
+                    subscriber.sent += 1
+                    if transport.get_write_buffer_size() > HUB_MAX_BUFFER:
+                        # Só esta tarefa espera; o restante da fila continua limitado
+                        await writer.drain()
+
+                sample = self.latest_position
+                if not wants_position or sample is None or sample.seq == subscriber.last_position_seq:
+                    continue
+                if transport.get_write_buffer_size() > TELEMETRY_MAX_BUFFER:
+                    subscriber.dropped += 1
+                    continue
+                writer.write(proto.encode_event(proto.OP_TELEMETRY, sample.pack()))
+                subscriber.last_position_seq = sample.seq
+                subscriber.sent += 1
+        except ConnectionError:
+            pass
+        finally:
+            if self.subscribers.get(writer) is subscriber:
+                del self.subscribers[writer]
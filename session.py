@@ -0,0 +1,195 @@
+"""
+Session persistence for PPL Player.
+Keeps the playlist, playback state, zoom and keybinds between launches
+using a compact snapshot plus an append-only journal of changes.
+"""
+
+import json
+import os
+import time
+
+from utils import get_app_data_folder
+from config import SESSION_JOURNAL_MAX_ENTRIES
+
+SNAPSHOT_FILE = "session.json"
+JOURNAL_FILE = "session.journal"
+
+
+def atomic_write_json(path: str, data) -> None:
+    """
+    Write JSON to ``path`` atomically (temp file + fsync + rename).
+
+    Readers see either the previous file or the new one, never a
+    partially written file, even if the app is killed mid-write.
+
+    Args:
+        path (str): Destination file
+        data: JSON-serialisable object
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class SessionStore:
+    """Snapshot + journal store for the player session.
+
+    Every change is appended to the journal as one small JSON line, so
+    saving never rewrites the whole playlist. When the journal grows past
+    ``SESSION_JOURNAL_MAX_ENTRIES`` it is folded into a new snapshot. The
+    journal starts with the snapshot generation it applies to, so a crash
+    between writing a snapshot and truncating the journal cannot replay
+    old entries twice.
+    """
+
+    def __init__(self, folder=None):
+        self.folder = folder or get_app_data_folder()
+        self.snapshot_path = os.path.join(self.folder, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(self.folder, JOURNAL_FILE)
+        self.playlist = []
+        self.state = {}
+        self.keybinds = {}
+        self.generation = 0
+        self._journal = None
+        self._journal_entries = 0
+
+    # Leitura
+
+    def load(self) -> dict:
+        """Load the snapshot and replay the journal on top of it."""
+        started = time.perf_counter()
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self.playlist = list(snapshot.get("playlist", []))
+            self.state = dict(snapshot.get("state", {}))
+            self.keybinds = dict(snapshot.get("keybinds", {}))
+            self.generation = int(snapshot.get("generation", 0))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"[SESSION] Snapshot inválido, ignorando: {e}")
+
+        self._journal_entries = 0
+        damaged = False
+        try:
+            with open(self.journal_path, "rb") as f:
+                header = json.loads(f.readline() or b"{}")
+                if header.get("op") == "base" and header.get("generation") == self.generation:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # Última linha incompleta (app encerrado durante a escrita)
+                            damaged = True
+                            break
+                        self._apply(entry)
+                        self._journal_entries += 1
+                        if not line.endswith(b"\n"):
+                            damaged = True
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"[SESSION] Erro ao ler journal: {e}")
+
+        if damaged:
+            # Anexar depois de uma linha parcial a emendaria com a próxima entrada;
+            # o estado já lido vai para um snapshot novo e o journal recomeça
+            print("[SESSION] Journal com linha incompleta; compactando")
+            self.compact()
+
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"[SESSION] Sessão carregada em {elapsed:.1f} ms ({len(self.playlist)} vídeos)")
+        return {"playlist": list(self.playlist), "state": dict(self.state), "keybinds": dict(self.keybinds)}
+
+    def _apply(self, entry):
+        op = entry.get("op")
+        if op == "append":
+            self.playlist.extend(entry["paths"])
+        elif op == "playlist":
+            self.playlist = list(entry["paths"])
+        elif op == "state":
+            self.state.update(entry["values"])
+        elif op == "keybinds":
+            self.keybinds = dict(entry["values"])
+
+    # Escrita
+
+    def sync_playlist(self, playlist):
+        """Record the difference between ``playlist`` and the stored one."""
+        known = len(self.playlist)
+        if len(playlist) == known and playlist == self.playlist:
+            return
+        if len(playlist) > known and playlist[:known] == self.playlist:
+            self._write({"op": "append", "paths": playlist[known:]})
+        else:
+            self._write({"op": "playlist", "paths": list(playlist)})
+
+    def update_state(self, **values):
+        """Record playback/zoom values that changed since the last call."""
+        changed = {key: value for key, value in values.items() if self.state.get(key) != value}
+        if changed:
+            self._write({"op": "state", "values": changed})
+
+    def set_keybinds(self, keybinds):
+        if keybinds != self.keybinds:
+            self._write({"op": "keybinds", "values": dict(keybinds)})
+
+    def _write(self, entry):
+        self._apply(entry)
+        try:
+            if self._journal is None:
+                self._open_journal()
+            self._journal.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._journal.flush()
+            self._journal_entries += 1
+            if self._journal_entries >= SESSION_JOURNAL_MAX_ENTRIES:
+                self.compact()
+        except OSError as e:
+            print(f"[SESSION] Erro ao salvar sessão: {e}")
+
+    def _open_journal(self):
+        """Open the journal for appending, starting a fresh one if stale."""
+        os.makedirs(self.folder, exist_ok=True)
+        if self._journal_entries == 0:
+            self._journal = open(self.journal_path, "w", encoding="utf-8")
+            self._journal.write(json.dumps({"op": "base", "generation": self.generation}) + "\n")
+        else:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot and start a new journal."""
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            self.generation += 1
+            atomic_write_json(
+                self.snapshot_path,
+                {
+                    "generation": self.generation,
+                    "playlist": self.playlist,
+                    "state": self.state,
+                    "keybinds": self.keybinds,
+                },
+            )
+            # O snapshot já contém tudo; o próximo journal começa vazio
+            self._journal_entries = 0
+            self._open_journal()
+        except OSError as e:
+            print(f"[SESSION] Erro ao compactar sessão: {e}")
+
+    def close(self):
+        """Flush and close the journal."""
+        if self._journal is not None:
+            try:
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+                self._journal.close()
+            except OSError as e:
+                print(f"[SESSION] Erro ao fechar journal: {e}")
+            self._journal = None
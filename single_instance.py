@@ -0,0 +1,82 @@
+"""
+Single-instance launch for PPL Player.
+Before Qt and VLC are loaded, a new launch looks for a running player
+and hands it the command-line arguments, so the counting workflow reuses
+the warm instance instead of starting a second player.
+"""
+
+import argparse
+import os
+import time
+
+import ipc_protocol as proto
+from ipc_transport import open_blocking_connection
+from config import HOST, MEDIA_PORT, SINGLE_INSTANCE_REPLY_TIMEOUT, SINGLE_INSTANCE_TIMEOUT
+
+
+def parse_handoff_arguments(argv):
+    """Extract --video/--croqui/--new-instance without validating anything else."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--video", type=str)
+    parser.add_argument("--croqui", type=str)
+    parser.add_argument("--new-instance", action="store_true")
+    parser.add_argument("path", nargs="?")  # forma antiga: main.py video.mp4
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
+def hand_off(video=None, croqui=None, host=HOST, port=MEDIA_PORT, timeout=SINGLE_INSTANCE_TIMEOUT,
+             reply_timeout=SINGLE_INSTANCE_REPLY_TIMEOUT) -> bool:
+    """
+    Send ``video``/``croqui`` to a running player.
+
+    ``timeout`` bounds connecting; the reply has its own ``reply_timeout``,
+    since the running player answers from its GUI thread, which may be
+    busy for a moment. A player that never answers counts as not running.
+
+    Returns:
+        bool: True if a player accepted them (this process can exit),
+        False if there is no running player or it did not answer
+    """
+    started = time.perf_counter()
+    try:
+        connection = open_blocking_connection(host, port, timeout)
+    except OSError:
+        return False
+
+    try:
+        video = os.path.abspath(video) if video else None
+        croqui = os.path.abspath(croqui) if croqui else None
+        connection.sendall(proto.encode_request(proto.OP_HANDOFF, 1, video, croqui))
+
+        decoder = proto.FrameDecoder()
+        deadline = time.monotonic() + reply_timeout
+        while True:
+            connection.settimeout(max(0.001, deadline - time.monotonic()))
+            data = connection.recv(4096)
+            if not data:
+                return False
+            for message in decoder.feed(data):
+                if message.kind == proto.KIND_REPLY and message.request_id == 1:
+                    elapsed = (time.perf_counter() - started) * 1000
+                    if message.status != proto.STATUS_OK:
+                        print(f"[APP] Player aberto recusou os argumentos: {message.payload.decode('utf-8', 'replace')}")
+                        return False
+                    print(f"[APP] Argumentos enviados ao player já aberto ({elapsed:.1f} ms)")
+                    return True
+    except TimeoutError:
+        print(f"[APP] Player aberto não respondeu em {reply_timeout:.1f} s; abrindo nova instância")
+        return False
+    except (OSError, proto.ProtocolError):
+        # Porta ocupada por outro programa ou player antigo: segue com uma nova instância
+        return False
+    finally:
+        connection.close()
+
+
+def hand_off_from_argv(argv) -> bool:
+    """Hand the command line to a running player unless --new-instance was given."""
+    args = parse_handoff_arguments(argv)
+    if args.new_instance:
+        return False
+    return hand_off(args.video or args.path, args.croqui)
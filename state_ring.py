@@ -0,0 +1,149 @@
+"""
+Shared-memory state ring for PPL Player.
+A single-writer ring buffer of fixed-size records (telemetry samples) in
+a named shared memory block, so local readers can poll the playback state
+without a socket round trip.
+"""
+
+import struct
+import sys
+
+from multiprocessing import shared_memory
+
+from config import IPC_LOCAL_NAME, MEDIA_PORT, STATE_RING_SLOTS
+
+MAGIC = 0x50504C52  # "PPLR"
+RING_VERSION = 1
+
+# magic, versão, tamanho do registro, número de slots, (alinhamento), último seq escrito
+_HEADER = struct.Struct("<IHHI4xQ")
+_WRITE_SEQ_OFFSET = 16
+_SEQ = struct.Struct("<Q")
+
+
+def ring_name(port=MEDIA_PORT) -> str:
+    return f"{IPC_LOCAL_NAME}-state-{port}"
+
+
+class StateRing:
+    """Seqlock ring buffer in shared memory.
+
+    The writer stores the record, then its sequence number in the slot,
+    then the global write sequence. Readers copy a slot and accept it only
+    if the slot sequence is the same before and after the copy, so a
+    record being overwritten is never returned half-written. Readers never
+    block the writer; one that falls more than ``slots`` records behind
+    simply skips to the oldest record still in the ring.
+    """
+
+    def __init__(self, shm, record_size, slots, owner):
+        self.shm = shm
+        self.buf = shm.buf
+        self.record_size = record_size
+        self.slots = slots
+        self.stride = _SEQ.size + ((record_size + 7) & ~7)
+        self.owner = owner
+        self.write_seq = _SEQ.unpack_from(self.buf, _WRITE_SEQ_OFFSET)[0]
+
+    @classmethod
+    def create(cls, record_size, slots=STATE_RING_SLOTS, name=None):
+        """Create the ring (writer side), replacing a stale one left by a crash."""
+        name = name or ring_name()
+        stride = _SEQ.size + ((record_size + 7) & ~7)
+        size = _HEADER.size + slots * stride
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        _HEADER.pack_into(shm.buf, 0, MAGIC, RING_VERSION, record_size, slots, 0)
+        return cls(shm, record_size, slots, owner=True)
+
+    @classmethod
+    def attach(cls, name=None, track=False):
+        """
+        Open an existing ring (reader side).
+
+        ``track=True`` keeps the block registered with this process's
+        resource tracker; only needed for children that share the tracker
+        of the process that created the ring.
+
+        Raises:
+            FileNotFoundError: If the player is not publishing the ring
+            ValueError: If the block is not a compatible ring
+        """
+        shm = _open(name or ring_name(), track)
+        magic, version, record_size, slots, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != RING_VERSION:
+            shm.close()
+            raise ValueError("bloco de memória compartilhada incompatível")
+        return cls(shm, record_size, slots, owner=False)
+
+    # Escrita (processo do player)
+
+    def write(self, record: bytes):
+        seq = self.write_seq + 1
+        offset = _HEADER.size + (seq % self.slots) * self.stride
+        _SEQ.pack_into(self.buf, offset, 0)
+        self.buf[offset + _SEQ.size:offset + _SEQ.size + self.record_size] = record
+        _SEQ.pack_into(self.buf, offset, seq)
+        _SEQ.pack_into(self.buf, _WRITE_SEQ_OFFSET, seq)
+        self.write_seq = seq
+
+    # Leitura (processos clientes)
+
+    def last_seq(self) -> int:
+        return _SEQ.unpack_from(self.buf, _WRITE_SEQ_OFFSET)[0]
+
+    def _read_slot(self, seq):
+        offset = _HEADER.size + (seq % self.slots) * self.stride
+        if _SEQ.unpack_from(self.buf, offset)[0] != seq:
+            return None
+        record = bytes(self.buf[offset + _SEQ.size:offset + _SEQ.size + self.record_size])
+        if _SEQ.unpack_from(self.buf, offset)[0] != seq:
+            return None
+        return record
+
+    def read_latest(self, retries=3):
+        """Return ``(seq, record)`` of the newest record, or None."""
+        for _ in range(retries):
+            seq = self.last_seq()
+            if seq == 0:
+                return None
+            record = self._read_slot(seq)
+            if record is not None:
+                return seq, record
+        return None
+
+    def read_since(self, last_seq):
+        """Return the ``(seq, record)`` pairs written after ``last_seq``."""
+        newest = self.last_seq()
+        records = []
+        for seq in range(max(last_seq + 1, newest - self.slots + 1, 1), newest + 1):
+            record = self._read_slot(seq)
+            if record is not None:
+                records.append((seq, record))
+        return records
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _open(name, track):
+    """Attach to a block; untracked blocks are not removed when this process exits."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=track)
+    shm = shared_memory.SharedMemory(name=name)
+    if not track and sys.platform != "win32":
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
@@ -0,0 +1,90 @@
+"""
+Playback telemetry for PPL Player.
+Samples position, speed and play/pause state on the GUI thread and hands
+it to the pub/sub hub, which pushes it to subscribed counter apps.
+"""
+
+import time
+
+from PySide6.QtCore import QObject, QTimer, Qt
+
+import ipc_protocol as proto
+from config import TELEMETRY_IDLE_INTERVAL, TELEMETRY_SAMPLE_INTERVAL, TELEMETRY_SEEK_TOLERANCE
+
+
+class TelemetrySampler(QObject):
+    """Samples the player on the GUI thread while anyone is subscribed.
+
+    With a ``state_ring`` every sample is also written to shared memory,
+    where local readers poll it without any socket traffic.
+
+    The fast ``interval`` is only used while the video is playing and
+    someone can consume the samples; paused, stopped or unobserved, the
+    timer drops to ``idle_interval``.
+    """
+
+    def __init__(self, player, hub, interval=TELEMETRY_SAMPLE_INTERVAL, state_ring=None,
+                 idle_interval=TELEMETRY_IDLE_INTERVAL):
+        super().__init__(player)
+        self.player = player
+        self.hub = hub
+        self.state_ring = state_ring
+        self.interval = interval
+        self.idle_interval = max(interval, idle_interval)
+        self.seq = 0
+        self._last_key = None
+        self._last_captured_us = None
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.sample)
+        self.timer.start()
+
+    def sample(self):
+        if self.player.is_closing:
+            return
+        if self.state_ring is None and not self.hub.has_subscribers():
+            self._set_interval(self.idle_interval)
+            return
+        mediaplayer = self.player.mediaplayer
+        captured_us = time.perf_counter_ns() // 1000
+        key = (
+            self.player.current_video_index,
+            mediaplayer.get_time(),
+            mediaplayer.get_length(),
+            float(self.player.speed_factor),
+            bool(mediaplayer.is_playing()),
+        )
+        self._set_interval(self.interval if key[4] else self.idle_interval)
+        if key == self._last_key:
+            return
+
+        previous = self._last_key
+        # Mudanças discretas vão na hora (TOPIC_STATE); o avanço normal segue a taxa do assinante
+        state_changed = (
+            previous is None
+            or key[0] != previous[0]
+            or key[3:] != previous[3:]
+            or not key[4]
+            or self._is_seek(previous, key, captured_us)
+        )
+        self._last_key = key
+        self._last_captured_us = captured_us
+        self.seq += 1
+        sample = proto.Telemetry(self.seq, captured_us, *key)
+        if self.state_ring is not None:
+            self.state_ring.write(sample.pack())
+        self.hub.publish_position(sample, state_changed)
+
+    def _is_seek(self, previous, key, captured_us):
+        """True when the position jumped further than playback alone could move it."""
+        if previous[1] < 0 or key[1] < 0:
+            return False
+        elapsed_ms = (captured_us - self._last_captured_us) / 1000
+        expected = elapsed_ms * key[3]
+        return abs((key[1] - previous[1]) - expected) > TELEMETRY_SEEK_TOLERANCE
+
+    def _set_interval(self, interval):
+        if self.timer.interval() != interval:
+            self.timer.setInterval(interval)
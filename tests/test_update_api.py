@@ -0,0 +1,168 @@
+"""
+Tests for the update API's publishing path (api/api.py) with the Flask
+test client, each in its own temporary working directory.
+Run with ``python -m pytest tests`` or ``python -m unittest discover tests``.
+"""
+
+import hashlib
+import importlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api")
+
+
+def make_package(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for name, content in files.items():
+            zipf.writestr(name, content)
+    return buffer.getvalue()
+
+
+class UpdateApiTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # api.py cria as pastas relativas à pasta atual ao ser importado
+        cls.cwd = os.getcwd()
+        cls.import_dir = tempfile.TemporaryDirectory()
+        os.chdir(cls.import_dir.name)
+        sys.path.insert(0, API_DIR)
+        try:
+            cls.api = importlib.import_module("api")
+        finally:
+            sys.path.remove(API_DIR)
+            os.chdir(cls.cwd)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.import_dir.cleanup()
+
+    def setUp(self):
+        api = self.api
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        os.makedirs(api.MANIFEST_DIR)
+        os.makedirs(api.DELTA_DIR)
+
+        patches = [
+            mock.patch.object(api, "version_cache", api.VersionCache(api.VERSION_FILE)),
+            mock.patch.dict(api._package_info, clear=True),
+            mock.patch.dict(api._manifests, clear=True),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client = api.app.test_client()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def upload(self, filename, data, changelog=None):
+        params = {"filename": filename}
+        if changelog:
+            params["changelog"] = changelog
+        return self.client.post("/api/upload", query_string=params, data=data, content_type="application/zip")
+
+    def leftovers(self):
+        return [
+            name for root, _, files in os.walk(self.api.UPDATE_FILES_DIR)
+            for name in files if name.endswith((".upload", ".tmp"))
+        ]
+
+    def test_raw_upload_is_hashed_and_published(self):
+        data = make_package({"app.exe": b"nova versao", "_internal/lib.pyd": os.urandom(4096)})
+
+        response = self.upload("update_v3.10.zip", data, changelog="correções")
+
+        self.assertEqual(response.status_code, 200, response.get_json())
+        body = response.get_json()
+        self.assertEqual(body["version"], "3.10")
+        self.assertEqual(body["sha256"], hashlib.sha256(data).hexdigest())
+        self.assertEqual(body["size"], len(data))
+        with open(self.api.package_path("3.10"), "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(self.client.get("/api/version").get_json()["version"], "3.10")
+        self.assertEqual(self.leftovers(), [])
+
+    def test_multipart_upload(self):
+        data = make_package({"app.exe": b"multipart"})
+
+        response = self.client.post(
+            "/api/upload",
+            data={"file": (io.BytesIO(data), "update_v4.2.1.zip"), "changelog": "via formulário"},
+            content_type="multipart/form-data",
+        )
+
+        self.assertEqual(response.status_code, 200, response.get_json())
+        self.assertEqual(response.get_json()["version"], "4.2.1")
+        self.assertEqual(response.get_json()["sha256"], hashlib.sha256(data).hexdigest())
+        self.assertEqual(self.leftovers(), [])
+
+    def test_bad_packages_are_rejected(self):
+        self.upload("update_v1.0.zip", make_package({"app.exe": b"ok"}))
+        bad = {
+            "update_v2.0.zip": b"isto nao e um zip",
+            "update_v2.1.zip": make_package({"../fora.exe": b"x"}),
+        }
+        for filename, data in bad.items():
+            with self.subTest(filename=filename):
+                response = self.upload(filename, data)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(os.path.exists(self.api.package_path(filename[8:-4])))
+        self.assertEqual(self.upload("sem_versao.zip", make_package({"a": b"a"})).status_code, 400)
+
+        self.assertEqual(self.client.get("/api/version").get_json()["version"], "1.0")
+        self.assertEqual(self.leftovers(), [])
+
+    def test_download_serves_the_published_package(self):
+        first = make_package({"app.exe": b"primeira"})
+        second = make_package({"app.exe": b"segunda"})
+        self.upload("update_v5.0.zip", first)
+        self.upload("update_v5.0.zip", second)
+
+        response = self.client.get("/api/download")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, second)
+        self.assertEqual(response.headers["X-Content-SHA256"], hashlib.sha256(second).hexdigest())
+        update = self.client.get("/api/update").get_json()
+        self.assertEqual(update["sha256"], hashlib.sha256(second).hexdigest())
+        self.assertEqual(self.leftovers(), [])
+
+    def test_keeps_only_recent_versions(self):
+        versions = ["3.7", "3.8", "3.9", "3.10", "3.11", "3.12"]
+        for version in versions:
+            self.assertEqual(self.upload(f"update_v{version}.zip", make_package({"app.exe": version})).status_code, 200)
+
+        kept = versions[-1 - self.api.KEEP_VERSIONS:]
+        for version in versions:
+            exists = version in kept
+            self.assertEqual(os.path.exists(self.api.package_path(version)), exists, version)
+            self.assertEqual(os.path.exists(self.api.manifest_path(version)), exists, version)
+
+    def test_republish_purges_deltas(self):
+        self.upload("update_v6.0.zip", make_package({"app.exe": b"um", "dados.bin": b"d"}))
+        delta = self.client.post("/api/delta", json={"version": "6.0", "files": ["app.exe"]}).get_json()
+        old_name = delta["url"].rsplit("/", 1)[1]
+        self.assertTrue(os.path.exists(os.path.join(self.api.DELTA_DIR, old_name)))
+
+        self.upload("update_v6.0.zip", make_package({"app.exe": b"dois", "dados.bin": b"d"}))
+
+        self.assertEqual(os.listdir(self.api.DELTA_DIR), [])
+        delta = self.client.post("/api/delta", json={"version": "6.0", "files": ["app.exe"]}).get_json()
+        self.assertNotEqual(delta["url"].rsplit("/", 1)[1], old_name)
+        response = self.client.get(delta["url"])
+        with zipfile.ZipFile(io.BytesIO(response.data)) as zipf:
+            self.assertEqual(zipf.read("app.exe"), b"dois")
+        self.assertEqual(response.headers["X-Content-SHA256"], delta["sha256"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Tests for update_check: version comparison and the cached, conditional,
+backed-off version query against a local HTTP server.
+Run with ``python -m pytest tests`` or ``python -m unittest discover tests``.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import update_check  # noqa: E402
+from config import UPDATE_CHECK_BACKOFF, UPDATE_CHECK_INTERVAL  # noqa: E402
+
+
+class VersionComparisonTest(unittest.TestCase):
+    def test_parse_version(self):
+        self.assertEqual(update_check.parse_version("v3.10.1"), (3, 10, 1))
+        self.assertEqual(update_check.parse_version("4.0"), (4,))
+        self.assertEqual(update_check.parse_version(4.0), (4,))
+        self.assertEqual(update_check.parse_version("3.2-beta1"), (3, 2))
+        self.assertIsNone(update_check.parse_version("sem versão"))
+        self.assertIsNone(update_check.parse_version(None))
+
+    def test_is_newer(self):
+        self.assertTrue(update_check.is_newer("3.10", "3.9"))
+        self.assertFalse(update_check.is_newer("3.9", "3.10"))
+        self.assertTrue(update_check.is_newer("3.10.1", "3.10"))
+        self.assertFalse(update_check.is_newer("4.0", "4"))
+        self.assertFalse(update_check.is_newer("3.10", "3.10"))
+        self.assertTrue(update_check.is_newer("4", None))
+        self.assertFalse(update_check.is_newer(None, "3.9"))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.headers.get("If-None-Match"))
+        if server.status != 200:
+            self.send_response(server.status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = f'"{server.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = json.dumps({"version": server.version}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class VersionCheckerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.version = "3.10"
+        self.server.status = 200
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.api_base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, "version_check.json")
+
+        # Relógio controlado pelo teste
+        self.now = 1_000_000.0
+        patch = mock.patch.object(update_check.time, "time", lambda: self.now)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.stop_server()
+        self.tmp.cleanup()
+
+    def stop_server(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def checker(self):
+        return update_check.VersionChecker(self.api_base, self.cache_path)
+
+    def test_cached_until_interval_then_conditional(self):
+        checker = self.checker()
+        self.assertEqual(checker.remote_version(), "3.10")
+        self.assertEqual(self.server.requests, [None])
+
+        # Dentro do intervalo: responde do cache, também numa nova execução
+        self.now += UPDATE_CHECK_INTERVAL - 1
+        self.assertEqual(self.checker().remote_version(), "3.10")
+        self.assertEqual(len(self.server.requests), 1)
+
+        # Depois do intervalo: pergunta com If-None-Match e reaproveita o 304
+        self.now += 2
+        self.assertEqual(self.checker().remote_version(), "3.10")
+        self.assertEqual(self.server.requests[1], '"3.10"')
+
+        self.server.version = "3.11"
+        self.assertEqual(self.checker().remote_version(force=True), "3.11")
+        self.assertEqual(self.server.requests[2], '"3.10"')
+
+    def test_backoff_while_api_fails(self):
+        checker = self.checker()
+        checker.remote_version()
+        self.server.status = 500
+        first, longest = UPDATE_CHECK_BACKOFF
+
+        delays = []
+        for _ in range(12):
+            self.now = checker.state["next_check"]
+            before = self.now
+            self.assertEqual(checker.remote_version(), "3.10")  # última versão conhecida
+            delays.append(checker.state["next_check"] - before)
+        self.assertEqual(delays[:3], [first, first * 2, first * 4])
+        self.assertEqual(delays[-1], longest)
+
+        # Antes de vencer a espera nenhuma requisição é feita
+        count = len(self.server.requests)
+        self.now = checker.state["next_check"] - 1
+        checker.remote_version()
+        self.assertEqual(len(self.server.requests), count)
+
+        # Recuperação zera as falhas e volta ao intervalo normal
+        self.server.status = 200
+        self.now = checker.state["next_check"]
+        self.assertEqual(checker.remote_version(), "3.10")
+        self.assertEqual(checker.state["failures"], 0)
+        self.assertEqual(checker.state["next_check"], self.now + UPDATE_CHECK_INTERVAL)
+
+    def test_unreachable_api_without_cache(self):
+        self.stop_server()
+        checker = self.checker()
+        self.assertIsNone(checker.remote_version())
+        self.assertEqual(checker.state["failures"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Tests for update_download against a local HTTP server.
+Run with ``python -m pytest tests`` or ``python -m unittest discover tests``.
+"""
+
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import update_download  # noqa: E402
+
+PAYLOAD = os.urandom(64 * 1024 + 123)
+ETAG = '"pacote-v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD with Range/If-Range support driven by the server's flags."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.ranges.append(self.headers.get("Range"))
+        start, end = 0, len(server.payload) - 1
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if_range = self.headers.get("If-Range")
+        partial = server.accept_ranges and match and (if_range is None or if_range == ETAG)
+        if partial:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(server.payload)}")
+            self.send_header("Accept-Ranges", "bytes")
+        else:
+            self.send_response(200)
+        body = server.payload[start:end + 1]
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        if server.sha256:
+            self.send_header(update_download.SHA256_HEADER, server.sha256)
+        self.end_headers()
+
+        with server.lock:
+            drop = len(body) > 1 and server.drops > 0
+            if drop:
+                server.drops -= 1
+        if drop:
+            # Conexão cai no meio da resposta
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UpdateDownloadTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.lock = threading.Lock()
+        self.server.payload = PAYLOAD
+        self.server.sha256 = hashlib.sha256(PAYLOAD).hexdigest()
+        self.server.accept_ranges = True
+        self.server.drops = 0
+        self.server.ranges = []
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/update.zip"
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "update.zip")
+
+        # Faixas pequenas e sem espera entre tentativas para o teste ser rápido
+        patches = [
+            mock.patch.object(update_download, "UPDATE_DOWNLOAD_MIN_SEGMENT", 8 * 1024),
+            mock.patch.object(update_download, "UPDATE_DOWNLOAD_CHUNK", 4 * 1024),
+            mock.patch.object(update_download.time, "sleep", lambda seconds: None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def _data_ranges(self):
+        return [r for r in self.server.ranges if r != "bytes=0-0"]
+
+    def _read_dest(self):
+        with open(self.dest, "rb") as f:
+            return f.read()
+
+    def test_segmented_range_fetches(self):
+        digest = update_download.download_file(self.url, self.dest, segments=4)
+
+        self.assertEqual(digest, self.server.sha256)
+        self.assertEqual(self._read_dest(), PAYLOAD)
+        ranges = self._data_ranges()
+        self.assertEqual(len(ranges), 4)
+        self.assertTrue(all(r.startswith("bytes=") for r in ranges))
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+        self.assertFalse(os.path.exists(self.dest + ".part.json"))
+
+    def test_retry_resumes_dropped_range(self):
+        self.server.drops = 1
+
+        update_download.download_file(self.url, self.dest, segments=1)
+
+        self.assertEqual(self._read_dest(), PAYLOAD)
+        first, retry = self._data_ranges()
+        self.assertEqual(first, f"bytes=0-{len(PAYLOAD) - 1}")
+        # A nova requisição começa depois dos bytes já gravados
+        self.assertNotEqual(retry, first)
+        self.assertTrue(retry.startswith("bytes=") and not retry.startswith("bytes=0-"))
+
+    def test_resume_after_failed_attempt(self):
+        self.server.drops = 1
+        with mock.patch.object(update_download, "UPDATE_DOWNLOAD_RETRIES", 0):
+            with self.assertRaises(update_download.DownloadError):
+                update_download.download_file(self.url, self.dest, segments=1)
+        self.assertTrue(os.path.exists(self.dest + ".part.json"))
+        self.server.ranges.clear()
+
+        update_download.download_file(self.url, self.dest, segments=1)
+
+        self.assertEqual(self._read_dest(), PAYLOAD)
+        (resumed,) = self._data_ranges()
+        self.assertFalse(resumed.startswith("bytes=0-"))
+
+    def test_sha256_mismatch(self):
+        with self.assertRaises(update_download.DownloadError):
+            update_download.download_file(self.url, self.dest, sha256="0" * 64)
+
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+        self.assertFalse(os.path.exists(self.dest + ".part.json"))
+
+    def test_server_without_range_support(self):
+        self.server.accept_ranges = False
+
+        digest = update_download.download_file(self.url, self.dest, segments=4)
+
+        self.assertEqual(digest, self.server.sha256)
+        self.assertEqual(self._read_dest(), PAYLOAD)
+        self.assertEqual(self._data_ranges(), [None])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Timeline slider for PPL Player.
+Position slider that draws the density of recorded counts along the
+video and shows the totals of the interval under the mouse.
+"""
+
+from PySide6.QtWidgets import QSlider, QStyle, QStyleOptionSlider, QToolTip
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QPainter, QColor
+
+from config import COUNT_DENSITY_COLOR, COUNT_INTERVAL_MINUTES
+from utils import format_time
+
+
+class TimelineSlider(QSlider):
+    """Horizontal QSlider with a count-density overlay.
+
+    The histogram has one bin per pixel of the groove and is only
+    recomputed when the store, the range or the width changes, so
+    repainting while playing costs nothing extra.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(Qt.Horizontal, parent)
+        self.count_store = None
+        self._density = []
+        self._density_key = None
+        self.setMouseTracking(True)
+
+    def set_count_store(self, store):
+        """Show the counts of ``store`` (None hides the overlay)."""
+        self.count_store = store
+        self._density_key = None
+        self.update()
+
+    def _groove_span(self):
+        """Pixel span (left, width) covered by the handle centre."""
+        option = QStyleOptionSlider()
+        self.initStyleOption(option)
+        groove = self.style().subControlRect(QStyle.CC_Slider, option, QStyle.SC_SliderGroove, self)
+        handle = self.style().subControlRect(QStyle.CC_Slider, option, QStyle.SC_SliderHandle, self)
+        return groove.left() + handle.width() / 2, max(1, groove.width() - handle.width())
+
+    def _update_density(self, bins):
+        store = self.count_store
+        key = (store.version, bins, self.minimum(), self.maximum())
+        if key != self._density_key:
+            self._density = store.histogram(self.minimum(), self.maximum(), bins)
+            self._density_key = key
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.count_store is None or not len(self.count_store) or self.maximum() <= self.minimum():
+            return
+
+        left, width = self._groove_span()
+        self._update_density(int(width))
+        peak = max(self._density, default=0)
+        if not peak:
+            return
+
+        painter = QPainter(self)
+        color = QColor(COUNT_DENSITY_COLOR)
+        color.setAlpha(170)
+        bottom = self.height() - 1
+        max_height = self.height() * 0.45
+        for x, count in enumerate(self._density):
+            if count:
+                height = max(1.0, max_height * count / peak)
+                painter.fillRect(QRectF(left + x, bottom - height, 1, height), color)
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        if self.count_store is None or not len(self.count_store) or self.maximum() <= self.minimum():
+            return
+
+        left, width = self._groove_span()
+        ratio = min(1.0, max(0.0, (event.position().x() - left) / width))
+        time_ms = self.minimum() + ratio * (self.maximum() - self.minimum())
+
+        # Intervalo padrão de contagem (ex.: 15 min) que contém o ponto
+        interval_ms = COUNT_INTERVAL_MINUTES * 60 * 1000
+        start = int(time_ms // interval_ms) * interval_ms
+        end = start + interval_ms
+        totals = self.count_store.interval_totals(start, end)
+
+        lines = [f"{format_time(start)} – {format_time(end)}: {sum(totals.values())} contagens"]
+        for (category, movement), count in sorted(totals.items()):
+            lines.append(f"Categoria {category} / Movimento {movement}: {count}")
+        QToolTip.showText(event.globalPosition().toPoint(), "\n".join(lines), self)
@@ -11,22 +11,21 @@ from PySide6.QtCore import Qt
 from PySide6.QtGui import QIcon
 import os
 from typing import Tuple
+from video_surface import VideoSurface
+from timeline_slider import TimelineSlider
 from config import (
     ICON_PATH,
-    MINIMUM_VIDEO_HEIGHT,
     TIMER_DEFAULT_TEXT,
     TIMER_FONT_SIZE
 )
 
 
-def create_video_frame() -> QFrame:
-    """Creates and configures the video frame."""
-    videoframe = QFrame()
-    videoframe.setMinimumHeight(MINIMUM_VIDEO_HEIGHT)
-    return videoframe
+def create_video_frame() -> VideoSurface:
+    """Creates the surface where decoded video frames are painted."""
+    return VideoSurface()
 
 
-def create_header_buttons(player) -> Tuple[QPushButton, QPushButton, QPushButton, QPushButton, QPushButton]:
+def create_header_buttons(player) -> Tuple[QPushButton, QPushButton, QPushButton, QPushButton, QPushButton, QPushButton]:
     """Creates all header buttons with their icons and connections."""
     
     # File operations button
@@ -35,6 +34,12 @@ def create_header_buttons(player) -> Tuple[QPushButton, QPushButton, QPushButton
     open_button.clicked.connect(player.open_file_dialog)
     open_button.setFocusPolicy(Qt.NoFocus)
 
+    # Folder ingestion button
+    folder_button = QPushButton(" Abrir Pasta")
+    folder_button.setIcon(QIcon(os.path.join(ICON_PATH, "file.png")))
+    folder_button.clicked.connect(player.open_folder_dialog)
+    folder_button.setFocusPolicy(Qt.NoFocus)
+
     # Playlist button
     playlist_button = QPushButton(" Playlist")
     playlist_button.setIcon(QIcon(os.path.join(ICON_PATH, "playlist.png")))
@@ -59,7 +64,7 @@ def create_header_buttons(player) -> Tuple[QPushButton, QPushButton, QPushButton
     paint_button.clicked.connect(player.open_croqui_modal)
     paint_button.setFocusPolicy(Qt.NoFocus)
 
-    return open_button, playlist_button, settings_button, zoom_button, paint_button
+    return open_button, folder_button, playlist_button, settings_button, zoom_button, paint_button
 
 
 def create_control_buttons(player) -> Tuple[QPushButton, QPushButton, QPushButton, QPushButton]:
@@ -92,11 +97,11 @@ def create_control_buttons(player) -> Tuple[QPushButton, QPushButton, QPushButto
     return play_button, rewind_button, skip_button, speed_button
 
 
-def create_media_controls(player) -> Tuple[QSlider, QLabel]:
+def create_media_controls(player) -> Tuple[TimelineSlider, QLabel]:
     """Creates media control elements (slider and timer)."""
     
-    # Position slider
-    position_slider = QSlider(Qt.Horizontal)
+    # Position slider (com a densidade de contagens do vídeo)
+    position_slider = TimelineSlider()
     position_slider.sliderMoved.connect(player.set_position)
     position_slider.setFocusPolicy(Qt.NoFocus)
 
@@ -120,7 +125,7 @@ def create_layouts(
 ) -> Tuple[QHBoxLayout, QHBoxLayout, QVBoxLayout]:
     """Creates and organizes all layouts."""
     
-    open_button, playlist_button, settings_button, zoom_button, paint_button = header_buttons
+    open_button, folder_button, playlist_button, settings_button, zoom_button, paint_button = header_buttons
     play_button, rewind_button, skip_button, speed_button = control_buttons
     
     # Controls layout (bottom controls)
@@ -136,6 +141,7 @@ def create_layouts(
     header_layout = QHBoxLayout()
     header_layout.setAlignment(Qt.AlignLeft)
     header_layout.addWidget(open_button)
+    header_layout.addWidget(folder_button)
     header_layout.addWidget(playlist_button)
     header_layout.addWidget(settings_button)
     header_layout.addWidget(zoom_button)
@@ -181,7 +187,7 @@ def create_ui(player):
         player.setCentralWidget(widget)
         
         # Unpack elements for return
-        open_button, playlist_button, settings_button, zoom_button, paint_button = header_buttons
+        open_button, folder_button, playlist_button, settings_button, zoom_button, paint_button = header_buttons
         play_button, rewind_button, skip_button, speed_button = control_buttons
         
         return (
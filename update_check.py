@@ -0,0 +1,116 @@
+"""
+Version check for PPL Player updates.
+Caches the last answer of the update API with its ETag, asks again at
+most every UPDATE_CHECK_INTERVAL (conditionally, so an unchanged version
+costs a 304), backs off exponentially while the API is unreachable and
+compares versions component by component ("3.10" > "3.9").
+"""
+
+import json
+import os
+import re
+import time
+
+from config import UPDATE_CHECK_INTERVAL, UPDATE_CHECK_BACKOFF, UPDATE_CHECK_TIMEOUT
+
+
+def parse_version(version):
+    """
+    Numeric components of ``version``: "v3.10.1" -> (3, 10, 1).
+
+    Trailing zeros are dropped so "4", "4.0" and 4.0 compare equal.
+    Returns None when there is no number at all.
+    """
+    if version is None:
+        return None
+    parts = [int(part) for part in re.findall(r"\d+", str(version).split("-")[0].split("+")[0])]
+    while len(parts) > 1 and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts) or None
+
+
+def is_newer(remote, local) -> bool:
+    """True when ``remote`` is a later version than ``local``."""
+    remote_parts = parse_version(remote)
+    local_parts = parse_version(local)
+    if remote_parts is None:
+        return False
+    if local_parts is None:
+        return True
+    return remote_parts > local_parts
+
+
+class VersionChecker:
+    """Conditional, rate-limited client for ``{api_base}/api/version``.
+
+    State (last version, ETag, time of the last attempt, consecutive
+    failures) lives in a small JSON file, so the limits also hold across
+    launches: while the interval or the backoff has not elapsed,
+    ``remote_version()`` answers from the cache without opening a socket.
+    """
+
+    def __init__(self, api_base, cache_path):
+        self.url = f"{api_base}/api/version"
+        self.cache_path = cache_path
+        self.state = self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("url") == self.url:
+                return state
+        except (OSError, ValueError):
+            pass
+        return {"url": self.url, "version": None, "etag": None, "next_check": 0, "failures": 0}
+
+    def _save(self):
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"[UPDATE] Não foi possível salvar o cache de versão: {e}")
+
+    def remote_version(self, force=False):
+        """
+        Latest version known for the API, asking it only when due.
+
+        Returns:
+            str | None: Version string, or None if it was never obtained
+        """
+        now = time.time()
+        if not force and now < self.state["next_check"]:
+            return self.state["version"]
+
+        import requests
+
+        headers = {}
+        if self.state["etag"] and self.state["version"] is not None:
+            headers["If-None-Match"] = self.state["etag"]
+        try:
+            response = requests.get(self.url, headers=headers, timeout=UPDATE_CHECK_TIMEOUT)
+            if response.status_code == 304:
+                pass  # versão inalterada; nenhum corpo trafegou
+            elif response.status_code == 200:
+                version = response.json().get("version")
+                if version is None:
+                    raise ValueError("versão não encontrada na resposta da API")
+                self.state["version"] = str(version)
+                self.state["etag"] = response.headers.get("ETag")
+            else:
+                raise ValueError(f"HTTP {response.status_code}")
+        except (requests.RequestException, ValueError) as e:
+            self.state["failures"] += 1
+            first, longest = UPDATE_CHECK_BACKOFF
+            delay = min(longest, first * 2 ** (self.state["failures"] - 1))
+            self.state["next_check"] = now + delay
+            self._save()
+            print(f"[UPDATE] Falha ao consultar versão ({e}); nova tentativa em {delay // 60:.0f} min")
+            return self.state["version"]
+
+        self.state["failures"] = 0
+        self.state["next_check"] = now + UPDATE_CHECK_INTERVAL
+        self._save()
+        return self.state["version"]
@@ -0,0 +1,112 @@
+"""
+Delta updates for PPL Player.
+Compares the content-hash manifest of the new version with the files of
+the local install and asks the update API for a package holding only the
+files that changed, so a release that touches a few modules costs a few
+hundred KB instead of the whole app.
+"""
+
+import json
+import os
+
+from config import UPDATE_DELTA_MAX_RATIO, UPDATE_DOWNLOAD_TIMEOUT
+from update_download import file_sha256
+
+# Não fica na instalação (se apaga após instalar); a API o inclui em todo pacote
+UPDATER_NAME = "updater.exe"
+
+
+def local_file_hashes(app_dir, paths, cache_path):
+    """
+    SHA-256 of ``paths`` (relative to ``app_dir``); None for missing files.
+
+    Hashes are cached by size and mtime in ``cache_path``, so only files
+    touched since the last check are read again.
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    hashes = {}
+    updated = {}
+    for path in paths:
+        full_path = os.path.join(app_dir, *path.split("/"))
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            hashes[path] = None
+            continue
+        cached = cache.get(path)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            sha256 = cached["sha256"]
+        else:
+            sha256 = file_sha256(full_path)
+        hashes[path] = sha256
+        updated[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(updated, f)
+    except OSError as e:
+        print(f"[UPDATE] Não foi possível salvar o cache de hashes: {e}")
+    return hashes
+
+
+def plan_delta(manifest, app_dir, cache_path):
+    """
+    Files of ``manifest`` that are missing or different in ``app_dir``.
+
+    Returns:
+        tuple: (list of relative paths, total uncompressed bytes)
+    """
+    files = {path: info for path, info in manifest["files"].items() if path != UPDATER_NAME}
+    local = local_file_hashes(app_dir, list(files), cache_path)
+    changed = sorted(path for path, info in files.items() if local.get(path) != info["sha256"])
+    return changed, sum(files[path]["size"] for path in changed)
+
+
+def prepare_update_package(api_base, app_dir, cache_path, session=None):
+    """
+    Ask the API for a delta package for this install.
+
+    Returns:
+        dict: ``{"url", "sha256", "size", "files", "delta": True}`` to
+        download, or None when the full package should be used instead
+        (API without manifests, nothing gained, or any error)
+    """
+    import requests
+
+    session = session or requests.Session()
+    try:
+        response = session.get(f"{api_base}/api/manifest", timeout=UPDATE_DOWNLOAD_TIMEOUT)
+        if response.status_code != 200:
+            return None
+        manifest = response.json()
+
+        changed, changed_size = plan_delta(manifest, app_dir, cache_path)
+        full_size = sum(info["size"] for info in manifest["files"].values())
+        print(f"[UPDATE] {len(changed)} de {len(manifest['files'])} arquivos mudaram ({changed_size / 1e6:.1f} MB)")
+        if not changed:
+            return None
+        if full_size and changed_size > full_size * UPDATE_DELTA_MAX_RATIO:
+            # Quase tudo mudou: o pacote completo sai mais barato
+            return None
+
+        response = session.post(
+            f"{api_base}/api/delta",
+            json={"version": manifest["version"], "files": changed},
+            timeout=UPDATE_DOWNLOAD_TIMEOUT,
+        )
+        if response.status_code != 200:
+            print(f"[UPDATE] API recusou o pacote parcial: HTTP {response.status_code}")
+            return None
+        package = response.json()
+        package["url"] = f"{api_base}{package['url']}"
+        package["delta"] = True
+        return package
+    except (requests.RequestException, ValueError, KeyError, OSError) as e:
+        print(f"[UPDATE] Delta indisponível, usando pacote completo: {e}")
+        return None
+
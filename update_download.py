@@ -0,0 +1,271 @@
+"""
+Resumable update download for PPL Player.
+Streams the update package to disk in chunks, optionally over several
+parallel HTTP Range requests, keeps enough state next to the partial file
+to resume after a dropped connection or a restart, and verifies the
+SHA-256 before the file is handed to extraction.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    UPDATE_DOWNLOAD_SEGMENTS,
+    UPDATE_DOWNLOAD_MIN_SEGMENT,
+    UPDATE_DOWNLOAD_CHUNK,
+    UPDATE_DOWNLOAD_RETRIES,
+    UPDATE_DOWNLOAD_TIMEOUT,
+)
+
+# Cabeçalho com o SHA-256 (hex) do arquivo, enviado pela API de atualizações
+SHA256_HEADER = "X-Content-SHA256"
+PROGRESS_INTERVAL = 0.2  # segundos entre chamadas de progresso
+
+
+class DownloadError(Exception):
+    """Raised when the package cannot be downloaded or fails verification."""
+
+
+class _ChangedOnServer(DownloadError):
+    """The file was replaced on the server while it was being downloaded."""
+
+
+class _Progress:
+    """Byte counter shared by the segment threads, reported at most every PROGRESS_INTERVAL."""
+
+    def __init__(self, callback, done, total):
+        self.callback = callback
+        self.done = done
+        self.total = total
+        self.lock = threading.Lock()
+        self.last_report = 0.0
+
+    def add(self, size, force=False):
+        with self.lock:
+            self.done += size
+            now = time.monotonic()
+            if self.callback and (force or now - self.last_report >= PROGRESS_INTERVAL):
+                self.last_report = now
+                self.callback(self.done, self.total)
+
+
+def download_file(url, dest_path, progress=None, sha256=None, segments=UPDATE_DOWNLOAD_SEGMENTS, session=None):
+    """
+    Download ``url`` to ``dest_path``, resuming a previous partial download.
+
+    Args:
+        progress: ``callback(done_bytes, total_bytes)``; total is None when
+            the server does not send a size
+        sha256: Expected hex digest; defaults to the server's
+            X-Content-SHA256 header
+        segments: Parallel Range requests when the server supports them
+
+    Returns:
+        str: SHA-256 (hex) of the downloaded file
+
+    Raises:
+        DownloadError: On HTTP errors, exhausted retries or checksum mismatch
+    """
+    import requests
+
+    session = session or requests.Session()
+    part_path = dest_path + ".part"
+    state_path = part_path + ".json"
+
+    for attempt in range(2):
+        try:
+            total, etag, accepts_ranges, server_sha256 = _probe(session, url)
+            expected = (sha256 or server_sha256 or "").lower() or None
+
+            if accepts_ranges and total:
+                state = _load_state(state_path, url, etag, total, part_path)
+                if state is None:
+                    state = _new_state(url, etag, total, segments, part_path)
+                _download_segments(session, url, etag, part_path, state, state_path, progress)
+            else:
+                # Sem suporte a Range: uma conexão só, sem retomada
+                _download_whole(session, url, part_path, total, progress)
+            break
+        except _ChangedOnServer:
+            # Nova versão publicada no meio do download: recomeça uma vez do zero
+            _remove(part_path, state_path)
+            if attempt:
+                raise
+        except requests.RequestException as e:
+            raise DownloadError(f"falha de conexão: {e}") from e
+
+    digest = file_sha256(part_path)
+    if expected and digest != expected:
+        _remove(part_path, state_path)
+        raise DownloadError(f"checksum inválido (esperado {expected[:12]}…, recebido {digest[:12]}…)")
+    if not expected:
+        print("[UPDATE] Servidor não informou o SHA-256; verificando o ZIP")
+        if not verify_zip(part_path):
+            _remove(part_path, state_path)
+            raise DownloadError("pacote de atualização corrompido")
+
+    os.replace(part_path, dest_path)
+    _remove(state_path)
+    return digest
+
+
+def _probe(session, url):
+    """Ask for the first byte to learn size, ETag, checksum and Range support in one request."""
+    with session.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=UPDATE_DOWNLOAD_TIMEOUT) as response:
+        if response.status_code not in (200, 206):
+            raise DownloadError(f"HTTP {response.status_code}")
+        etag = response.headers.get("ETag")
+        sha256 = response.headers.get(SHA256_HEADER)
+        if response.status_code == 206:
+            # Content-Range: bytes 0-0/12345
+            total = response.headers.get("Content-Range", "").rpartition("/")[2]
+            return (int(total) if total.isdigit() else None), etag, True, sha256
+        length = response.headers.get("Content-Length")
+        return (int(length) if length and length.isdigit() else None), etag, False, sha256
+
+
+def _new_state(url, etag, total, segments, part_path):
+    if total < UPDATE_DOWNLOAD_MIN_SEGMENT * 2:
+        segments = 1
+    segments = max(1, min(segments, total // max(1, UPDATE_DOWNLOAD_MIN_SEGMENT) or 1))
+    size = -(-total // segments)
+    with open(part_path, "wb") as f:
+        f.truncate(total)
+    return {
+        "url": url,
+        "etag": etag,
+        "total": total,
+        # [início, fim inclusivo, bytes já gravados]
+        "segments": [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)],
+    }
+
+
+def _load_state(state_path, url, etag, total, part_path):
+    """Resume state of a previous attempt, if it is for the same file."""
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    same_file = state.get("url") == url and state.get("total") == total and state.get("etag") == etag
+    if not same_file or not etag or not os.path.exists(part_path) or os.path.getsize(part_path) != total:
+        # Sem ETag não há como garantir que os bytes já baixados são da mesma versão
+        _remove(part_path, state_path)
+        return None
+    done = sum(segment[2] for segment in state["segments"])
+    print(f"[UPDATE] Retomando download: {done / 1e6:.1f} de {total / 1e6:.1f} MB já baixados")
+    return state
+
+
+def _save_state(state_path, state, lock):
+    with lock:
+        data = json.dumps(state)
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp_path, state_path)
+
+
+def _download_segments(session, url, etag, part_path, state, state_path, progress):
+    segments = state["segments"]
+    counter = _Progress(progress, sum(segment[2] for segment in segments), state["total"])
+    state_lock = threading.Lock()
+    stop = threading.Event()
+    pending = [segment for segment in segments if segment[0] + segment[2] <= segment[1]]
+
+    def fetch(segment):
+        attempt = 0
+        while segment[0] + segment[2] <= segment[1]:
+            headers = {"Range": f"bytes={segment[0] + segment[2]}-{segment[1]}"}
+            if etag:
+                # Se o arquivo mudou no servidor, recebemos 200 em vez de 206
+                headers["If-Range"] = etag
+            try:
+                with session.get(url, headers=headers, stream=True, timeout=UPDATE_DOWNLOAD_TIMEOUT) as response:
+                    if response.status_code == 200:
+                        raise _ChangedOnServer("arquivo alterado no servidor durante o download")
+                    if response.status_code != 206:
+                        raise DownloadError(f"servidor não retomou a faixa (HTTP {response.status_code})")
+                    with open(part_path, "r+b") as f:
+                        f.seek(segment[0] + segment[2])
+                        for chunk in response.iter_content(UPDATE_DOWNLOAD_CHUNK):
+                            if stop.is_set():
+                                return
+                            chunk = chunk[: segment[1] + 1 - segment[0] - segment[2]]
+                            f.write(chunk)
+                            with state_lock:
+                                segment[2] += len(chunk)
+                            counter.add(len(chunk))
+                attempt = 0
+            except DownloadError:
+                raise
+            except Exception as e:
+                attempt += 1
+                if attempt > UPDATE_DOWNLOAD_RETRIES:
+                    raise DownloadError(f"faixa {segment[0]}-{segment[1]} falhou: {e}") from e
+                print(f"[UPDATE] Conexão interrompida ({e}); tentativa {attempt}/{UPDATE_DOWNLOAD_RETRIES}")
+                time.sleep(min(10, 0.5 * 2 ** attempt))
+
+    if not pending:
+        return
+    with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+        futures = [executor.submit(fetch, segment) for segment in pending]
+        try:
+            while not all(future.done() for future in futures):
+                # Grava o progresso para retomar após uma queda ou reinício
+                _save_state(state_path, state, state_lock)
+                if any(future.done() and future.exception() for future in futures):
+                    # Uma faixa desistiu: as outras param e o progresso fica salvo
+                    stop.set()
+                time.sleep(0.5)
+        finally:
+            _save_state(state_path, state, state_lock)
+        for future in futures:
+            future.result()
+    counter.add(0, force=True)
+
+
+def _download_whole(session, url, part_path, total, progress):
+    counter = _Progress(progress, 0, total)
+    with session.get(url, stream=True, timeout=UPDATE_DOWNLOAD_TIMEOUT) as response:
+        if response.status_code != 200:
+            raise DownloadError(f"HTTP {response.status_code}")
+        with open(part_path, "wb") as f:
+            for chunk in response.iter_content(UPDATE_DOWNLOAD_CHUNK):
+                f.write(chunk)
+                counter.add(len(chunk))
+    counter.add(0, force=True)
+    if total is not None and os.path.getsize(part_path) != total:
+        raise DownloadError("download incompleto")
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(1024 * 1024)
+            if not block:
+                return digest.hexdigest()
+            digest.update(block)
+
+
+def verify_zip(path) -> bool:
+    """Check the CRC of every member (used when no checksum is available)."""
+    try:
+        with zipfile.ZipFile(path) as zip_ref:
+            return zip_ref.testzip() is None
+    except zipfile.BadZipFile:
+        return False
+
+
+def _remove(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
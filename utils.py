@@ -65,26 +65,70 @@ def is_video_file(file_path: str) -> bool:
     return file_path.lower().endswith(SUPPORTED_VIDEO_EXTENSIONS)
 
 
-def get_video_files_from_directory(directory_path: str) -> list:
+def iter_video_files(directory_path: str, recursive: bool = True, cancel_event=None):
+    """
+    Yield video files found under a directory using os.scandir.
+    
+    The file type comes from the directory entry itself, so no extra
+    stat/exists round-trip is made per file (important on network shares).
+    
+    Args:
+        directory_path (str): Path to the directory
+        recursive (bool): Also walk subdirectories
+        cancel_event (threading.Event, optional): Stops the walk when set
+        
+    Yields:
+        str: Path of each video file, ordered by camera/time within each directory
+    """
+    from config import SUPPORTED_VIDEO_EXTENSIONS
+    from dvr import playlist_sort_key
+    
+    pending = [directory_path]
+    while pending:
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                files = []
+                subdirs = []
+                for entry in entries:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                subdirs.append(entry.path)
+                        elif entry.name.lower().endswith(SUPPORTED_VIDEO_EXTENSIONS) and entry.is_file():
+                            files.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"[SCAN] Não foi possível ler {current}: {e}")
+            continue
+        
+        yield from sorted(files, key=playlist_sort_key)
+        # Mantém a ordem alfabética das subpastas na pilha
+        pending.extend(sorted(subdirs, reverse=True))
+
+
+def get_video_files_from_directory(directory_path: str, recursive: bool = False) -> list:
     """
     Get all video files from a directory.
     
     Args:
         directory_path (str): Path to the directory
+        recursive (bool): Also include files from subdirectories
         
     Returns:
-        list: List of video file paths
+        list: List of video file paths, grouped by camera in recording order
     """
+    from dvr import playlist_sort_key
+    
     if not os.path.isdir(directory_path):
         return []
         
-    video_files = []
-    for filename in os.listdir(directory_path):
-        file_path = os.path.join(directory_path, filename)
-        if is_video_file(file_path):
-            video_files.append(file_path)
-            
-    return sorted(video_files)
+    return sorted(iter_video_files(directory_path, recursive=recursive), key=playlist_sort_key)
 
 
 def safe_divide(numerator: float, denominator: float, default: float = 0.0) -> float:
@@ -1,13 +1,27 @@
-import sys
 import vlc
 import os
 from PySide6.QtWidgets import QMainWindow, QFileDialog, QLabel, QMenu, QDialog
-from PySide6.QtCore import Qt, QTimer, QPoint
+from PySide6.QtCore import Qt, QTimer, QPoint, QRectF
 from PySide6.QtGui import QIcon, QAction, QKeyEvent, QFontMetrics, QCursor
 from playlist import PlaylistModal
 from ui_elements import create_ui  # Importa a função para criar a UI
 from styles import apply_styles
 from zoom import ZoomModal
+from frame_tap import FrameTap
+from folder_scanner import FolderScanner
+from session import SessionStore
+from dvr import PlaylistIndex
+from playlist_search import PlaylistSearchIndex
+from count_store import CountStore
+from ipc_protocol import (
+    ALERT_INFO,
+    ALERT_WARNING,
+    ALERT_ERROR,
+    OP_ALERT,
+    TOPIC_ALERTS,
+    encode_alert,
+    encode_event,
+)
 from utils import format_time_range, clamp
 from config import (
     APP_NAME,
@@ -22,7 +36,8 @@ from config import (
     VIDEO_FILTER,
     SUPPORTED_VIDEO_EXTENSIONS,
     AUTO_PAUSE_MIN_DURATION,
-    AUTO_PAUSE_POSITIONS
+    AUTO_PAUSE_POSITIONS,
+    SESSION_SAVE_INTERVAL
 )
 
 
@@ -56,8 +71,15 @@ class ModernVideoPlayer(QMainWindow):
         # Flag para controlar se já estamos fechando
         self.is_closing = False
 
-        # Configurações de teclas - usando configuração padrão
+        # Sessão anterior (playlist, posição, zoom e binds)
+        self.session = SessionStore()
+        self.saved_session = self.session.load()
+
+        # Configurações de teclas - padrão + binds salvos pelo usuário
         self.keybinds = DEFAULT_KEYBINDS.copy()
+        self.keybinds.update(
+            {action: key for action, key in self.saved_session["keybinds"].items() if action in DEFAULT_KEYBINDS}
+        )
 
         # Configurações do player
         self._initialize_player_state()
@@ -69,11 +91,32 @@ class ModernVideoPlayer(QMainWindow):
         self.create_ui()
         self.apply_styles()
 
+        # Frames decodificados vão para memória e são pintados pelo videoframe;
+        # zoom, PiP e o modal de zoom usam esses frames sem reabrir a mídia
+        self.frame_tap = FrameTap(self.mediaplayer, self)
+        self.videoframe.set_frame_tap(self.frame_tap)
+        self.videoframe.zoom_changed.connect(self._on_zoom_changed)
+        # Roda, arrasto e duplo clique chegam ao videoframe, não à janela do VLC
+        self.mediaplayer.video_set_mouse_input(False)
+        self.mediaplayer.video_set_key_input(False)
+
+        # Leitura de pastas em segundo plano (botão "Abrir Pasta" e arrastar/soltar)
+        self.folder_scanner = FolderScanner(self)
+        self.folder_scanner.batch_found.connect(self._on_scan_batch)
+        self.folder_scanner.scan_finished.connect(self._on_scan_finished)
+        self.setAcceptDrops(True)
+
         # Timer para atualização do slider
         self.timer = QTimer()
         self.timer.setInterval(UI_UPDATE_INTERVAL)
         self.timer.timeout.connect(self.update_ui)
 
+        # Timer para salvar a sessão de forma incremental
+        self.session_timer = QTimer()
+        self.session_timer.setInterval(SESSION_SAVE_INTERVAL)
+        self.session_timer.timeout.connect(self.save_session)
+        self.session_timer.start()
+
     def _initialize_player_state(self):
         """Initialize player state variables."""
         self.fps = 0
@@ -81,7 +124,12 @@ class ModernVideoPlayer(QMainWindow):
         self.max_frames = 0
         self.speed_factor = 1
         self.playlist = []
+        self.playlist_index = PlaylistIndex()
+        self.playlist_search = PlaylistSearchIndex()
         self.current_video_index = -1
+        self.current_video_path = None
+        self.count_stores = {}  # caminho -> CountStore com as contagens do vídeo
+        self.hub = None  # PubSubHub, definido quando o servidor IPC é iniciado
         
         # Initialize auto-pause flags dynamically based on configuration
         for position in AUTO_PAUSE_POSITIONS:
@@ -161,12 +209,35 @@ class ModernVideoPlayer(QMainWindow):
             self.notification(f"Erro ao abrir croqui: {e}", NOTIFICATION_COLORS["error"])
             return False
 
+    def handle_handoff(self, video=None, croqui=None):
+        """Run the arguments of a new launch in this (already open) instance."""
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+        if croqui and not self.open_croqui_modal(croqui):
+            # Cancelar o croqui só descarta esta abertura; a instância continua
+            return
+
+        if not video:
+            return
+        if not video.lower().endswith(SUPPORTED_VIDEO_EXTENSIONS):
+            self.alert(f"Formato de vídeo não suportado: {os.path.basename(video)}", ALERT_ERROR)
+            return
+        if video not in self.playlist:
+            self.add_to_playlist([video])
+        self.current_video_index = self.playlist.index(video)
+        self.open_file(video)
+
     def open_zoom_dialog(self):
         """Open the zoom configuration modal."""
         if self.current_video_index != -1:
             zoom_modal = ZoomModal(
                 parent=self,
                 mediaplayer=self.mediaplayer,
+                frame_tap=self.frame_tap,
+                video_surface=self.videoframe,
                 zoom_value=self.stored_zoom_value,
                 zoom_scale_x=self.stored_zoom_scale_x,
                 zoom_scale_y=self.stored_zoom_scale_y,
@@ -186,8 +257,20 @@ class ModernVideoPlayer(QMainWindow):
             self.notification("Nenhum vídeo na playlist!", NOTIFICATION_COLORS["warning"])
             return
 
-        dialog = PlaylistModal(self, self.playlist, self.current_video_index)
-        if dialog.exec():
+        playlist_size = len(self.playlist)
+        dialog = PlaylistModal(
+            self,
+            self.playlist,
+            self.current_video_index,
+            search_index=self.playlist_search,
+            segment_lookup=self.playlist_index.segment,
+        )
+        accepted = dialog.exec()
+        # Remoções acima do vídeo atual deslocam seu índice
+        self.current_video_index = dialog.current_index
+        if len(self.playlist) != playlist_size:
+            self.playlist_index.rebuild(self.playlist)
+        if accepted:
             if dialog.selected_video:
                 self.current_video_index = dialog.selected_index
                 self.open_file(dialog.selected_video)
@@ -203,7 +286,7 @@ class ModernVideoPlayer(QMainWindow):
             )
             
             if video_paths:
-                self.playlist.extend(video_paths)
+                self.add_to_playlist(video_paths)
                 if self.current_video_index == -1:
                     # If no video is currently loaded, start with the first one
                     self.current_video_index = 0
@@ -212,6 +295,63 @@ class ModernVideoPlayer(QMainWindow):
         except Exception as e:
             self.notification(f"Erro ao abrir arquivo: {e}", NOTIFICATION_COLORS["error"])
 
+    def add_to_playlist(self, paths):
+        """Append videos to the playlist and index them by camera/time."""
+        first_position = len(self.playlist)
+        self.playlist.extend(paths)
+        self.playlist_index.extend(paths, first_position)
+
+    def open_folder_dialog(self):
+        """Open a folder dialog and add every video inside it (recursively)."""
+        folder = QFileDialog.getExistingDirectory(self, "Selecionar Pasta", DEFAULT_VIDEO_PATH)
+        if folder:
+            self.ingest_folders([folder])
+
+    def ingest_folders(self, folders):
+        """Scan folders on a worker thread, streaming videos into the playlist."""
+        if self.folder_scanner.start(folders):
+            self.notification("Pasta adicionada à busca em andamento", NOTIFICATION_COLORS["info"])
+        else:
+            self.notification("Procurando vídeos... (Esc cancela)", NOTIFICATION_COLORS["info"])
+
+    def _on_scan_batch(self, paths):
+        """Append a batch of scanned videos; start playback on the first one."""
+        self.add_to_playlist(paths)
+        if self.current_video_index == -1 and self.playlist:
+            self.current_video_index = 0
+            self.open_file(self.playlist[self.current_video_index])
+
+    def _on_scan_finished(self, total, elapsed, cancelled):
+        if cancelled:
+            self.notification(f"Busca cancelada ({total} vídeos adicionados)", NOTIFICATION_COLORS["warning"])
+        elif total == 0:
+            self.notification("Nenhum vídeo encontrado na pasta", NOTIFICATION_COLORS["warning"])
+        else:
+            self.notification(f"{total} vídeos adicionados em {elapsed:.1f}s", NOTIFICATION_COLORS["success"])
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        """Accept dropped folders (scanned in background) and video files."""
+        folders = []
+        files = []
+        for url in event.mimeData().urls():
+            path = url.toLocalFile()
+            if not path:
+                continue
+            if os.path.isdir(path):
+                folders.append(path)
+            elif path.lower().endswith(SUPPORTED_VIDEO_EXTENSIONS):
+                files.append(path)
+
+        if files:
+            self._on_scan_batch(files)
+        if folders:
+            self.ingest_folders(folders)
+        event.acceptProposedAction()
+
     def open_settings_dialog(self):
         """Abre o modal de configurações de binds"""
         from settings import SettingsModal
@@ -221,35 +361,130 @@ class ModernVideoPlayer(QMainWindow):
             self.keybinds = (
                 dialog.new_keybinds
             )  # Atualiza os binds escolhidos pelo usuário
+            self.session.set_keybinds(self.keybinds)
+
+    def restore_session(self):
+        """Reopen the previous session's playlist at the saved position."""
+        playlist = self.saved_session["playlist"]
+        state = self.saved_session["state"]
+        if not playlist:
+            return False
+
+        zoom = state.get("zoom")
+        if zoom:
+            self.stored_zoom_value = zoom.get("value", self.stored_zoom_value)
+            self.stored_zoom_scale_x = zoom.get("scale_x", self.stored_zoom_scale_x)
+            self.stored_zoom_scale_y = zoom.get("scale_y", self.stored_zoom_scale_y)
+            self.stored_zoom_area_pos = QPoint(*zoom.get("area_pos", (0, 0)))
+
+        view = zoom.get("view") if zoom else None
+        self.add_to_playlist(playlist)
+        index = state.get("index", 0)
+        self.current_video_index = index if 0 <= index < len(self.playlist) else 0
+        self.open_file(
+            self.playlist[self.current_video_index],
+            start_time_ms=state.get("position", 0),
+            view=QRectF(*view) if view else None,
+        )
+
+        speed = state.get("speed", 1)
+        if speed != 1:
+            self.set_speed(speed)
+
+        print(f"[SESSION] Sessão restaurada: {len(self.playlist)} vídeos, índice {self.current_video_index}")
+        return True
+
+    def save_session(self):
+        """Append whatever changed since the last save to the session journal."""
+        try:
+            self.session.sync_playlist(self.playlist)
+            position = self.mediaplayer.get_time() if self.current_video_index != -1 else 0
+            self.session.update_state(
+                index=self.current_video_index,
+                position=max(0, position),
+                speed=self.speed_factor,
+                zoom={
+                    "value": self.stored_zoom_value,
+                    "scale_x": self.stored_zoom_scale_x,
+                    "scale_y": self.stored_zoom_scale_y,
+                    "area_pos": [self.stored_zoom_area_pos.x(), self.stored_zoom_area_pos.y()],
+                    "view": self._saved_view(),
+                },
+            )
+        except Exception as e:
+            print(f"[SESSION] Erro ao salvar sessão: {e}")
+
+    def _saved_view(self):
+        """Área visível do zoom ao vivo como [x, y, largura, altura] em frações, ou None."""
+        view = self.videoframe.view_normalized()
+        if view is None:
+            return None
+        return [round(value, 5) for value in (view.x(), view.y(), view.width(), view.height())]
+
+    def _camera_neighbour(self, find):
+        """Playlist index of the same camera's neighbouring segment, or -1."""
+        if not 0 <= self.current_video_index < len(self.playlist):
+            return -1
+        path = find(self.playlist[self.current_video_index])
+        return self.playlist_index.position(path) if path else -1
 
     def play_next(self):
-        """Play the next video in the playlist."""
-        if self.current_video_index < len(self.playlist) - 1:
+        """Play the next video: the same camera's next recording when known."""
+        next_index = self._camera_neighbour(self.playlist_index.next_segment)
+        if next_index != -1:
+            self.current_video_index = next_index
+            self.open_file(self.playlist[self.current_video_index])
+        elif self.current_video_index < len(self.playlist) - 1:
             self.current_video_index += 1
             self.open_file(self.playlist[self.current_video_index])
         else:
-            self.notification("Fim da playlist!", NOTIFICATION_COLORS["warning"])
+            self.alert("Fim da playlist!", ALERT_WARNING)
 
     def play_previous(self):
-        """Play the previous video in the playlist."""
-        if self.current_video_index > 0:
+        """Play the previous video: the same camera's previous recording when known."""
+        previous_index = self._camera_neighbour(self.playlist_index.previous_segment)
+        if previous_index != -1:
+            self.current_video_index = previous_index
+            self.open_file(self.playlist[self.current_video_index])
+        elif self.current_video_index > 0:
             self.current_video_index -= 1
             self.open_file(self.playlist[self.current_video_index])
         else:
             self.notification("Início da playlist!", NOTIFICATION_COLORS["warning"])
 
-    def open_file(self, filename):
-        media = self.instance.media_new(filename)
-        self.mediaplayer.set_media(media)
-
-        if sys.platform == "win32":
-            self.mediaplayer.set_hwnd(self.videoframe.winId())
+    def open_file(self, filename, start_time_ms=0, view=None):
+        if start_time_ms > 0:
+            # Começa direto na posição salva, sem seek depois de abrir
+            media = self.instance.media_new(filename, f"start-time={start_time_ms / 1000:.3f}")
         else:
-            self.mediaplayer.set_xwindow(self.videoframe.winId())
+            media = self.instance.media_new(filename)
+        # O zoom do vídeo anterior não vale para este
+        self.videoframe.media_changed()
+        if view is not None:
+            # Zoom salvo na sessão, aplicado quando chegar o primeiro frame
+            self.videoframe.restore_view(view)
+        if not self.frame_tap.attached:
+            # A saída é escolhida uma vez, antes da primeira mídia, e vale para todas
+            self.frame_tap.attach()
+        self.mediaplayer.set_media(media)
+        self.current_video_path = filename
+        self.position_slider.set_count_store(self.count_stores.get(filename))
 
         self.play_pause()
         self.timer.start()
 
+    def add_counts(self, path, events):
+        """Store count events ``(time_ms, category, movement)`` for the video at ``path``."""
+        store = self.count_stores.get(path)
+        if store is None:
+            store = self.count_stores[path] = CountStore()
+        store.extend(events)
+        if path == self.current_video_path:
+            if self.position_slider.count_store is not store:
+                self.position_slider.set_count_store(store)
+            else:
+                self.position_slider.update()
+
     def play(self):
         """Start video playback."""
         if self.mediaplayer.is_playing():
@@ -450,6 +685,17 @@ class ModernVideoPlayer(QMainWindow):
         except Exception as e:
             print(f"Error displaying notification: {e}")
 
+    def alert(self, message, level=ALERT_INFO):
+        """Show a notification and publish it to the hub's alerts topic."""
+        color = {
+            ALERT_INFO: NOTIFICATION_COLORS["info"],
+            ALERT_WARNING: NOTIFICATION_COLORS["warning"],
+            ALERT_ERROR: NOTIFICATION_COLORS["error"],
+        }.get(level, NOTIFICATION_COLORS["info"])
+        self.notification(message, color)
+        if self.hub is not None:
+            self.hub.publish(TOPIC_ALERTS, encode_event(OP_ALERT, encode_alert(message, level)))
+
     def _create_new_notification(self, message, color):
         """Create a new notification widget."""
         self.snackbar = QLabel(message, self)
@@ -598,10 +844,7 @@ class ModernVideoPlayer(QMainWindow):
                     setattr(self, other_attr, j == i)
                 
                 self.pause()
-                self.notification(
-                    "Pausado automaticamente, Lembre-se de salvar o progresso.",
-                    NOTIFICATION_COLORS["warning"]
-                )
+                self.alert("Pausado automaticamente, Lembre-se de salvar o progresso.", ALERT_WARNING)
                 break
             elif (self.current_frame <= pause_time - tolerance and 
                   getattr(self, attr_name, False)):
@@ -609,15 +852,8 @@ class ModernVideoPlayer(QMainWindow):
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        self.resize_video()
         self.update_snackbar_geometry()
 
-    def resize_video(self):
-        if sys.platform == "win32":
-            self.mediaplayer.set_hwnd(self.videoframe.winId())
-        else:
-            self.mediaplayer.set_xwindow(self.videoframe.winId())
-
     def get_key_name(self, key):
         """Converte o código da tecla em um nome legível."""
         if key == Qt.Key_Space:
@@ -677,14 +913,25 @@ class ModernVideoPlayer(QMainWindow):
             self.increment_speed(0.1)
         elif key_name == "]":
             self.increment_speed(-0.1)
+        elif key_name == "ESCAPE" and self.folder_scanner.is_running():
+            self.folder_scanner.cancel()
         else:
             super().keyPressEvent(event)
 
     def set_zoom(self, scale):
-        """Define o nível de zoom no vídeo"""
-        self.mediaplayer.video_set_scale(scale)
-        self.notification(f"Zoom ajustado para {scale:.1f}x", "green")
-    
+        """Define o nível de zoom digital, mantendo o centro da área visível"""
+        width, height = self.videoframe.video_size()
+        center = self.videoframe.view_rect.center()
+        view_w = width / scale
+        view_h = height / scale
+        self.videoframe.set_view_rect(
+            QRectF(center.x() - view_w / 2, center.y() - view_h / 2, view_w, view_h)
+        )
+
+    def _on_zoom_changed(self, scale):
+        """Mostra o nível de zoom atual ao usuário."""
+        self.notification(f"Zoom ajustado para {scale:.1f}x", "green", duration=1000)
+
     def closeEvent(self, event):
         """Trata o fechamento seguro do aplicativo"""
         # Evita múltiplas chamadas
@@ -697,6 +944,32 @@ class ModernVideoPlayer(QMainWindow):
         try:
             print("[VIDEO_PLAYER] Iniciando fechamento...")
             
+            # Interrompe qualquer leitura de pasta em andamento
+            if hasattr(self, 'folder_scanner'):
+                self.folder_scanner.cancel()
+
+            # Encerra o controle remoto antes de liberar o player: comandos na
+            # fila recebem erro e nenhum handler roda durante o fechamento
+            if hasattr(self, 'command_bridge'):
+                try:
+                    if hasattr(self, 'telemetry_sampler'):
+                        self.telemetry_sampler.timer.stop()
+                    self.command_bridge.close()
+                    if hasattr(self, 'ipc_server'):
+                        self.ipc_server.shutdown(self.ipc_loop)
+                except Exception as e:
+                    print(f"[VIDEO_PLAYER] Erro ao encerrar controle remoto: {e}")
+            
+            # Salva a sessão antes de parar o player
+            if hasattr(self, 'session') and self.session:
+                try:
+                    self.session_timer.stop()
+                    self.save_session()
+                    self.session.close()
+                    print("[VIDEO_PLAYER] Sessão salva")
+                except Exception as e:
+                    print(f"[VIDEO_PLAYER] Erro ao salvar sessão: {e}")
+            
             # Para qualquer reprodução antes de fechar
             if hasattr(self, 'mediaplayer') and self.mediaplayer:
                 try:
@@ -721,11 +994,13 @@ class ModernVideoPlayer(QMainWindow):
             # Para o media player de forma segura
             if hasattr(self, 'mediaplayer') and self.mediaplayer:
                 try:
-                    # Remove o widget antes de parar
+                    # Remove a saída de vídeo (frame tap ou widget) antes de parar
+                    if hasattr(self, 'frame_tap') and self.frame_tap.attached:
+                        self.frame_tap.detach()
                     self.mediaplayer.set_hwnd(None)
-                    print("[VIDEO_PLAYER] Widget VLC removido")
+                    print("[VIDEO_PLAYER] Saída de vídeo removida")
                 except Exception as e:
-                    print(f"[VIDEO_PLAYER] Erro ao remover widget: {e}")
+                    print(f"[VIDEO_PLAYER] Erro ao remover saída de vídeo: {e}")
                 
                 try:
                     self.mediaplayer.stop()
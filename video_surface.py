@@ -0,0 +1,315 @@
+"""
+Video surface widget for PPL Player.
+Paints the frames delivered by the FrameTap into the main window and
+implements the live digital zoom/pan and picture-in-picture insets over them.
+"""
+
+from PySide6.QtWidgets import QFrame
+from PySide6.QtCore import Qt, QRectF, QPointF, Signal
+from PySide6.QtGui import QPainter, QColor, QTransform, QPen
+
+from config import (
+    MINIMUM_VIDEO_HEIGHT,
+    THEME_COLORS,
+    ZOOM_LIVE_MAX,
+    ZOOM_WHEEL_STEP,
+    ZOOM_INSET_MAX,
+    ZOOM_INSET_WIDTH_RATIO,
+    ZOOM_INSET_MARGIN,
+)
+
+
+class ZoomInset:
+    """A magnified region drawn as picture-in-picture.
+
+    ``region`` is stored as fractions (0-1) of the frame so it survives
+    resolution changes; the pixel rectangles are cached by the surface.
+    """
+
+    __slots__ = ("region", "source_rect", "target_rect")
+
+    def __init__(self, region: QRectF):
+        self.region = QRectF(region)
+        self.source_rect = QRectF()
+        self.target_rect = QRectF()
+
+
+class VideoSurface(QFrame):
+    """Widget that renders decoded frames from a FrameTap.
+
+    The visible region is kept as a rectangle in video pixel coordinates
+    (``view_rect``). Zooming and panning only change that rectangle and the
+    cached transforms derived from it; VLC is never reconfigured.
+    """
+
+    zoom_changed = Signal(float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(MINIMUM_VIDEO_HEIGHT)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.frame_tap = None
+        self._background = QColor(THEME_COLORS["video_frame"])
+
+        self.view_rect = QRectF()
+        self._video_size = (0, 0)
+        self._pending_view = None  # área salva (frações), aplicada quando o vídeo tiver tamanho
+        self._target_rect = QRectF()
+        self._to_widget = QTransform()
+        self._to_video = QTransform()
+
+        self._drag_origin = None
+        self._drag_view = None
+
+        self.insets = []
+        self._inset_pen = QPen(QColor(THEME_COLORS["text"]), 2)
+
+    def set_frame_tap(self, frame_tap):
+        """Connect the surface to the tap that supplies its frames."""
+        self.frame_tap = frame_tap
+        frame_tap.frame_ready.connect(self.update)
+        frame_tap.format_changed.connect(self._on_format_changed)
+        self.reset_view()
+
+    # Zoom / pan
+
+    def video_size(self):
+        """Return the real resolution of the current video."""
+        if self.frame_tap is None:
+            return 0, 0
+        return self.frame_tap.video_size()
+
+    def zoom_factor(self) -> float:
+        """Return the current magnification (1.0 = whole frame)."""
+        width, _ = self.video_size()
+        if self.view_rect.width() <= 0:
+            return 1.0
+        return width / self.view_rect.width()
+
+    def reset_view(self):
+        """Show the whole frame again."""
+        width, height = self.video_size()
+        self.set_view_rect(QRectF(0, 0, width, height))
+
+    def media_changed(self):
+        """Forget the view and insets of the previous video; the next one starts unzoomed."""
+        self.insets.clear()
+        self.view_rect = QRectF()
+        self._video_size = (0, 0)
+        self._pending_view = None
+        self._update_transforms()
+        self.update()
+
+    def view_normalized(self):
+        """Return the visible region as fractions (0-1) of the frame, or None when unzoomed."""
+        if self._pending_view is not None:
+            return QRectF(self._pending_view)
+        width, height = self._video_size
+        if width <= 0 or height <= 0 or self.zoom_factor() <= 1.0 + 1e-6:
+            return None
+        rect = self.view_rect
+        return QRectF(rect.x() / width, rect.y() / height, rect.width() / width, rect.height() / height)
+
+    def restore_view(self, rect: QRectF):
+        """Show a saved region (fractions of the frame) once the video has a size.
+
+        Call after ``media_changed``; the region is applied when the first
+        frame of the new media arrives.
+        """
+        if rect.width() < 1.0 or rect.height() < 1.0:
+            self._pending_view = QRectF(rect)
+
+    def set_view_rect(self, rect: QRectF):
+        """Show ``rect`` (video pixel coordinates) filling the surface."""
+        width, height = self.video_size()
+        if width <= 0 or height <= 0:
+            return
+
+        # Mantém a proporção do vídeo e respeita os limites de zoom
+        zoom = max(1.0, min(ZOOM_LIVE_MAX, width / max(rect.width(), 1.0)))
+        view_w = width / zoom
+        view_h = height / zoom
+        center = rect.center()
+        x = max(0.0, min(width - view_w, center.x() - view_w / 2))
+        y = max(0.0, min(height - view_h, center.y() - view_h / 2))
+
+        previous_zoom = self.zoom_factor()
+        self.view_rect = QRectF(x, y, view_w, view_h)
+        self._video_size = (width, height)
+        self._update_transforms()
+        self.update()
+        if abs(previous_zoom - zoom) > 1e-6:
+            self.zoom_changed.emit(zoom)
+
+    def set_view_normalized(self, rect: QRectF):
+        """Show a region given as fractions (0-1) of the frame."""
+        width, height = self.video_size()
+        self.set_view_rect(
+            QRectF(rect.x() * width, rect.y() * height, rect.width() * width, rect.height() * height)
+        )
+
+    def zoom_at(self, factor: float, anchor: QPointF):
+        """Multiply the zoom by ``factor`` keeping ``anchor`` (widget coords) in place."""
+        width, _ = self.video_size()
+        if width <= 0:
+            return
+        if self.view_rect.isEmpty():
+            self.reset_view()
+        zoom = max(1.0, min(ZOOM_LIVE_MAX, self.zoom_factor() * factor))
+        video_point = self._to_video.map(anchor)
+
+        # Proporção do ponto âncora dentro da área visível
+        fx = (video_point.x() - self.view_rect.x()) / self.view_rect.width()
+        fy = (video_point.y() - self.view_rect.y()) / self.view_rect.height()
+        view_w = self.view_rect.width() * self.zoom_factor() / zoom
+        view_h = self.view_rect.height() * self.zoom_factor() / zoom
+        self.set_view_rect(QRectF(video_point.x() - fx * view_w, video_point.y() - fy * view_h, view_w, view_h))
+
+    # Picture-in-picture
+
+    def add_inset(self, region: QRectF) -> bool:
+        """Add a magnified inset of ``region`` (fractions of the frame).
+
+        Every inset is drawn from the same decoded frame as the main view,
+        so adding one costs a scaled blit, not another decode.
+        """
+        if len(self.insets) >= ZOOM_INSET_MAX or region.isEmpty():
+            return False
+        self.insets.append(ZoomInset(region))
+        self._update_inset_rects()
+        self.update()
+        return True
+
+    def remove_inset_at(self, pos: QPointF) -> bool:
+        """Remove the inset under ``pos`` (widget coords), if any."""
+        for inset in reversed(self.insets):
+            if inset.target_rect.contains(pos):
+                self.insets.remove(inset)
+                self._update_inset_rects()
+                self.update()
+                return True
+        return False
+
+    def clear_insets(self):
+        """Remove every picture-in-picture inset."""
+        self.insets.clear()
+        self.update()
+
+    def _update_inset_rects(self):
+        """Stack the insets in the bottom-right corner, one above the other.
+
+        When the stack is taller than the surface, every inset is scaled
+        down by the same factor so all of them stay visible.
+        """
+        width, height = self.video_size()
+        if width <= 0 or height <= 0 or not self.insets:
+            return
+
+        inset_w = self.width() * ZOOM_INSET_WIDTH_RATIO
+        sizes = []
+        for inset in self.insets:
+            region = inset.region
+            inset.source_rect = QRectF(
+                region.x() * width, region.y() * height, region.width() * width, region.height() * height
+            )
+            sizes.append(inset_w * inset.source_rect.height() / max(inset.source_rect.width(), 1.0))
+
+        available = self.height() - ZOOM_INSET_MARGIN * (len(self.insets) + 1)
+        scale = min(1.0, max(0.0, available) / max(sum(sizes), 1.0))
+        bottom = self.height() - ZOOM_INSET_MARGIN
+        for inset, inset_h in zip(self.insets, sizes):
+            w, h = inset_w * scale, inset_h * scale
+            inset.target_rect = QRectF(self.width() - ZOOM_INSET_MARGIN - w, bottom - h, w, h)
+            bottom -= h + ZOOM_INSET_MARGIN
+
+    def _update_transforms(self):
+        """Recompute the cached video <-> widget mapping."""
+        if self.view_rect.width() <= 0 or self.view_rect.height() <= 0:
+            self._target_rect = QRectF(self.rect())
+            self._to_widget = QTransform()
+            self._to_video = QTransform()
+            return
+
+        scale = min(self.width() / self.view_rect.width(), self.height() / self.view_rect.height())
+        w = self.view_rect.width() * scale
+        h = self.view_rect.height() * scale
+        self._target_rect = QRectF((self.width() - w) / 2, (self.height() - h) / 2, w, h)
+
+        self._to_widget = QTransform()
+        self._to_widget.translate(self._target_rect.x(), self._target_rect.y())
+        self._to_widget.scale(scale, scale)
+        self._to_widget.translate(-self.view_rect.x(), -self.view_rect.y())
+        self._to_video, _ = self._to_widget.inverted()
+
+    def _on_format_changed(self, width, height):
+        if self._pending_view is not None:
+            pending, self._pending_view = self._pending_view, None
+            self.set_view_normalized(pending)
+        # Resolução nova no meio do vídeo: a área visível é mantida
+        # (reescalada) em vez de voltar ao quadro inteiro
+        elif self.view_rect.isEmpty() or self._video_size == (0, 0):
+            self.reset_view()
+        else:
+            sx = width / self._video_size[0]
+            sy = height / self._video_size[1]
+            rect = self.view_rect
+            self.set_view_rect(QRectF(rect.x() * sx, rect.y() * sy, rect.width() * sx, rect.height() * sy))
+        self._update_inset_rects()
+
+    # Eventos
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_transforms()
+        self._update_inset_rects()
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if steps == 0:
+            return
+        self.zoom_at(ZOOM_WHEEL_STEP ** steps, event.position())
+        event.accept()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.RightButton and self.remove_inset_at(event.position()):
+            event.accept()
+            return
+        if event.button() == Qt.LeftButton and self.zoom_factor() > 1.0:
+            self._drag_origin = event.position()
+            self._drag_view = QRectF(self.view_rect)
+            self.setCursor(Qt.ClosedHandCursor)
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._drag_origin is not None:
+            scale = self._to_widget.m11() or 1.0
+            delta = (event.position() - self._drag_origin) / scale
+            self.set_view_rect(self._drag_view.translated(-delta.x(), -delta.y()))
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self._drag_origin is not None:
+            self._drag_origin = None
+            self._drag_view = None
+            self.unsetCursor()
+        super().mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        self.reset_view()
+        super().mouseDoubleClickEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self._background)
+
+        if self.frame_tap is not None and self.frame_tap.attached:
+            with self.frame_tap.locked_frame() as frame:
+                if frame is not None:
+                    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+                    painter.drawImage(self._target_rect, frame, self.view_rect)
+
+                    painter.setPen(self._inset_pen)
+                    for inset in self.insets:
+                        painter.drawImage(inset.target_rect, frame, inset.source_rect)
+                        painter.drawRect(inset.target_rect)
+        painter.end()
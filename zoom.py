@@ -7,18 +7,40 @@ from PySide6.QtWidgets import (
     QPushButton,
     QFrame,
     QHBoxLayout,
+    QWidget,
 )
-from PySide6.QtCore import Qt, QPoint
-from PySide6.QtGui import QPixmap, QIcon
+from PySide6.QtCore import Qt, QPoint, QTimer, QRectF
+from PySide6.QtGui import QIcon, QPainter
+from config import ZOOM_PREVIEW_FPS
 
 icon_path = os.path.join(os.path.dirname(__file__), "icons")
 
 
+class FramePreview(QWidget):
+    """Desenha o último frame do FrameTap direto da memória, sem arquivos."""
+
+    def __init__(self, parent, frame_tap):
+        super().__init__(parent)
+        self.frame_tap = frame_tap
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.black)
+        if self.frame_tap:
+            with self.frame_tap.locked_frame() as frame:
+                if frame is not None:
+                    painter.drawImage(self.rect(), frame)
+        painter.end()
+
+
 class ZoomModal(QDialog):
     def __init__(
         self,
         parent,
         mediaplayer,
+        frame_tap,
+        video_surface,
         zoom_value=10,
         zoom_scale_x=80,
         zoom_scale_y=45,
@@ -29,6 +51,8 @@ class ZoomModal(QDialog):
         self.setFixedSize(500, 400)
         self.setWindowIcon(QIcon(os.path.join(icon_path, "zoom-title.png")))
         self.mediaplayer = mediaplayer
+        self.frame_tap = frame_tap
+        self.video_surface = video_surface
 
         # Aplica tema escuro ao modal
         self.setStyleSheet(
@@ -90,10 +114,8 @@ class ZoomModal(QDialog):
         self.video_preview.setFixedSize(320, 180)
         self.video_preview.setMouseTracking(True)
 
-        # 🔸 Label onde exibiremos o snapshot
-        self.snapshot_label = QLabel(self.video_preview)
-        self.snapshot_label.setAlignment(Qt.AlignCenter)
-        self.snapshot_label.setScaledContents(True)
+        # 🔸 Preview ao vivo com os frames em memória
+        self.snapshot_label = FramePreview(self.video_preview, self.frame_tap)
         self.snapshot_label.resize(320, 180)
 
         # 🔍 Área de zoom (movível)
@@ -141,8 +163,13 @@ class ZoomModal(QDialog):
         self.reset_button = QPushButton(" Resetar Zoom")
         self.reset_button.setIcon(QIcon(os.path.join(icon_path, "rotate.png")))
 
+        # 🔘 Botão Picture-in-picture
+        self.inset_button = QPushButton(" Adicionar PiP")
+        self.inset_button.setIcon(QIcon(os.path.join(icon_path, "zoom.png")))
+
         self.apply_button.clicked.connect(self.apply_zoom)
         self.reset_button.clicked.connect(self.reset_zoom)
+        self.inset_button.clicked.connect(self.add_inset)
 
         # 🔹 Organização dos elementos
         layout.addWidget(self.video_preview, alignment=Qt.AlignCenter)
@@ -151,6 +178,7 @@ class ZoomModal(QDialog):
         # Cria um layout horizontal para os botões
         buttons_layout = QHBoxLayout()
         buttons_layout.addWidget(self.apply_button)
+        buttons_layout.addWidget(self.inset_button)
         buttons_layout.addWidget(self.reset_button)
 
         # Adiciona o layout horizontal ao layout principal
@@ -158,6 +186,12 @@ class ZoomModal(QDialog):
 
         self.setLayout(layout)
 
+        # ⏱️ Atualiza o preview com taxa limitada enquanto o modal estiver aberto
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setInterval(int(1000 / ZOOM_PREVIEW_FPS))
+        self.preview_timer.timeout.connect(self.update_snapshot)
+        self.preview_timer.start()
+
         self.update_snapshot()
 
     def update_zoom(self, value):
@@ -169,21 +203,30 @@ class ZoomModal(QDialog):
         self.limit_zoom_area()
 
     def apply_zoom(self):
-        """Aplica o zoom ao vídeo no VLC e fecha o modal com Accept"""
-        zoom_pos = self.zoom_area.pos()
-        zoom_size = self.zoom_area.size()
-        pos_x = zoom_pos.x()
-        pos_y = zoom_pos.y()
-        width = zoom_size.width()
-        height = zoom_size.height()
-
-        # Exemplo de crop usando VLC
-        self.mediaplayer.video_set_crop_geometry(
-            f"{pos_x * 4 + (width * 4)}x{pos_y * 4 + (height * 4)}+{pos_x * 4}+{pos_y * 4}"
-        )
+        """Aplica o zoom digital no videoframe e fecha o modal com Accept"""
+        self.video_surface.set_view_normalized(self.zoom_region())
+        self.accept()
 
+    def add_inset(self):
+        """Mostra a área de zoom como picture-in-picture sobre o vídeo inteiro"""
+        if not self.video_surface.add_inset(self.zoom_region()):
+            self.inset_button.setEnabled(False)
+            self.inset_button.setText(" Limite de PiP atingido")
+            return
         self.accept()
 
+    def zoom_region(self):
+        """Retorna a área de zoom como frações (0-1) do frame do vídeo."""
+        preview_w = self.video_preview.width()
+        preview_h = self.video_preview.height()
+        zoom_geometry = self.zoom_area.geometry()
+        return QRectF(
+            zoom_geometry.x() / preview_w,
+            zoom_geometry.y() / preview_h,
+            zoom_geometry.width() / preview_w,
+            zoom_geometry.height() / preview_h,
+        )
+
     def reset_zoom(self):
         """Redefine para valores 'padrão' (ou defina como preferir)"""
         if self.zoom_value != 40:
@@ -193,6 +236,7 @@ class ZoomModal(QDialog):
             self.zoom_area.setFixedSize(self.zoom_scale_x, self.zoom_scale_y)
             self.zoom_area.move(0, 0)
             self.zoom_slider.setValue(self.zoom_value)
+        self.video_surface.reset_view()
 
     def limit_zoom_area(self):
         """Garante que a área de zoom não saia do preview"""
@@ -204,18 +248,13 @@ class ZoomModal(QDialog):
         )
 
     def update_snapshot(self):
-        """Captura um snapshot do player principal e exibe no QLabel."""
-        import tempfile
-
-        snapshot_dir = tempfile.gettempdir()
-        snapshot_path = os.path.join(snapshot_dir, "temp_preview.png")
-        # Tira snapshot do player principal; tamanho 320x180
-        if self.zoom_value == 40 or self.zoom_value == 0:
-            self.mediaplayer.video_take_snapshot(0, snapshot_path, 320, 180)
-        if os.path.exists(snapshot_path):
-            pixmap = QPixmap(snapshot_path)
-            if not pixmap.isNull():
-                self.snapshot_label.setPixmap(pixmap)
+        """Redesenha o preview com o frame mais recente do player principal."""
+        self.snapshot_label.update()
+
+    def done(self, result):
+        """Para o timer do preview ao fechar o modal."""
+        self.preview_timer.stop()
+        super().done(result)
 
     # Eventos de mouse para arrastar a área de zoom
     def mousePressEvent(self, event):